@@ -0,0 +1,118 @@
+"""Minified, precompressed catalog files for serving.
+
+Every locale, and every namespace of it, becomes a minified JSON file with
+sorted keys, named after its content hash so it can be cached forever:
+
+    en.3f2a9c1e7b04.json          whole catalog
+    en.invoice.91c0d2aa5e13.json  one namespace, as {"invoice": {...}}
+
+next to .gz and (when the brotli package is installed) .br copies. The
+manifest, artifacts.json, maps each locale and namespace to its current
+files, so a server can serve the precompressed bytes directly.
+"""
+import gzip
+import json
+import os
+
+from fsutil import atomic_write, write_if_changed
+from manifest import hash_bytes
+from shards import NAMESPACE_PATTERN
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+MANIFEST_FILE = 'artifacts.json'
+HASH_LENGTH = 12
+
+
+def minify(value):
+    return json.dumps(value, ensure_ascii=False, sort_keys=True, separators=(',', ':')).encode('utf-8')
+
+
+def _gzip(data):
+    # mtime=0 keeps the bytes a function of the content alone
+    return gzip.compress(data, compresslevel=9, mtime=0)
+
+
+def _brotli(data):
+    return brotli.compress(data, mode=brotli.MODE_TEXT, quality=11)
+
+
+def _encoders():
+    encoders = {'gzip': ('.gz', _gzip)}
+    if brotli is not None:
+        encoders['br'] = ('.br', _brotli)
+    return encoders
+
+
+def _write_artifact(out_dir, stem, data):
+    """Write <stem>.<hash>.json and its compressed copies unless they exist; return its manifest entry."""
+    digest = hash_bytes(data)
+    file_name = f'{stem}.{digest[:HASH_LENGTH]}.json'
+    entry = {'file': file_name, 'sha256': digest, 'size': len(data), 'encodings': {}}
+    # Same name, same content: existing files are never rewritten or recompressed
+    path = os.path.join(out_dir, file_name)
+    if not os.path.exists(path):
+        atomic_write(path, data)
+    for encoding, (suffix, compress) in _encoders().items():
+        encoded_path = path + suffix
+        if os.path.exists(encoded_path):
+            size = os.path.getsize(encoded_path)
+        else:
+            size = atomic_write(encoded_path, compress(data))[1]
+        entry['encodings'][encoding] = {'file': file_name + suffix, 'size': size}
+    return entry
+
+
+def _files(entry):
+    yield entry['file']
+    for encoding in entry['encodings'].values():
+        yield encoding['file']
+
+
+def load_manifest(out_dir):
+    try:
+        with open(os.path.join(out_dir, MANIFEST_FILE), 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return {}
+
+
+def build_artifacts(catalogs, out_dir):
+    """Write artifacts for (locale, catalog) pairs and the manifest; returns the manifest.
+
+    Files listed in the previous manifest but not in the new one are removed.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    previous = load_manifest(out_dir)
+    manifest = {}
+    for lang_code, catalog in catalogs:
+        entry = _write_artifact(out_dir, lang_code, minify(catalog))
+        entry['namespaces'] = {}
+        for namespace, subtree in catalog.items():
+            if not NAMESPACE_PATTERN.match(namespace):
+                raise ValueError(f'Namespace {namespace!r} in {lang_code} cannot be used in a file name')
+            entry['namespaces'][namespace] = _write_artifact(
+                out_dir, f'{lang_code}.{namespace}', minify({namespace: subtree})
+            )
+        manifest[lang_code] = entry
+
+    current = set()
+    for entry in manifest.values():
+        current.update(_files(entry))
+        for namespace_entry in entry['namespaces'].values():
+            current.update(_files(namespace_entry))
+    for entry in previous.values():
+        stale = set(_files(entry))
+        for namespace_entry in entry.get('namespaces', {}).values():
+            stale.update(_files(namespace_entry))
+        for file_name in stale - current:
+            path = os.path.join(out_dir, file_name)
+            if os.path.exists(path):
+                os.unlink(path)
+
+    write_if_changed(os.path.join(out_dir, MANIFEST_FILE),
+                     json.dumps(manifest, indent=2, sort_keys=True).encode('utf-8'))
+    return manifest
@@ -0,0 +1,250 @@
+"""Benchmarks for the translation pipeline on synthetic catalogs.
+
+Catalogs are generated to look like src/i18n/messages/en.json: a dozen
+namespaces (invoice, form, emailTemplate, ...) nested a few levels deep,
+ICU placeholders such as {recipient} and plural blocks, and CJK text for
+the zh-like locales. Each locale then goes through the sync engine exactly
+as update_translations() runs it, one locale at a time, and every phase
+(read, hash, parse, merge, serialize, write) reports its time summed over
+the locales and the highest memory tracemalloc traced while it ran, over
+any locale. Memory is measured in a second, traced run, so tracing doesn't
+skew the timings. Every (keys, locales) configuration runs in a fresh
+process.
+
+    python scripts/translations/bench.py --keys 1000 10000 --locales 7 50 --output bench.json
+    python scripts/translations/bench.py --compare bench.json
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+from json_writer import write_catalog
+from sync import LocaleTask, SyncOptions, run_sync
+from telemetry import PHASES
+
+NAMESPACES = [
+    'app', 'navigation', 'auth', 'dashboard', 'home', 'common', 'footer', 'privacyPolicy',
+    'termsOfService', 'invoice', 'drafts', 'form', 'invoiceTemplate', 'emailTemplate',
+]
+SECTION_KEYS = [
+    'email', 'export', 'filters', 'status', 'toast', 'buttons', 'wizard', 'steps', 'signature',
+    'items', 'billTo', 'billFrom', 'paymentInfo', 'success', 'error', 'recipient', 'subject',
+]
+LEAF_KEYS = [
+    'title', 'description', 'label', 'placeholder', 'cancel', 'send', 'sending', 'save',
+    'delete', 'edit', 'next', 'previous', 'loading', 'required', 'invalid', 'preview',
+]
+WORDS = [
+    'invoice', 'client', 'payment', 'amount', 'due', 'date', 'send', 'email', 'export',
+    'your', 'the', 'to', 'from', 'status', 'draft', 'pending', 'paid', 'cancelled', 'total',
+]
+CJK = '发票客户付款金额到期日期发送电子邮件导出您的状态草稿待处理已支付已取消总计'
+PLACEHOLDERS = ['{recipient}', '{status}', '{appName}', '{invoiceNumber}', '{count}']
+# Real locales first, then synthetic ones; zh-like locales get CJK text
+REAL_LOCALES = ['en', 'es', 'fr', 'de', 'pl', 'pt', 'zh']
+CJK_LOCALES = {'zh'}
+
+DEFAULT_KEYS = [1000, 10000, 100000]
+DEFAULT_LOCALES = [7, 50]
+# Share of leaves the benchmark patch touches
+PATCH_RATIO = 0.05
+
+
+def locale_codes(count):
+    codes = REAL_LOCALES[:count]
+    codes += [f'x{index:02d}' for index in range(count - len(codes))]
+    return codes
+
+
+def _message(rng, cjk):
+    if cjk:
+        text = ''.join(rng.choice(CJK) for _ in range(rng.randint(4, 16)))
+    else:
+        text = ' '.join(rng.choice(WORDS) for _ in range(rng.randint(2, 10))).capitalize()
+    roll = rng.random()
+    if roll < 0.15:
+        text = f'{text} {rng.choice(PLACEHOLDERS)}'
+    elif roll < 0.2:
+        text = '{count, plural, =0 {' + text + '} one {# item} other {# items}}'
+    return text
+
+
+def generate_paths(keys, seed=0):
+    """Generate `keys` unique leaf paths shaped like the real catalogs."""
+    rng = random.Random(seed)
+    paths = []
+    for index in range(keys):
+        depth = rng.choice((1, 2, 2, 3, 3, 4))
+        path = (rng.choice(NAMESPACES),)
+        path += tuple(f'{rng.choice(SECTION_KEYS)}{rng.randint(0, 40)}' for _ in range(depth - 1))
+        # Section and leaf names never overlap, and the index keeps leaves unique
+        paths.append(path + (f'{rng.choice(LEAF_KEYS)}{index}',))
+    return paths
+
+
+def generate_catalog(paths, lang_code, seed=0):
+    rng = random.Random(f'{seed}:{lang_code}')
+    cjk = lang_code in CJK_LOCALES
+    catalog = {}
+    for path in paths:
+        node = catalog
+        for key in path[:-1]:
+            node = node.setdefault(key, {})
+        node[path[-1]] = _message(rng, cjk)
+    return catalog
+
+
+def generate_patch(paths, lang_code, seed=0):
+    """A TRANSLATIONS-style payload: mostly overwrites plus some new keys."""
+    rng = random.Random(f'{seed}:patch:{lang_code}')
+    cjk = lang_code in CJK_LOCALES
+    patch = {}
+    touched = rng.sample(paths, max(1, int(len(paths) * PATCH_RATIO)))
+    for index, path in enumerate(touched):
+        if index % 5 == 0:
+            path = path[:-1] + (f'added{index}',)
+        node = patch
+        for key in path[:-1]:
+            node = node.setdefault(key, {})
+        node[path[-1]] = _message(rng, cjk)
+    return patch
+
+
+def _sync_locales(codes, paths, seed, trace_memory):
+    """Write fresh base catalogs (not timed), then sync a payload into each; returns (results, seconds)."""
+    with tempfile.TemporaryDirectory(prefix='translations-bench-') as directory:
+        for lang_code in codes:
+            write_catalog(os.path.join(directory, f'{lang_code}.json'), generate_catalog(paths, lang_code, seed))
+
+        # Like update_translations(), payloads are produced as each locale is reached
+        options = SyncOptions(trace_memory=trace_memory)
+        tasks = (
+            LocaleTask(lang_code, os.path.join(directory, f'{lang_code}.json'),
+                       generate_patch(paths, lang_code, seed), options=options)
+            for lang_code in codes
+        )
+        started = time.perf_counter()
+        results = run_sync(tasks)
+        seconds = time.perf_counter() - started
+
+    failures = [f'{result.lang_code}: {result.error}' for result in results if not result.ok]
+    if failures:
+        raise RuntimeError(', '.join(failures))
+    return results, seconds
+
+
+def run_configuration(keys, locales, seed=0):
+    """Sync every locale of one configuration through run_sync(), in this process.
+
+    Timings come from an untraced run, since tracemalloc slows allocation
+    heavy phases down; memory from a second, traced run of the same sync.
+    """
+    codes = locale_codes(locales)
+    paths = generate_paths(keys, seed)
+    results, seconds = _sync_locales(codes, paths, seed, trace_memory=False)
+    traced, _ = _sync_locales(codes, paths, seed, trace_memory=True)
+
+    phases = {}
+    for name in PHASES:
+        if any(name in result.timings for result in results):
+            phases[name] = {
+                'seconds': sum(result.timings.get(name, 0.0) for result in results),
+                'peak_traced_kb': max(result.phase_peaks.get(name, 0) for result in traced) // 1024,
+            }
+    return {
+        'keys': keys,
+        'locales': locales,
+        'seconds': seconds,
+        'peak_traced_kb': max(result.peak_traced_bytes for result in traced) // 1024,
+        'changes': sum(len(result.changes) for result in results),
+        'bytes_read': sum(result.bytes_read for result in results),
+        'bytes_written': sum(result.bytes_written for result in results),
+        'phases': phases,
+    }
+
+
+def run_suite(key_counts, locale_counts, seed=0):
+    results = []
+    for keys in key_counts:
+        for locales in locale_counts:
+            completed = subprocess.run(
+                [sys.executable, os.path.abspath(__file__), '--single', str(keys), str(locales), '--seed', str(seed)],
+                check=True, capture_output=True, text=True,
+            )
+            result = json.loads(completed.stdout)
+            results.append(result)
+            print(format_result(result), file=sys.stderr)
+    return {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+        'seed': seed,
+        'results': results,
+    }
+
+
+def format_result(result):
+    phases = ', '.join(
+        f'{name} {phase["seconds"]:.3f}s/{phase["peak_traced_kb"]}KB'
+        for name, phase in result['phases'].items()
+    )
+    return f'{result["keys"]:>7} keys x {result["locales"]:>2} locales: {phases}'
+
+
+def compare(baseline, current, threshold=0.1):
+    """Print per-phase time ratios against a baseline; return the regressions beyond threshold."""
+    previous = {(result['keys'], result['locales']): result for result in baseline['results']}
+    regressions = []
+    for result in current['results']:
+        before = previous.get((result['keys'], result['locales']))
+        if before is None:
+            continue
+        for name, phase in result['phases'].items():
+            old_seconds = before['phases'].get(name, {}).get('seconds')
+            if not old_seconds:
+                continue
+            ratio = phase['seconds'] / old_seconds
+            marker = ' REGRESSION' if ratio > 1 + threshold else ''
+            print(f'{result["keys"]:>7} x {result["locales"]:>2} {name:<9} {ratio:6.2f}x{marker}')
+            if marker:
+                regressions.append((result['keys'], result['locales'], name, ratio))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark the per-locale sync phases on synthetic catalogs.')
+    parser.add_argument('--keys', type=int, nargs='+', default=DEFAULT_KEYS, help='leaf keys per catalog')
+    parser.add_argument('--locales', type=int, nargs='+', default=DEFAULT_LOCALES, help='number of locales')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', help='write the results as JSON to this file')
+    parser.add_argument('--compare', metavar='BASELINE', help='compare against an earlier results file')
+    parser.add_argument('--threshold', type=float, default=0.1,
+                        help='slowdown ratio above which --compare reports a regression (default: 0.1)')
+    parser.add_argument('--single', type=int, nargs=2, metavar=('KEYS', 'LOCALES'), help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.single:
+        json.dump(run_configuration(*args.single, seed=args.seed), sys.stdout)
+        return 0
+
+    suite = run_suite(args.keys, args.locales, seed=args.seed)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(suite, f, indent=2)
+
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        if compare(baseline, suite, args.threshold):
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
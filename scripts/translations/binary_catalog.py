@@ -0,0 +1,206 @@
+"""Compiled binary catalogs with memory-mapped lookup.
+
+Layout (little-endian):
+
+    header  MAGIC, version, entry count, table offset, blob offset, blob size
+    table   one fixed-size entry per leaf, sorted by UTF-8 dotted key:
+            key offset, key length, value offset, value length,
+            document order, value type
+    blob    UTF-8 keys and values
+
+String values are stored as raw UTF-8; anything else (numbers, booleans,
+null, arrays, empty objects) as compact JSON. A lookup binary-searches the
+table straight from the memory map and decodes only the value it returns,
+from a memoryview of the map, so the value's bytes are never copied. The
+document order is kept so a catalog can be rebuilt exactly.
+"""
+import json
+import mmap
+import os
+import struct
+
+from catalog import from_leaves, iter_leaves
+from fsutil import atomic_write_pieces
+
+MAGIC = b'BEC1'
+VERSION = 1
+HEADER = struct.Struct('<4sIIIII')
+ENTRY = struct.Struct('<IIIIIB3x')
+
+TYPE_STRING = 0
+TYPE_JSON = 1
+
+_ABSENT = object()
+
+
+class CatalogFormatError(ValueError):
+    pass
+
+
+def _entries(catalog):
+    for order, (path, value) in enumerate(iter_leaves(catalog, include_empty=True)):
+        for key in path:
+            if '.' in key:
+                raise CatalogFormatError(f'Key {key!r} contains a dot and cannot be addressed by a dotted path')
+        if isinstance(value, str):
+            encoded, value_type = value.encode('utf-8'), TYPE_STRING
+        else:
+            encoded = json.dumps(value, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+            value_type = TYPE_JSON
+        yield '.'.join(path).encode('utf-8'), encoded, order, value_type
+
+
+def compile_catalog(catalog, file_path):
+    """Write catalog to file_path in the binary format, returning (sha256, size)."""
+    entries = sorted(_entries(catalog))
+
+    blob = []
+    table = []
+    blob_size = 0
+    for key, value, order, value_type in entries:
+        key_offset = blob_size
+        blob.append(key)
+        blob_size += len(key)
+        value_offset = blob_size
+        blob.append(value)
+        blob_size += len(value)
+        table.append(ENTRY.pack(key_offset, len(key), value_offset, len(value), order, value_type))
+
+    table_offset = HEADER.size
+    blob_offset = table_offset + ENTRY.size * len(table)
+    header = HEADER.pack(MAGIC, VERSION, len(table), table_offset, blob_offset, blob_size)
+    return atomic_write_pieces(file_path, [header, b''.join(table), b''.join(blob)])
+
+
+class BinaryCatalog:
+    """Read-only view of a compiled catalog.
+
+    >>> with BinaryCatalog('en.bin') as messages:
+    ...     messages.get('invoice.email.toast.success.description')
+    'Email sent to {recipient}'
+    """
+
+    def __init__(self, file_path):
+        self.file_path = file_path
+        self._map = None
+        self._view = None
+        with open(file_path, 'rb') as f:
+            if os.fstat(f.fileno()).st_size < HEADER.size:
+                raise CatalogFormatError(f'{file_path} is too small to be a compiled catalog')
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, self._count, self._table, self._blob, blob_size = HEADER.unpack_from(self._map)
+        if magic != MAGIC or version != VERSION:
+            self.close()
+            raise CatalogFormatError(f'{file_path} is not a version {VERSION} compiled catalog')
+        if self._blob + blob_size != len(self._map):
+            self.close()
+            raise CatalogFormatError(f'{file_path} is truncated')
+        self._view = memoryview(self._map)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        # The map can't be closed while a view of it is alive
+        if self._view is not None:
+            self._view.release()
+            self._view = None
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+
+    def __len__(self):
+        return self._count
+
+    def _entry(self, index):
+        return ENTRY.unpack_from(self._map, self._table + index * ENTRY.size)
+
+    def _key(self, entry):
+        # Ordering comparisons need bytes (memoryviews only support ==); keys are short
+        start = self._blob + entry[0]
+        return self._map[start:start + entry[1]]
+
+    def _key_is(self, entry, encoded):
+        start = self._blob + entry[0]
+        return entry[1] == len(encoded) and self._view[start:start + entry[1]] == encoded
+
+    def _value(self, entry):
+        start = self._blob + entry[2]
+        raw = str(self._view[start:start + entry[3]], 'utf-8')
+        return raw if entry[5] == TYPE_STRING else json.loads(raw)
+
+    def _lower_bound(self, key):
+        low, high = 0, self._count
+        while low < high:
+            middle = (low + high) // 2
+            if self._key(self._entry(middle)) < key:
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+    def get(self, key, default=None):
+        """Value of the dotted leaf key, or default."""
+        encoded = key.encode('utf-8')
+        index = self._lower_bound(encoded)
+        if index < self._count:
+            entry = self._entry(index)
+            if self._key_is(entry, encoded):
+                return self._value(entry)
+        return default
+
+    def __contains__(self, key):
+        return self.get(key, default=_ABSENT) is not _ABSENT
+
+    def items(self, prefix=''):
+        """Yield (dotted key, value) in key order, limited to keys under prefix if given."""
+        if prefix:
+            encoded = (prefix + '.').encode('utf-8')
+            index = self._lower_bound(encoded)
+        else:
+            encoded = b''
+            index = 0
+        while index < self._count:
+            entry = self._entry(index)
+            key = self._key(entry)
+            if not key.startswith(encoded):
+                break
+            yield key.decode('utf-8'), self._value(entry)
+            index += 1
+
+    def to_catalog(self):
+        """Rebuild the nested catalog, in its original key order."""
+        leaves = []
+        for index in range(self._count):
+            entry = self._entry(index)
+            leaves.append((entry[4], tuple(self._key(entry).decode('utf-8').split('.')), self._value(entry)))
+        leaves.sort(key=lambda leaf: leaf[0])
+        return from_leaves((path, value) for _, path, value in leaves)
+
+
+def verify_catalog(file_path, catalog):
+    """Round-trip check of a compiled catalog against its JSON source.
+
+    Returns a list of problems; an empty list means every leaf resolves to
+    the same value and the rebuilt catalog serializes identically.
+    """
+    problems = []
+    leaves = list(iter_leaves(catalog, include_empty=True))
+    with BinaryCatalog(file_path) as compiled:
+        if len(compiled) != len(leaves):
+            problems.append(f'expected {len(leaves)} entries, found {len(compiled)}')
+        for path, value in leaves:
+            key = '.'.join(path)
+            found = compiled.get(key, default=_ABSENT)
+            if found is _ABSENT:
+                problems.append(f'{key}: missing')
+            elif found != value or type(found) is not type(value):
+                problems.append(f'{key}: expected {value!r}, found {found!r}')
+        if not problems:
+            rebuilt = compiled.to_catalog()
+            if json.dumps(rebuilt, ensure_ascii=False) != json.dumps(catalog, ensure_ascii=False):
+                problems.append('rebuilt catalog differs in structure or key order')
+    return problems
@@ -0,0 +1,72 @@
+"""Helpers for walking nested message catalogs by key path."""
+import json
+import os
+
+# Returned by get_path(..., default=MISSING) for absent paths
+MISSING = object()
+_RAISE = object()
+
+
+def iter_leaves(catalog, include_empty=False):
+    """Yield (path, value) for every non-dict value, in document order.
+
+    Paths are tuples of keys. Empty dicts have no leaves and are skipped
+    unless include_empty is set, in which case they are yielded as values.
+    """
+    stack = [((), iter(catalog.items()))]
+    while stack:
+        prefix, items = stack[-1]
+        for key, value in items:
+            if isinstance(value, dict) and (value or not include_empty):
+                stack.append((prefix + (key,), iter(value.items())))
+                break
+            yield prefix + (key,), value
+        else:
+            stack.pop()
+
+
+def get_path(catalog, path, default=_RAISE):
+    """Return the value at path, or default (KeyError if not given) when absent."""
+    node = catalog
+    for key in path:
+        if not isinstance(node, dict) or key not in node:
+            if default is _RAISE:
+                raise KeyError('.'.join(path))
+            return default
+        node = node[key]
+    return node
+
+
+def set_path(catalog, path, value):
+    """Set the value at path, creating (or replacing non-dict) parents as needed."""
+    node = catalog
+    for key in path[:-1]:
+        child = node.get(key)
+        if not isinstance(child, dict):
+            child = node[key] = {}
+        node = child
+    node[path[-1]] = value
+
+
+def from_leaves(leaves):
+    """Build a nested catalog from (path, value) pairs, keeping their order."""
+    catalog = {}
+    for path, value in leaves:
+        set_path(catalog, path, value)
+    return catalog
+
+
+def discover_locales(messages_dir):
+    """Locale codes with a <locale>.json catalog in messages_dir, sorted."""
+    return sorted(
+        file_name[:-len('.json')]
+        for file_name in os.listdir(messages_dir)
+        if file_name.endswith('.json') and not file_name.startswith('.')
+    )
+
+
+def iter_catalogs(messages_dir):
+    """Yield (locale, catalog) for every catalog in messages_dir, loading one at a time."""
+    for lang_code in discover_locales(messages_dir):
+        with open(os.path.join(messages_dir, f'{lang_code}.json'), 'r', encoding='utf-8') as f:
+            yield lang_code, json.load(f)
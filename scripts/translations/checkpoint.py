@@ -0,0 +1,258 @@
+"""Resumable, all-or-nothing sync for very large deliveries.
+
+A normal sync rewrites each locale as it goes, so a failure halfway leaves
+some catalogs updated and the rerun starts over. Here every locale is
+merged one top-level namespace at a time, and each merged namespace is
+checkpointed to the journal in <state-dir>/journal/ before the next one
+starts. A finished locale is staged next to its catalog as
+.<locale>.json.staged. Nothing in the catalogs changes until every locale
+has been staged; then the journal switches to its commit phase and the
+staged files are renamed into place.
+
+Running again after a failure resumes from the journal:
+
+    merge phase    locales already staged are kept, a half-done locale
+                   continues after its last checkpointed namespace, and
+                   only locales whose payload or catalog changed since are
+                   started over
+    commit phase   the remaining renames are finished first (roll forward),
+                   so the catalogs never stay half committed
+"""
+import json
+import os
+import shutil
+
+from fsutil import atomic_write, file_mode, fsync_directory
+from incremental import save_snapshot
+from json_writer import write_catalog
+from manifest import hash_bytes, hash_payload
+from merge import ChangeSet, deep_merge
+from sync import FAILED, UNCHANGED, UPDATED, LocaleResult
+
+JOURNAL_DIR = 'journal'
+JOURNAL_FILE = 'journal.json'
+JOURNAL_VERSION = 1
+STAGED_SUFFIX = '.staged'
+
+# Merged and journaled, but not committed because another locale failed
+STAGED = 'staged'
+
+MERGE_PHASE = 'merge'
+COMMIT_PHASE = 'commit'
+
+
+def staged_path(file_path):
+    directory, file_name = os.path.split(file_path)
+    return os.path.join(directory, f'.{file_name}{STAGED_SUFFIX}')
+
+
+def _dump_changes(changes):
+    return [[list(path) for path in paths] for paths in changes.__getstate__()]
+
+
+def _load_changes(data, changes):
+    for paths, stored in zip(changes.__getstate__(), data):
+        paths.extend(tuple(path) for path in stored)
+
+
+class Journal:
+    """Progress of a checkpointed run, saved (and fsynced) after every step."""
+
+    def __init__(self, state_dir):
+        self.directory = os.path.join(state_dir, JOURNAL_DIR)
+        self.path = os.path.join(self.directory, JOURNAL_FILE)
+        self.phase = MERGE_PHASE
+        # locale -> {'file', 'snapshot', 'payload', 'input', 'namespaces', 'staged'}
+        self.locales = {}
+
+    @classmethod
+    def load(cls, state_dir):
+        journal = cls(state_dir)
+        try:
+            with open(journal.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (FileNotFoundError, ValueError):
+            return journal
+        if data.get('version') == JOURNAL_VERSION:
+            journal.phase = data['phase']
+            journal.locales = data['locales']
+        return journal
+
+    def save(self):
+        os.makedirs(self.directory, exist_ok=True)
+        data = {'version': JOURNAL_VERSION, 'phase': self.phase, 'locales': self.locales}
+        atomic_write(self.path, json.dumps(data, ensure_ascii=False, indent=2, sort_keys=True).encode('utf-8'))
+
+    def checkpoint_path(self, lang_code, index):
+        return os.path.join(self.directory, lang_code, f'{index}.json')
+
+    def snapshot_path(self, lang_code):
+        # The payload snapshot, moved to the sync state once committed
+        return os.path.join(self.directory, f'{lang_code}.snapshot.json')
+
+    def forget(self, lang_code):
+        """Drop a locale's progress and its files."""
+        entry = self.locales.pop(lang_code, None)
+        shutil.rmtree(os.path.join(self.directory, lang_code), ignore_errors=True)
+        if os.path.exists(self.snapshot_path(lang_code)):
+            os.unlink(self.snapshot_path(lang_code))
+        if entry is not None and os.path.exists(staged_path(entry['file'])):
+            os.unlink(staged_path(entry['file']))
+
+    def clear(self):
+        for lang_code in list(self.locales):
+            self.forget(lang_code)
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+
+def _merge_locale(task, journal):
+    """Merge a locale namespace by namespace, checkpointing each; returns its result."""
+    lang_code = task.lang_code
+    with open(task.file_path, 'rb') as f:
+        existing_bytes = f.read()
+    payload_hash = hash_payload(task.translations)
+    input_hash = hash_bytes(existing_bytes)
+
+    entry = journal.locales.get(lang_code)
+    if entry is not None and (entry['payload'] != payload_hash or entry['input'] != input_hash):
+        # The delivery or the catalog changed since: that work no longer applies
+        journal.forget(lang_code)
+        entry = None
+
+    def result(status, output_hash, changes, bytes_written=0):
+        return LocaleResult(lang_code, task.file_path, status, payload_hash, output_hash, changes,
+                            bytes_read=len(existing_bytes), bytes_written=bytes_written)
+
+    # Already staged by an earlier attempt
+    if entry is not None and entry['staged'] is not None:
+        changes = ChangeSet()
+        _load_changes(entry['staged']['changes'], changes)
+        staged = entry['staged']
+        if staged['output'] == input_hash or os.path.exists(staged_path(task.file_path)):
+            return result(UPDATED if changes else UNCHANGED, staged['output'], changes, staged['size'])
+        journal.forget(lang_code)
+        entry = None
+
+    # Same payload merged into the same file we produced last time
+    previous = task.previous or {}
+    if previous.get('output') == input_hash and previous.get('payload') == payload_hash:
+        return result(UNCHANGED, input_hash, ChangeSet())
+
+    if entry is None:
+        entry = journal.locales[lang_code] = {
+            'file': task.file_path,
+            'snapshot': task.snapshot_path,
+            'payload': payload_hash,
+            'input': input_hash,
+            'namespaces': 0,
+            'staged': None,
+        }
+        journal.save()
+
+    catalog = json.loads(existing_bytes.decode('utf-8'))
+    changes = ChangeSet()
+    for index, (namespace, value) in enumerate(task.translations.items()):
+        checkpoint = journal.checkpoint_path(lang_code, index)
+        if index < entry['namespaces']:
+            # Merged before the interruption: take the result, don't merge again
+            with open(checkpoint, 'r', encoding='utf-8') as f:
+                done = json.load(f)
+            if done['namespace'] == namespace:
+                if 'value' in done:
+                    catalog[namespace] = done['value']
+                _load_changes(done['changes'], changes)
+                continue
+
+        namespace_changes = deep_merge(catalog, {namespace: value})
+        done = {'namespace': namespace, 'changes': _dump_changes(namespace_changes)}
+        if namespace_changes:
+            done['value'] = catalog[namespace]
+        os.makedirs(os.path.dirname(checkpoint), exist_ok=True)
+        atomic_write(checkpoint, json.dumps(done, ensure_ascii=False, separators=(',', ':')).encode('utf-8'))
+        _load_changes(done['changes'], changes)
+        entry['namespaces'] = index + 1
+        journal.save()
+
+    if changes:
+        staged = staged_path(task.file_path)
+        output_hash, size = write_catalog(staged, catalog)
+        # Keep the permissions of the catalog it replaces
+        os.chmod(staged, file_mode(task.file_path))
+    else:
+        output_hash, size = input_hash, 0
+    if task.snapshot_path:
+        save_snapshot(journal.snapshot_path(lang_code), task.translations)
+    entry['staged'] = {'output': output_hash, 'size': size, 'changes': _dump_changes(changes)}
+    journal.save()
+    # The staged file supersedes the namespace checkpoints
+    shutil.rmtree(os.path.join(journal.directory, lang_code), ignore_errors=True)
+    return result(UPDATED if changes else UNCHANGED, output_hash, changes, size)
+
+
+def _commit(journal):
+    """Rename every staged catalog (and snapshot) into place; safe to repeat after an interruption."""
+    directories = set()
+    for lang_code, entry in journal.locales.items():
+        if entry['staged'] is None:
+            continue
+        moves = [(staged_path(entry['file']), entry['file'])]
+        if entry.get('snapshot'):
+            moves.append((journal.snapshot_path(lang_code), entry['snapshot']))
+        for source, target in moves:
+            if os.path.exists(source):
+                os.makedirs(os.path.dirname(os.path.abspath(target)), exist_ok=True)
+                os.replace(source, target)
+                directories.add(os.path.dirname(os.path.abspath(target)))
+    for directory in sorted(directories):
+        fsync_directory(directory)
+
+
+def recover(journal):
+    """Finish a commit an earlier run was interrupted in; returns the locales it committed."""
+    if journal.phase != COMMIT_PHASE:
+        return []
+    _commit(journal)
+    committed = sorted(journal.locales)
+    journal.clear()
+    journal.phase = MERGE_PHASE
+    return committed
+
+
+def run_checkpointed(locales, make_task, state_dir, log=print):
+    """Sync locales through the journal; returns their results in locale order.
+
+    make_task(locale) builds the LocaleTask, loading its payload, so a
+    payload that fails to load fails only its own locale. If any locale
+    fails, the others come back STAGED and the catalogs are left untouched;
+    the next run resumes. Otherwise every staged catalog is committed. One
+    payload is held at a time.
+    """
+    journal = Journal.load(state_dir)
+    committed = recover(journal)
+    if committed:
+        log(f'Finished committing the interrupted sync of {", ".join(committed)}')
+
+    results = []
+    for lang_code in locales:
+        task = None
+        try:
+            task = make_task(lang_code)
+            results.append(_merge_locale(task, journal))
+        except Exception as e:
+            file_path = task.file_path if task is not None else None
+            results.append(LocaleResult(lang_code, file_path, FAILED, error=f'{type(e).__name__}: {e}'))
+
+    if any(result.status == FAILED for result in results):
+        for result in results:
+            if result.status != FAILED:
+                result.status = STAGED
+        return results
+
+    # Work left from an earlier attempt at locales this run doesn't include is stale
+    for lang_code in set(journal.locales) - {result.lang_code for result in results}:
+        journal.forget(lang_code)
+    journal.phase = COMMIT_PHASE
+    journal.save()
+    _commit(journal)
+    journal.clear()
+    return results
@@ -0,0 +1,147 @@
+"""Memory-compact catalogs: one shared key-path table, flat per-locale values.
+
+Nested dicts repeat every key ('title', 'description', ...) in every locale
+and pay a hash table per namespace and section. Here the key structure is
+stored once, in a KeyTable that gives each distinct key path a node id, and
+a CompactCatalog only holds
+
+    values  a list indexed by node id: the leaf value, BRANCH for a dict, or
+            MISSING where the locale doesn't have that path
+    order   the locale's node ids in document order (pre-order), as an array
+
+so catalogs with the same shape share all of their structure, and a
+cross-locale comparison is an index into a list. Conversion from and to
+nested dicts is lossless and keeps key order, empty dicts included.
+validate.py and diff.py compare catalogs in this form.
+"""
+from array import array
+
+from catalog import MISSING
+
+ROOT = 0
+
+
+class _Branch:
+    __slots__ = ()
+
+    def __repr__(self):
+        return 'BRANCH'
+
+
+# Value of a node that is a dict
+BRANCH = _Branch()
+
+
+class KeyTable:
+    """Interned key paths shared by any number of catalogs."""
+
+    __slots__ = ('parents', 'keys', '_ids', '_dotted')
+
+    def __init__(self):
+        self.parents = array('i', [-1])
+        self.keys = ['']
+        self._ids = {}
+        self._dotted = ['']
+
+    def __len__(self):
+        return len(self.keys)
+
+    def node(self, parent, key):
+        """Id of key under parent, adding it if new."""
+        node_id = self._ids.get((parent, key))
+        if node_id is None:
+            node_id = self._ids[(parent, key)] = len(self.keys)
+            self.parents.append(parent)
+            self.keys.append(key)
+            self._dotted.append(None)
+        return node_id
+
+    def path(self, node_id):
+        """The key path of node_id, as a tuple of keys."""
+        keys = []
+        while node_id != ROOT:
+            keys.append(self.keys[node_id])
+            node_id = self.parents[node_id]
+        return tuple(reversed(keys))
+
+    def dotted(self, node_id):
+        """'a.b.c' for node_id, built once and shared by every catalog."""
+        dotted = self._dotted[node_id]
+        if dotted is None:
+            # Climb to the nearest ancestor already built, then fill in downwards
+            pending = []
+            while dotted is None:
+                pending.append(node_id)
+                node_id = self.parents[node_id]
+                dotted = self._dotted[node_id]
+            for node_id in reversed(pending):
+                key = self.keys[node_id]
+                dotted = self._dotted[node_id] = f'{dotted}.{key}' if dotted else key
+        return dotted
+
+
+class CompactCatalog:
+    """One locale's catalog over a shared KeyTable."""
+
+    __slots__ = ('table', 'values', 'order')
+
+    def __init__(self, table):
+        self.table = table
+        self.values = []
+        self.order = array('I')
+
+    @classmethod
+    def from_catalog(cls, catalog, table):
+        compact = cls(table)
+        values, order = compact.values, compact.order
+        node = table.node
+        stack = [(ROOT, iter(catalog.items()))]
+        while stack:
+            parent, items = stack[-1]
+            for key, value in items:
+                node_id = node(parent, key)
+                if node_id >= len(values):
+                    values.extend([MISSING] * (node_id + 1 - len(values)))
+                order.append(node_id)
+                if isinstance(value, dict):
+                    values[node_id] = BRANCH
+                    stack.append((node_id, iter(value.items())))
+                    break
+                values[node_id] = value
+            else:
+                stack.pop()
+        return compact
+
+    def to_catalog(self):
+        """The nested dict this catalog stands for, in its original key order."""
+        catalog = {}
+        containers = {ROOT: catalog}
+        parents, keys, values = self.table.parents, self.table.keys, self.values
+        for node_id in self.order:
+            value = values[node_id]
+            if value is BRANCH:
+                value = containers[node_id] = {}
+            containers[parents[node_id]][keys[node_id]] = value
+        return catalog
+
+    def iter_leaves(self, include_empty=False):
+        """Yield (node id, value) for every non-dict value, in document order.
+
+        Empty dicts are skipped unless include_empty is set, as with
+        catalog.iter_leaves().
+        """
+        values, parents, order = self.values, self.table.parents, self.order
+        last = len(order) - 1
+        for index, node_id in enumerate(order):
+            value = values[node_id]
+            if value is not BRANCH:
+                yield node_id, value
+            # In pre-order, a dict with children is directly followed by its first child
+            elif include_empty and (index == last or parents[order[index + 1]] != node_id):
+                yield node_id, {}
+
+
+def compact_catalogs(catalogs, table=None):
+    """CompactCatalogs over one shared table from (locale, catalog) pairs, loaded one at a time."""
+    table = table or KeyTable()
+    return {lang_code: CompactCatalog.from_catalog(catalog, table) for lang_code, catalog in catalogs}
@@ -0,0 +1,116 @@
+"""Key-level diff of two sets of catalogs, as a per-locale changelog.
+
+Both sides are loaded as CompactCatalogs over one KeyTable (see
+compact.py), so a key path has the same node id in every locale on either
+side. Comparing a locale is then a pass over its leaves, matched by node
+id, instead of looking each key up in nested dicts; key paths are only
+spelled out for the keys that changed.
+
+A key that turns from a string into a section (or back) shows up as the
+old leaves removed and the new ones added.
+"""
+import json
+import os
+import subprocess
+
+from compact import KeyTable, compact_catalogs
+from merge import same_value
+
+
+class DiffError(Exception):
+    pass
+
+
+def _diff_locale(old, new, table):
+    old_leaves = dict(old.iter_leaves(include_empty=True)) if old else {}
+    new_leaves = dict(new.iter_leaves(include_empty=True)) if new else {}
+    added = [(node_id, value) for node_id, value in new_leaves.items() if node_id not in old_leaves]
+    removed = [(node_id, value) for node_id, value in old_leaves.items() if node_id not in new_leaves]
+    changed = [
+        (node_id, old_value, new_leaves[node_id]) for node_id, old_value in old_leaves.items()
+        if node_id in new_leaves and not same_value(old_value, new_leaves[node_id])
+    ]
+    if not (added or removed or changed):
+        return None
+
+    def keyed(entries):
+        entries.sort(key=lambda entry: table.path(entry[0]))
+        return [(table.dotted(node_id), *values) for node_id, *values in entries]
+
+    return {'added': keyed(added), 'removed': keyed(removed), 'changed': keyed(changed)}
+
+
+def diff_catalogs(old, new):
+    """Compare {locale: catalog} mappings; returns {locale: changelog} for locales that differ.
+
+    A changelog has 'added' [(key, value)], 'removed' [(key, value)] and
+    'changed' [(key, old value, new value)], each sorted by key. A locale on
+    one side only is all added or all removed.
+    """
+    table = KeyTable()
+    old_compact = compact_catalogs(old.items(), table)
+    new_compact = compact_catalogs(new.items(), table)
+    changelogs = {}
+    for lang_code in sorted(old_compact.keys() | new_compact.keys()):
+        changelog = _diff_locale(old_compact.get(lang_code), new_compact.get(lang_code), table)
+        if changelog is not None:
+            changelogs[lang_code] = changelog
+    return changelogs
+
+
+def _git(*args):
+    try:
+        result = subprocess.run(['git', *args], capture_output=True, check=True)
+    except FileNotFoundError:
+        raise DiffError('git is not installed') from None
+    except subprocess.CalledProcessError as e:
+        raise DiffError(e.stderr.decode('utf-8', 'replace').strip() or f'git {args[0]} failed') from None
+    return result.stdout
+
+
+def git_catalogs(revision, messages_dir):
+    """Yield (locale, catalog) for the catalogs in messages_dir as of a git revision."""
+    directory = os.path.relpath(messages_dir).replace(os.sep, '/')
+    names = _git('ls-tree', '--name-only', revision, '--', f'{directory}/').decode('utf-8').splitlines()
+    for name in sorted(names):
+        file_name = name.rsplit('/', 1)[-1]
+        if not file_name.endswith('.json') or file_name.startswith('.'):
+            continue
+        data = _git('show', f'{revision}:./{directory}/{file_name}')
+        try:
+            catalog = json.loads(data.decode('utf-8'))
+        except ValueError as e:
+            raise DiffError(f'{file_name} at {revision} is not valid JSON: {e}') from None
+        yield file_name[:-len('.json')], catalog
+
+
+def _format_value(value):
+    return json.dumps(value, ensure_ascii=False)
+
+
+def format_changelog(changelogs):
+    """Compact text changelog: a summary line per locale, then one line per key."""
+    lines = []
+    for lang_code, changes in changelogs.items():
+        lines.append(f'{lang_code}: {len(changes["added"])} added, {len(changes["removed"])} removed, '
+                     f'{len(changes["changed"])} changed')
+        for key, value in changes['added']:
+            lines.append(f'  + {key}: {_format_value(value)}')
+        for key, value in changes['removed']:
+            lines.append(f'  - {key}: {_format_value(value)}')
+        for key, old_value, new_value in changes['changed']:
+            lines.append(f'  ~ {key}: {_format_value(old_value)} -> {_format_value(new_value)}')
+    return '\n'.join(lines)
+
+
+def changelog_report(changelogs):
+    """The changelogs as JSON-serializable dicts."""
+    return {
+        lang_code: {
+            'added': [{'key': key, 'value': value} for key, value in changes['added']],
+            'removed': [{'key': key, 'value': value} for key, value in changes['removed']],
+            'changed': [{'key': key, 'old': old_value, 'new': new_value}
+                        for key, old_value, new_value in changes['changed']],
+        }
+        for lang_code, changes in changelogs.items()
+    }
@@ -0,0 +1,94 @@
+"""Fully resolved message bundles built from locale fallback chains.
+
+A chain lists the locales to try in order, e.g. pt-BR -> pt -> en. The
+bundle of a locale is its own catalog with every missing key filled from
+the rest of its chain, so the app only ever needs one catalog per request.
+
+Bundles share structure: a subtree missing from a locale is the fallback
+bundle's subtree object itself, and a subtree that needs nothing filled is
+the locale's own. Only dicts on the path to a filled key are new, so many
+locales falling back to en cost little more than en itself.
+"""
+import re
+
+from catalog import iter_leaves
+
+_SUBTAG = re.compile(r'[-_][^-_]+$')
+
+
+def default_chain(lang_code, default_locale):
+    """pt-BR -> [pt-BR, pt, en]: drop subtags one at a time, then the default."""
+    chain = [lang_code]
+    while _SUBTAG.search(chain[-1]):
+        chain.append(_SUBTAG.sub('', chain[-1]))
+    if default_locale not in chain:
+        chain.append(default_locale)
+    return chain
+
+
+def parse_chain(spec):
+    """'pt-BR=pt,en' -> ('pt-BR', ['pt-BR', 'pt', 'en'])."""
+    lang_code, separator, rest = spec.partition('=')
+    fallbacks = [code.strip() for code in rest.split(',') if code.strip()]
+    if not separator or not lang_code.strip() or not fallbacks:
+        raise ValueError(f'Invalid fallback chain {spec!r}; expected LOCALE=FALLBACK[,FALLBACK...]')
+    lang_code = lang_code.strip()
+    return lang_code, [lang_code] + [code for code in fallbacks if code != lang_code]
+
+
+def _overlay(own, fallback, prefix, filled):
+    """own with missing keys taken from fallback, sharing every untouched subtree."""
+    if not isinstance(own, dict) or not isinstance(fallback, dict):
+        return own
+    merged = None
+    for key, value in own.items():
+        if isinstance(value, dict) and key in fallback:
+            resolved = _overlay(value, fallback[key], prefix + (key,), filled)
+            if resolved is not value:
+                if merged is None:
+                    merged = dict(own)
+                merged[key] = resolved
+    for key, value in fallback.items():
+        if key not in own:
+            if merged is None:
+                merged = dict(own)
+            merged[key] = value
+            filled.append(prefix + (key,))
+    return own if merged is None else merged
+
+
+class Resolver:
+    """Resolves and memoizes bundles for chains over a set of catalogs."""
+
+    def __init__(self, catalogs):
+        self.catalogs = catalogs
+        # chain tuple -> (bundle, {dotted key: locale it came from})
+        self._bundles = {}
+
+    def resolve(self, chain):
+        """Return (bundle, provenance) for chain; provenance maps filled keys to their locale."""
+        chain = tuple(code for code in chain if code in self.catalogs) or tuple(chain[-1:])
+        if chain in self._bundles:
+            return self._bundles[chain]
+
+        head = chain[0]
+        own = self.catalogs.get(head, {})
+        if len(chain) == 1:
+            result = own, {}
+        else:
+            tail = chain[1:]
+            fallback, fallback_provenance = self.resolve(tail)
+            filled = []
+            bundle = _overlay(own, fallback, (), filled)
+            provenance = {}
+            for path in filled:
+                subtree = fallback
+                for key in path:
+                    subtree = subtree[key]
+                leaves = iter_leaves(subtree, include_empty=True) if isinstance(subtree, dict) else [((), subtree)]
+                for leaf_path, _ in leaves:
+                    dotted = '.'.join(path + leaf_path)
+                    provenance[dotted] = fallback_provenance.get(dotted, tail[0])
+            result = bundle, provenance
+        self._bundles[chain] = result
+        return result
@@ -0,0 +1,129 @@
+"""Filesystem helpers shared by the translation scripts."""
+import hashlib
+import os
+import stat
+import tempfile
+
+WRITE_BUFFER_SIZE = 1 << 16
+
+
+def file_mode(file_path):
+    """Permission bits of file_path, or the umask default for a new file."""
+    try:
+        return stat.S_IMODE(os.stat(file_path).st_mode)
+    except FileNotFoundError:
+        umask = os.umask(0)
+        os.umask(umask)
+        return 0o666 & ~umask
+
+
+def atomic_write_pieces(file_path, pieces, batch=None):
+    """Write an iterable of byte strings to file_path atomically, returning (sha256, size).
+
+    The data goes to a temp file in the same directory, which is fsynced and
+    then moved over file_path with os.replace(), keeping its permissions.
+    With a WriteBatch the fsync and rename are left to batch.commit().
+    """
+    directory = os.path.dirname(os.path.abspath(file_path))
+    mode = file_mode(file_path)
+    digest = hashlib.sha256()
+    size = 0
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.', suffix='.tmp')
+    try:
+        # mkstemp creates 0600 files; keep the permissions the file had
+        os.fchmod(fd, mode)
+        with os.fdopen(fd, 'wb', buffering=WRITE_BUFFER_SIZE) as f:
+            for piece in pieces:
+                digest.update(piece)
+                size += len(piece)
+                f.write(piece)
+            f.flush()
+            if batch is None:
+                os.fsync(f.fileno())
+        if batch is None:
+            os.replace(tmp_path, file_path)
+        else:
+            batch.staged.append((tmp_path, file_path))
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+    return digest.hexdigest(), size
+
+
+class WriteBatch:
+    """Atomic writes whose fsync and rename are deferred.
+
+    Files written with batch=... stay in temp files until commit(). This
+    lets a caller fsync many files concurrently (flush()) instead of paying
+    one round-trip per write, which is what dominates on network
+    filesystems, and keep a failed job's files out of the tree (discard()).
+    """
+
+    def __init__(self):
+        # (temp path, target path) in write order
+        self.staged = []
+        self.removals = []
+
+    def remove(self, file_path):
+        """Delete file_path when the batch is committed."""
+        self.removals.append(file_path)
+
+    def flush(self):
+        """fsync every staged temp file."""
+        for tmp_path, _ in self.staged:
+            fd = os.open(tmp_path, os.O_RDONLY)
+            try:
+                os.fsync(fd)
+            finally:
+                os.close(fd)
+
+    def commit(self):
+        """Move the staged files into place; returns the directories that changed."""
+        directories = set()
+        for tmp_path, file_path in self.staged:
+            os.replace(tmp_path, file_path)
+            directories.add(os.path.dirname(os.path.abspath(file_path)))
+        for file_path in self.removals:
+            if os.path.exists(file_path):
+                os.unlink(file_path)
+                directories.add(os.path.dirname(os.path.abspath(file_path)))
+        self.staged, self.removals = [], []
+        return directories
+
+    def discard(self):
+        for tmp_path, _ in self.staged:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+        self.staged, self.removals = [], []
+
+
+def fsync_directory(directory):
+    """Persist renames and deletions in directory (a no-op where unsupported)."""
+    try:
+        fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def atomic_write(file_path, data, batch=None):
+    """Write bytes to file_path atomically, returning (sha256, size)."""
+    return atomic_write_pieces(file_path, [data], batch)
+
+
+def write_if_changed(file_path, data, batch=None):
+    """Atomically write data unless file_path already holds exactly those bytes."""
+    try:
+        with open(file_path, 'rb') as f:
+            if f.read() == data:
+                return False
+    except FileNotFoundError:
+        pass
+    atomic_write(file_path, data, batch)
+    return True
@@ -0,0 +1,187 @@
+"""Codepoints each locale's messages need, for subsetting the invoice fonts.
+
+The messages of a namespace (by default invoiceTemplate and emailTemplate,
+the ones rendered into invoice PDFs and emails) are parsed as ICU, and only
+the text that can end up on the page is counted: literals, plural and
+select branches and tag contents, plus digits and separators wherever a
+number or date is formatted. Argument names and ICU syntax are not.
+
+Per locale we record the codepoints as CSS unicode-range strings, which is
+what both @font-face and `pyftsubset --unicodes` take, the Google Fonts
+subsets that cover them and a rough subset size. Entries are keyed by the
+hash of the messages they were computed from, so unchanged locales are not
+scanned again.
+"""
+import json
+import os
+import unicodedata
+
+from fsutil import write_if_changed
+from icu import DATE, LITERAL, NUMBER, PLURAL, POUND, SELECT, TAG, TIME, IcuSyntaxError, parse
+from manifest import hash_bytes
+
+VERSION = 1
+INDEX_FILE = 'glyphs.json'
+NAMESPACES = ('invoiceTemplate', 'emailTemplate')
+# What formatted numbers and dates may need beyond the message text
+NUMERIC_TEXT = '0123456789 .,:/-+%'
+
+# unicode-range of the Google Fonts subsets next/font can load
+SUBSETS = {
+    'latin': 'U+0000-00FF,U+0131,U+0152-0153,U+02BB-02BC,U+02C6,U+02DA,U+02DC,U+0304,U+0308,U+0329,'
+             'U+2000-206F,U+20AC,U+2122,U+2191,U+2193,U+2212,U+2215,U+FEFF,U+FFFD',
+    'latin-ext': 'U+0100-02BA,U+02BD-02C5,U+02C7-02CC,U+02CE-02D7,U+02DD-02FF,U+0304,U+0308,U+0329,U+1D00-1DBF,'
+                 'U+1E00-1E9F,U+1EF2-1EFF,U+2020,U+20A0-20AB,U+20AD-20C0,U+2113,U+2C60-2C7F,U+A720-A7FF',
+    'vietnamese': 'U+0102-0103,U+0110-0111,U+0128-0129,U+0168-0169,U+01A0-01A1,U+01AF-01B0,U+0300-0301,'
+                  'U+0303-0304,U+0308-0309,U+0323,U+0329,U+1EA0-1EF9,U+20AB',
+    'cyrillic': 'U+0301,U+0400-045F,U+0490-0491,U+04B0-04B1,U+2116',
+    'greek': 'U+0370-0377,U+037A-037F,U+0384-038A,U+038C,U+038E-03A1,U+03A3-03FF',
+}
+# Rough outline sizes in a subset font; CJK ideographs are far more complex
+GLYPH_BYTES = 120
+WIDE_GLYPH_BYTES = 1000
+
+
+def parse_ranges(ranges):
+    """'U+0041-005A,U+00E9' -> set of codepoints."""
+    codepoints = set()
+    for part in ranges.split(','):
+        start, _, end = part.strip()[2:].partition('-')
+        codepoints.update(range(int(start, 16), int(end or start, 16) + 1))
+    return codepoints
+
+
+def format_ranges(codepoints):
+    """Sorted codepoints -> 'U+0041-005A,U+00E9'."""
+    parts = []
+    run_start = previous = None
+    for codepoint in sorted(codepoints):
+        if previous is not None and codepoint == previous + 1:
+            previous = codepoint
+            continue
+        if run_start is not None:
+            parts.append(_range(run_start, previous))
+        run_start = previous = codepoint
+    if run_start is not None:
+        parts.append(_range(run_start, previous))
+    return ','.join(parts)
+
+
+def _range(start, end):
+    return f'U+{start:04X}' if start == end else f'U+{start:04X}-{end:04X}'
+
+
+_SUBSET_CODEPOINTS = {name: parse_ranges(ranges) for name, ranges in SUBSETS.items()}
+
+
+def rendered_text(nodes, parts):
+    """Append the text an ICU AST can render to parts."""
+    for node in nodes:
+        kind = node['type']
+        if kind == LITERAL:
+            parts.append(node['value'])
+        elif kind in (NUMBER, DATE, TIME, POUND):
+            parts.append(NUMERIC_TEXT)
+        elif kind in (SELECT, PLURAL):
+            for option in node['options'].values():
+                rendered_text(option['value'], parts)
+        elif kind == TAG:
+            rendered_text(node['children'], parts)
+    return parts
+
+
+def message_codepoints(message):
+    try:
+        text = ''.join(rendered_text(parse(message), []))
+    except IcuSyntaxError:
+        # Invalid ICU is shown as is
+        text = message
+    # Line breaks and other control characters have no glyph
+    return {ord(char) for char in text if unicodedata.category(char) != 'Cc'}
+
+
+def _strings(value):
+    if isinstance(value, str):
+        yield value
+    elif isinstance(value, dict):
+        for child in value.values():
+            yield from _strings(child)
+
+
+def inventory(catalog, namespaces):
+    """{namespace: set of codepoints} for the namespaces catalog has."""
+    found = {}
+    for namespace in namespaces:
+        if namespace in catalog:
+            codepoints = set()
+            for message in _strings(catalog[namespace]):
+                codepoints |= message_codepoints(message)
+            found[namespace] = codepoints
+    return found
+
+
+def coverage_report(codepoints, loaded_subsets):
+    """Subsets needed for codepoints, what they miss, and a rough subset size."""
+    needed = []
+    remaining = set(codepoints)
+    for name, subset in _SUBSET_CODEPOINTS.items():
+        if remaining & subset:
+            needed.append(name)
+            remaining -= subset
+    loaded = set().union(*(_SUBSET_CODEPOINTS[name] for name in loaded_subsets))
+    wide = sum(1 for codepoint in codepoints if unicodedata.east_asian_width(chr(codepoint)) in 'WF')
+    return {
+        'codepoints': len(codepoints),
+        'subsets': needed,
+        # Not in any Google Fonts subset above, e.g. CJK: needs a font that has them
+        'uncovered': format_ranges(remaining),
+        'missing_from_loaded': format_ranges(set(codepoints) - loaded),
+        'loaded_coverage': round(len(set(codepoints) & loaded) / len(codepoints), 4) if codepoints else 1.0,
+        'estimated_subset_bytes': (len(codepoints) - wide) * GLYPH_BYTES + wide * WIDE_GLYPH_BYTES,
+    }
+
+
+def load_index(out_dir):
+    try:
+        with open(os.path.join(out_dir, INDEX_FILE), 'r', encoding='utf-8') as f:
+            index = json.load(f)
+    except (FileNotFoundError, ValueError):
+        return {}
+    return index if index.get('version') == VERSION else {}
+
+
+def build_inventory(bundles, out_dir, namespaces=NAMESPACES, loaded_subsets=('latin',)):
+    """Write <out_dir>/<locale>.txt (the characters) and glyphs.json for (locale, bundle) pairs.
+
+    Returns ({locale: entry}, number of locales taken from the previous run).
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    previous = load_index(out_dir).get('locales', {})
+    locales = {}
+    reused = 0
+    for lang_code, bundle in bundles:
+        messages = {namespace: bundle[namespace] for namespace in namespaces if namespace in bundle}
+        source = hash_bytes(json.dumps([VERSION, messages], ensure_ascii=False, sort_keys=True).encode('utf-8'))
+        entry = previous.get(lang_code)
+        if entry is not None and entry.get('source') == source:
+            reused += 1
+            codepoints = parse_ranges(entry['unicodes']) if entry['unicodes'] else set()
+        else:
+            found = inventory(bundle, namespaces)
+            codepoints = set().union(*found.values())
+            entry = {
+                'source': source,
+                'unicodes': format_ranges(codepoints),
+                'namespaces': {namespace: format_ranges(points) for namespace, points in found.items()},
+            }
+        # Cheap, and depends on loaded_subsets, so never cached
+        entry['coverage'] = coverage_report(codepoints, loaded_subsets)
+        locales[lang_code] = entry
+        text = ''.join(chr(codepoint) for codepoint in sorted(codepoints))
+        write_if_changed(os.path.join(out_dir, f'{lang_code}.txt'), text.encode('utf-8'))
+
+    index = {'version': VERSION, 'namespaces': list(namespaces), 'loaded_subsets': list(loaded_subsets),
+             'locales': locales}
+    write_if_changed(os.path.join(out_dir, INDEX_FILE),
+                     json.dumps(index, indent=2, ensure_ascii=False, sort_keys=True).encode('utf-8'))
+    return locales, reused
@@ -0,0 +1,289 @@
+"""ICU MessageFormat parser following intl-messageformat's rules.
+
+parse() returns the same AST shape as @formatjs/icu-messageformat-parser
+(without locations), so the output can be handed to IntlMessageFormat as a
+pre-parsed message:
+
+    {'type': LITERAL, 'value': 'Email sent to '}
+    {'type': ARGUMENT, 'value': 'recipient'}
+    {'type': PLURAL, 'value': 'count', 'offset': 0, 'pluralType': 'cardinal',
+     'options': {'=0': {'value': [...]}, 'other': {'value': [...]}}}
+"""
+import re
+
+# Node types, numbered as in @formatjs/icu-messageformat-parser
+LITERAL = 0
+ARGUMENT = 1
+NUMBER = 2
+DATE = 3
+TIME = 4
+SELECT = 5
+PLURAL = 6
+POUND = 7
+TAG = 8
+
+_SIMPLE_TYPES = {'number': NUMBER, 'date': DATE, 'time': TIME}
+_WHITESPACE = re.compile(r'[ \t\n\r]*')
+# Argument names, types and selectors run up to whitespace or a syntax character
+_NAME = re.compile(r"[^ \t\n\r,{}<>#']+")
+_TAG_NAME = re.compile(r'[A-Za-z][\w.-]*')
+_OFFSET = re.compile(r'-?\d+')
+# Runs of characters that are plain text in any context
+_PLAIN_TEXT = re.compile(r"[^{}#<']+")
+# Messages made only of text and plain {name} arguments, the common case
+_SIMPLE_TEXT = r"(?:[^{}<']|'(?![{}<>']))*"
+_SIMPLE_MESSAGE = re.compile(rf"^{_SIMPLE_TEXT}(?:\{{\s*[^\s{{}},<>#']+\s*\}}{_SIMPLE_TEXT})*$")
+_SIMPLE_ARGUMENT = re.compile(r'\{\s*([^\s{},<>#\']+)\s*\}')
+
+
+class IcuSyntaxError(ValueError):
+    def __init__(self, message, offset, source):
+        self.offset = offset
+        self.source = source
+        super().__init__(f'{message} at offset {offset}')
+
+
+class _Parser:
+    def __init__(self, source):
+        self.source = source
+        self.position = 0
+
+    def error(self, message, offset=None):
+        raise IcuSyntaxError(message, self.position if offset is None else offset, self.source)
+
+    def peek(self, offset=0):
+        index = self.position + offset
+        return self.source[index] if index < len(self.source) else ''
+
+    def skip_whitespace(self):
+        self.position = _WHITESPACE.match(self.source, self.position).end()
+
+    def expect(self, char):
+        if self.peek() != char:
+            self.error(f'Expected {char!r}')
+        self.position += 1
+
+    def parse_message(self, depth, parent_type, closing_tag=None):
+        nodes = []
+        text = []
+
+        def flush():
+            if text:
+                nodes.append({'type': LITERAL, 'value': ''.join(text)})
+                text.clear()
+
+        while self.position < len(self.source):
+            char = self.peek()
+            if char == '{':
+                flush()
+                nodes.append(self.parse_argument(depth))
+            elif char == '}' and depth > 0:
+                break
+            elif char == '#' and parent_type in ('plural', 'selectordinal'):
+                flush()
+                nodes.append({'type': POUND})
+                self.position += 1
+            elif char == '<' and self.peek(1) == '/':
+                if closing_tag is None:
+                    self.error('Unmatched closing tag')
+                break
+            elif char == '<' and _TAG_NAME.match(self.source, self.position + 1):
+                tag = self.parse_tag(depth, parent_type)
+                if tag['type'] == LITERAL:
+                    text.append(tag['value'])
+                else:
+                    flush()
+                    nodes.append(tag)
+            elif char == "'":
+                text.append(self.parse_quote(parent_type))
+            else:
+                match = _PLAIN_TEXT.match(self.source, self.position)
+                end = match.end() if match else self.position + 1
+                text.append(self.source[self.position:end])
+                self.position = end
+        flush()
+        return nodes
+
+    def parse_quote(self, parent_type):
+        # "''" is an apostrophe; "'" only starts quoting before syntax chars
+        following = self.peek(1)
+        if following == "'":
+            self.position += 2
+            return "'"
+        quotable = '{}<>' + ('#' if parent_type in ('plural', 'selectordinal') else '')
+        if not following or following not in quotable:
+            self.position += 1
+            return "'"
+
+        self.position += 1
+        quoted = []
+        while self.position < len(self.source):
+            char = self.peek()
+            if char == "'":
+                if self.peek(1) == "'":
+                    quoted.append("'")
+                    self.position += 2
+                    continue
+                self.position += 1
+                break
+            quoted.append(char)
+            self.position += 1
+        return ''.join(quoted)
+
+    def parse_tag(self, depth, parent_type):
+        start = self.position
+        name = _TAG_NAME.match(self.source, start + 1).group(0)
+        self.position = start + 1 + len(name)
+        self.skip_whitespace()
+        if self.source.startswith('/>', self.position):
+            # Self-closing tags are kept as literal text
+            self.position += 2
+            return {'type': LITERAL, 'value': self.source[start:self.position]}
+        self.expect('>')
+
+        children = self.parse_message(depth, parent_type, closing_tag=name)
+        if not self.source.startswith('</', self.position):
+            self.error(f'Unclosed tag <{name}>', start)
+        self.position += 2
+        closing = _TAG_NAME.match(self.source, self.position)
+        if closing is None or closing.group(0) != name:
+            self.error(f'Mismatched closing tag for <{name}>')
+        self.position = closing.end()
+        self.skip_whitespace()
+        self.expect('>')
+        return {'type': TAG, 'value': name, 'children': children}
+
+    def parse_name(self):
+        match = _NAME.match(self.source, self.position)
+        if match is None:
+            self.error('Expected an argument name')
+        self.position = match.end()
+        return match.group(0)
+
+    def parse_argument(self, depth):
+        start = self.position
+        self.expect('{')
+        self.skip_whitespace()
+        if self.peek() == '}':
+            self.error('Empty argument', start)
+        name = self.parse_name()
+        self.skip_whitespace()
+        if self.peek() == '}':
+            self.position += 1
+            return {'type': ARGUMENT, 'value': name}
+        if self.peek() != ',':
+            self.error(f'Malformed argument {name!r}')
+
+        self.position += 1
+        self.skip_whitespace()
+        argument_type = self.parse_name()
+        self.skip_whitespace()
+
+        if argument_type in _SIMPLE_TYPES:
+            style = None
+            if self.peek() == ',':
+                self.position += 1
+                style = self.parse_style()
+            self.expect('}')
+            return {'type': _SIMPLE_TYPES[argument_type], 'value': name, 'style': style}
+
+        if argument_type in ('plural', 'selectordinal', 'select'):
+            self.expect(',')
+            offset = 0
+            self.skip_whitespace()
+            if argument_type != 'select' and self.source.startswith('offset:', self.position):
+                self.position += len('offset:')
+                self.skip_whitespace()
+                match = _OFFSET.match(self.source, self.position)
+                if match is None:
+                    self.error('Invalid plural offset')
+                offset = int(match.group(0))
+                self.position = match.end()
+            options = self.parse_options(depth, argument_type)
+            self.expect('}')
+            if argument_type == 'select':
+                return {'type': SELECT, 'value': name, 'options': options}
+            return {
+                'type': PLURAL,
+                'value': name,
+                'offset': offset,
+                'pluralType': 'ordinal' if argument_type == 'selectordinal' else 'cardinal',
+                'options': options,
+            }
+
+        self.error(f'Invalid argument type {argument_type!r}')
+
+    def parse_style(self):
+        # Styles (e.g. 'percent', '::currency/EUR') run to the closing brace;
+        # quoted and nested braces are allowed
+        start = self.position
+        nesting = 0
+        while self.position < len(self.source):
+            char = self.peek()
+            if char == "'":
+                end = self.source.find("'", self.position + 1)
+                self.position = len(self.source) if end < 0 else end + 1
+                continue
+            if char == '{':
+                nesting += 1
+            elif char == '}':
+                if nesting == 0:
+                    break
+                nesting -= 1
+            self.position += 1
+        return self.source[start:self.position].strip()
+
+    def parse_options(self, depth, argument_type):
+        options = {}
+        while True:
+            self.skip_whitespace()
+            if self.peek() in ('}', ''):
+                break
+            start = self.position
+            selector = self.parse_name()
+            if selector in options:
+                self.error(f'Duplicate selector {selector!r}', start)
+            self.skip_whitespace()
+            self.expect('{')
+            value = self.parse_message(depth + 1, argument_type)
+            self.expect('}')
+            options[selector] = {'value': value}
+        if 'other' not in options:
+            self.error(f'Missing "other" clause in {argument_type}')
+        return options
+
+
+def parse(message):
+    """Parse an ICU message into intl-messageformat AST nodes."""
+    parser = _Parser(message)
+    nodes = parser.parse_message(0, None)
+    if parser.position != len(message):
+        parser.error('Unexpected character')
+    return nodes
+
+
+def argument_names(nodes):
+    """Names of every argument referenced by the AST, including nested ones."""
+    names = set()
+    stack = list(nodes)
+    while stack:
+        node = stack.pop()
+        node_type = node['type']
+        if node_type in (ARGUMENT, NUMBER, DATE, TIME):
+            names.add(node['value'])
+        elif node_type in (SELECT, PLURAL):
+            names.add(node['value'])
+            for option in node['options'].values():
+                stack.extend(option['value'])
+        elif node_type == TAG:
+            stack.extend(node['children'])
+    return names
+
+
+def message_arguments(message):
+    """Argument names used by message; raises IcuSyntaxError if it doesn't parse."""
+    if '{' not in message and '<' not in message:
+        return set()
+    if _SIMPLE_MESSAGE.match(message):
+        return set(_SIMPLE_ARGUMENT.findall(message))
+    return argument_names(parse(message))
@@ -0,0 +1,54 @@
+"""Snapshots of applied TRANSLATIONS payloads and the deltas between them.
+
+After a successful sync the payload applied to each locale is kept in
+<state-dir>/snapshots/<locale>.json. The next incremental run only has to
+apply the leaves that differ from that snapshot, which for a catalog we
+wrote ourselves gives the same result as merging the whole payload again.
+When the delta only overwrites scalar values they are patched straight into
+the file's bytes, so anything outside those values (such as a trailing
+newline added by prettier) is kept as it was.
+"""
+import json
+import os
+
+from catalog import MISSING, get_path, iter_leaves
+from fsutil import write_if_changed
+from json_writer import dumps_catalog
+from merge import same_value
+
+SNAPSHOT_DIR = 'snapshots'
+
+
+def snapshot_path(state_dir, lang_code):
+    return os.path.join(state_dir, SNAPSHOT_DIR, f'{lang_code}.json')
+
+
+def load_snapshot(path):
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return None
+
+
+def save_snapshot(path, translations, batch=None):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    write_if_changed(path, dumps_catalog(translations), batch)
+
+
+def payload_delta(snapshot, translations):
+    """Return the (path, value) leaves of translations that differ from snapshot.
+
+    Keys dropped from the payload are not part of the delta: deep_merge
+    never removes keys, so they simply stay in the catalogs.
+    """
+    delta = []
+    for path, value in iter_leaves(translations, include_empty=True):
+        old_value = get_path(snapshot, path, default=MISSING)
+        if isinstance(value, dict):
+            # An empty dict only needs applying if it wasn't there before
+            if not isinstance(old_value, dict):
+                delta.append((path, value))
+        elif old_value is MISSING or isinstance(old_value, dict) or not same_value(old_value, value):
+            delta.append((path, value))
+    return delta
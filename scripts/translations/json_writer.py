@@ -0,0 +1,171 @@
+"""Writer for message catalogs.
+
+Catalogs are encoded exactly as json.dump(catalog, f, indent=2,
+ensure_ascii=False) would, with the encoder's own iterencode(), and the
+pieces are streamed through a buffer into an atomic write, hashed as they
+go.
+"""
+import hashlib
+import json
+import mmap
+import os
+
+from catalog import get_path
+from fsutil import WRITE_BUFFER_SIZE, atomic_write_pieces
+from merge import same_value
+from telemetry import NULL_TIMER
+
+INDENT = '  '
+# In-place patching is only worth it for a handful of values
+MAX_IN_PLACE_CHANGES = 64
+
+_ENCODER = json.JSONEncoder(indent=len(INDENT), ensure_ascii=False)
+
+
+def _encoded_batches(chunks):
+    # Join small chunks before encoding so hashing and writing work on
+    # WRITE_BUFFER_SIZE pieces instead of individual tokens
+    batch = []
+    batch_size = 0
+    for chunk in chunks:
+        batch.append(chunk)
+        batch_size += len(chunk)
+        if batch_size >= WRITE_BUFFER_SIZE:
+            yield ''.join(batch).encode('utf-8')
+            batch = []
+            batch_size = 0
+    if batch:
+        yield ''.join(batch).encode('utf-8')
+
+
+def dumps_catalog(catalog):
+    """Encode catalog to bytes, for documents small enough to hold in memory."""
+    return _ENCODER.encode(catalog).encode('utf-8')
+
+
+def write_catalog(file_path, catalog, timer=NULL_TIMER, batch=None):
+    """Stream catalog to file_path atomically, returning (sha256, size) of what was written.
+
+    Time spent encoding is charged to the timer's 'serialize' phase.
+    """
+    pieces = timer.wrap('serialize', _encoded_batches(_ENCODER.iterencode(catalog)))
+    return atomic_write_pieces(file_path, pieces, batch)
+
+
+def _locate_value(data, path):
+    """Find the byte span of the scalar value at path in 2-space indented JSON.
+
+    Relies on the layout json.dump(indent=2) produces: every object member
+    sits on its own line at an indentation matching its depth, and raw
+    newlines never occur inside strings. Each key is searched for only
+    within the span of its parent object.
+    """
+    start, end = 0, len(data)
+    for depth, key in enumerate(path, 1):
+        needle = ('\n' + INDENT * depth + _ENCODER.encode(key) + ': ').encode('utf-8')
+        position = data.find(needle, start, end)
+        if position < 0:
+            return None
+        value_start = position + len(needle)
+        if depth < len(path):
+            if data[value_start:value_start + 1] != b'{':
+                return None
+            start = value_start
+            end = data.find(('\n' + INDENT * depth + '}').encode('utf-8'), value_start, end)
+            if end < 0:
+                return None
+
+    # The last member of an object ends at the newline before its closing brace
+    value_end = data.find(b'\n', value_start, end + 1)
+    if value_end < 0:
+        return None
+    if data[value_end - 1:value_end] == b',':
+        value_end -= 1
+
+    # Only plain scalars are patched; anything else falls back to a full write
+    try:
+        old_value = json.loads(data[value_start:value_end])
+    except ValueError:
+        return None
+    if isinstance(old_value, (dict, list)):
+        return None
+    return value_start, value_end, old_value
+
+
+def plan_patches(existing_bytes, values):
+    """Locate each (path, new value) in existing_bytes.
+
+    Returns (patches, changed paths), leaving out values that are already
+    current, or None if some value cannot be patched in place.
+    """
+    patches = []
+    changed = []
+    for path, value in values:
+        if isinstance(value, (dict, list)):
+            return None
+        located = _locate_value(existing_bytes, path)
+        if located is None:
+            return None
+        start, end, old_value = located
+        if same_value(old_value, value):
+            continue
+        patches.append((start, end, _ENCODER.encode(value).encode('utf-8')))
+        changed.append(path)
+    patches.sort()
+    return patches, changed
+
+
+def apply_patches(file_path, existing_bytes, patches, batch=None, expected_hash=None):
+    """Write patches planned by plan_patches(), returning (sha256, size) or None.
+
+    By default the untouched byte ranges are spliced together with the new
+    values into a new file, written atomically. Given expected_hash (the
+    sha256 the manifest recorded, which existing_bytes must match), and if
+    every new value has the same encoded length as the old one, the live
+    file is patched in place through a memory map instead. That is not
+    crash-safe: an interrupted patch leaves a partly updated file. The file
+    is hashed first, and None is returned if it isn't exactly what the
+    manifest recorded. Batched writes are always spliced, since an in-place
+    patch cannot be deferred.
+    """
+    in_place = expected_hash is not None and batch is None
+    if in_place and all(end - start == len(value) for start, end, value in patches):
+        with open(file_path, 'r+b') as f:
+            if os.fstat(f.fileno()).st_size != len(existing_bytes):
+                return None
+            with mmap.mmap(f.fileno(), 0) as mapped:
+                # The file changed under us, or isn't the one we planned against; don't patch blind
+                if hashlib.sha256(mapped).hexdigest() != expected_hash:
+                    return None
+                for start, end, value in patches:
+                    mapped[start:end] = value
+                mapped.flush()
+                return hashlib.sha256(mapped).hexdigest(), len(mapped)
+
+    def pieces():
+        position = 0
+        for start, end, value in patches:
+            yield existing_bytes[position:start]
+            yield value
+            position = end
+        yield existing_bytes[position:]
+
+    return atomic_write_pieces(file_path, pieces(), batch)
+
+
+def patch_catalog(file_path, existing_bytes, catalog, changes, batch=None, expected_hash=None):
+    """Rewrite only the changed values of file_path, returning (sha256, size) or None.
+
+    Applies when the merge only overwrote a few scalar values. None means
+    the change set or the file layout is not suitable and the caller should
+    use write_catalog(). See apply_patches() for expected_hash.
+    """
+    if changes.added or changes.type_replaced:
+        return None
+    if not changes.overwritten or len(changes.overwritten) > MAX_IN_PLACE_CHANGES:
+        return None
+
+    planned = plan_patches(existing_bytes, [(path, get_path(catalog, path)) for path in changes.overwritten])
+    if planned is None:
+        return None
+    return apply_patches(file_path, existing_bytes, planned[0], batch, expected_hash)
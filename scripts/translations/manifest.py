@@ -0,0 +1,51 @@
+"""Content hashes of the last sync, used to skip locales that did not change."""
+import hashlib
+import json
+import os
+
+from fsutil import atomic_write
+
+MANIFEST_VERSION = 1
+
+
+def hash_bytes(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+def hash_payload(translations):
+    # Key order is significant: merged keys are appended in payload order
+    encoded = json.dumps(translations, ensure_ascii=False, separators=(',', ':'))
+    return hash_bytes(encoded.encode('utf-8'))
+
+
+class Manifest:
+    """Per-locale payload and output hashes, persisted as JSON."""
+
+    def __init__(self, path, locales=None):
+        self.path = path
+        self.locales = locales or {}
+
+    @classmethod
+    def load(cls, path):
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return cls(path)
+        except ValueError:
+            # A corrupt manifest only costs us a full sync
+            return cls(path)
+        if data.get('version') != MANIFEST_VERSION:
+            return cls(path)
+        return cls(path, data.get('locales', {}))
+
+    def get(self, lang_code):
+        return self.locales.get(lang_code)
+
+    def record(self, lang_code, payload_hash, output_hash):
+        self.locales[lang_code] = {'payload': payload_hash, 'output': output_hash}
+
+    def save(self):
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        data = {'version': MANIFEST_VERSION, 'locales': self.locales}
+        atomic_write(self.path, json.dumps(data, indent=2, sort_keys=True).encode('utf-8'))
@@ -0,0 +1,241 @@
+"""Translation memory over the existing catalogs.
+
+Every key that has a string in both the source locale (en) and a target
+locale is a unit: (English text, translation). Units are grouped by their
+normalized English text (case-folded, whitespace collapsed), which is the
+key for exact matches, and each normalized text is indexed by its character
+trigrams for fuzzy matches, scored with the Dice coefficient of the trigram
+sets.
+
+The units are persisted with the hash of each catalog they were read from.
+refresh() re-reads only catalogs whose hash changed and moves the index by
+the units that changed, so keeping the memory current after a sync costs
+about as much as the sync's own changes. The trigram index itself is
+rebuilt from the units when the memory is loaded.
+"""
+import json
+import math
+import os
+import unicodedata
+from collections import Counter
+from dataclasses import dataclass
+
+from catalog import MISSING, discover_locales, get_path, iter_leaves
+from fsutil import write_if_changed
+from manifest import hash_bytes
+
+VERSION = 1
+GRAM_SIZE = 3
+DEFAULT_THRESHOLD = 0.6
+DEFAULT_LIMIT = 3
+
+
+def normalize(text):
+    return ' '.join(unicodedata.normalize('NFC', text).casefold().split())
+
+
+def trigrams(normalized):
+    padded = f' {normalized} '
+    return {padded[index:index + GRAM_SIZE] for index in range(len(padded) - GRAM_SIZE + 1)}
+
+
+@dataclass
+class Match:
+    score: float
+    source: str
+    translation: str
+    # How many keys use this translation for this source text
+    uses: int
+
+
+class _Record:
+    __slots__ = ('grams', 'sources', 'translations', 'units')
+
+    def __init__(self, grams):
+        self.grams = grams
+        self.sources = Counter()
+        # locale -> Counter of translations
+        self.translations = {}
+        self.units = 0
+
+
+def _decrement(counter, key):
+    counter[key] -= 1
+    if not counter[key]:
+        del counter[key]
+
+
+def extract_units(source_catalog, catalog):
+    """{dotted key: (source text, translation)} for keys both catalogs have a string for."""
+    units = {}
+    for path, value in iter_leaves(catalog):
+        if isinstance(value, str) and value:
+            source = get_path(source_catalog, path, MISSING)
+            if isinstance(source, str) and source:
+                units['.'.join(path)] = (source, value)
+    return units
+
+
+class TranslationMemory:
+    def __init__(self, path, source_locale, hashes=None, units=None):
+        self.path = path
+        self.source_locale = source_locale
+        # locale -> hash of the catalog file the units were read from
+        self.hashes = hashes or {}
+        # locale -> {dotted key: (source text, translation)}
+        self.units = {}
+        self.records = {}
+        self.index = {}
+        for lang_code, locale_units in (units or {}).items():
+            self._replace_units(lang_code, {key: tuple(unit) for key, unit in locale_units.items()})
+
+    @classmethod
+    def load(cls, path, source_locale):
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (FileNotFoundError, ValueError):
+            return cls(path, source_locale)
+        if data.get('version') != VERSION or data.get('source_locale') != source_locale:
+            return cls(path, source_locale)
+        return cls(path, source_locale, data.get('hashes'), data.get('units'))
+
+    def save(self):
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        data = {'version': VERSION, 'source_locale': self.source_locale, 'hashes': self.hashes, 'units': self.units}
+        encoded = json.dumps(data, ensure_ascii=False, separators=(',', ':'), sort_keys=True)
+        write_if_changed(self.path, encoded.encode('utf-8'))
+
+    def __len__(self):
+        return sum(len(units) for units in self.units.values())
+
+    def _add(self, lang_code, source, translation):
+        normalized = normalize(source)
+        record = self.records.get(normalized)
+        if record is None:
+            record = self.records[normalized] = _Record(frozenset(trigrams(normalized)))
+            for gram in record.grams:
+                self.index.setdefault(gram, set()).add(normalized)
+        record.sources[source] += 1
+        record.translations.setdefault(lang_code, Counter())[translation] += 1
+        record.units += 1
+
+    def _remove(self, lang_code, source, translation):
+        normalized = normalize(source)
+        record = self.records[normalized]
+        _decrement(record.sources, source)
+        translations = record.translations[lang_code]
+        _decrement(translations, translation)
+        if not translations:
+            del record.translations[lang_code]
+        record.units -= 1
+        if not record.units:
+            del self.records[normalized]
+            for gram in record.grams:
+                postings = self.index[gram]
+                postings.discard(normalized)
+                if not postings:
+                    del self.index[gram]
+
+    def _replace_units(self, lang_code, units):
+        """Make units the locale's units, touching the index only where they differ; returns the change count."""
+        old = self.units.get(lang_code, {})
+        changed = 0
+        for key, unit in old.items():
+            if units.get(key) != unit:
+                self._remove(lang_code, *unit)
+                changed += 1
+        for key, unit in units.items():
+            if old.get(key) != unit:
+                self._add(lang_code, *unit)
+                changed += 1
+        if units:
+            self.units[lang_code] = units
+        else:
+            self.units.pop(lang_code, None)
+        return changed
+
+    def refresh(self, messages_dir, locales=None):
+        """Re-read catalogs that changed since the last refresh; returns {locale: units changed}.
+
+        locales limits the check to those catalogs, e.g. the ones a sync
+        just wrote; all of them are re-read if the source locale changed.
+        """
+        def read(lang_code):
+            with open(os.path.join(messages_dir, f'{lang_code}.json'), 'rb') as f:
+                data = f.read()
+            return hash_bytes(data), data
+
+        available = discover_locales(messages_dir)
+        if self.source_locale not in available:
+            raise FileNotFoundError(f'No catalog for {self.source_locale!r} in {messages_dir}')
+        source_hash, source_data = read(self.source_locale)
+        source_changed = source_hash != self.hashes.get(self.source_locale)
+        targets = [lang_code for lang_code in available if lang_code != self.source_locale]
+        if locales is not None and not source_changed:
+            targets = [lang_code for lang_code in targets if lang_code in locales]
+
+        source_catalog = None
+        changed = {}
+        for lang_code in targets:
+            catalog_hash, data = read(lang_code)
+            if not source_changed and catalog_hash == self.hashes.get(lang_code):
+                continue
+            if source_catalog is None:
+                source_catalog = json.loads(source_data.decode('utf-8'))
+            units = extract_units(source_catalog, json.loads(data.decode('utf-8')))
+            changed[lang_code] = self._replace_units(lang_code, units)
+            self.hashes[lang_code] = catalog_hash
+        # Catalogs that were removed take their units with them
+        for lang_code in [code for code in self.hashes if code not in available]:
+            changed[lang_code] = self._replace_units(lang_code, {})
+            del self.hashes[lang_code]
+        self.hashes[self.source_locale] = source_hash
+        return changed
+
+    def lookup(self, text, lang_code, limit=DEFAULT_LIMIT, threshold=DEFAULT_THRESHOLD):
+        """Best matches for English text in a locale, exact ones (score 1.0) first.
+
+        threshold is the minimum Dice score, above 0 and at most 1.
+        """
+        if not 0 < threshold <= 1:
+            raise ValueError(f'threshold must be above 0 and at most 1, not {threshold}')
+        normalized = normalize(text)
+        grams = trigrams(normalized)
+        size = len(grams)
+        if not size:
+            return []
+        # A Dice score of at least threshold needs this many shared trigrams,
+        # so a match has one of the (size - min_shared + 1) rarest of ours
+        min_shared = max(1, math.ceil(threshold * size / (2 - threshold) - 1e-9))
+        rarest = sorted(grams, key=lambda gram: len(self.index.get(gram, ())))[:size - min_shared + 1]
+        candidates = set()
+        for gram in rarest:
+            candidates.update(self.index.get(gram, ()))
+
+        # Nor can a match be much shorter or longer than the query (with the
+        # same rounding slack, so a match scoring exactly threshold is kept)
+        smallest = math.ceil(threshold * size / (2 - threshold) - 1e-9)
+        largest = math.floor((2 - threshold) * size / threshold + 1e-9)
+        scored = []
+        for candidate in candidates:
+            record = self.records[candidate]
+            if lang_code not in record.translations or not smallest <= len(record.grams) <= largest:
+                continue
+            if candidate == normalized:
+                score = 1.0
+            else:
+                score = 2 * len(grams & record.grams) / (size + len(record.grams))
+            if score >= threshold:
+                scored.append((score, candidate))
+        scored.sort(key=lambda item: (-item[0], item[1]))
+
+        matches = []
+        for score, candidate in scored:
+            record = self.records[candidate]
+            source = record.sources.most_common(1)[0][0]
+            for translation, uses in record.translations[lang_code].most_common():
+                matches.append(Match(round(score, 4), source, translation, uses))
+                if len(matches) == limit:
+                    return matches
+        return matches
@@ -0,0 +1,102 @@
+"""Deep merge of translation patches into message catalogs."""
+
+# Change kinds
+ADDED = 'added'
+OVERWRITTEN = 'overwritten'
+TYPE_REPLACED = 'type_replaced'
+
+
+class ChangeSet:
+    """Key paths (tuples of keys) touched by a merge, in merge order."""
+
+    __slots__ = ('added', 'overwritten', 'type_replaced')
+
+    def __init__(self):
+        self.added = []
+        self.overwritten = []
+        self.type_replaced = []
+
+    def __len__(self):
+        return len(self.added) + len(self.overwritten) + len(self.type_replaced)
+
+    def __bool__(self):
+        return bool(self.added or self.overwritten or self.type_replaced)
+
+    def __getstate__(self):
+        return (self.added, self.overwritten, self.type_replaced)
+
+    def __setstate__(self, state):
+        self.added, self.overwritten, self.type_replaced = state
+
+    def summary(self):
+        return {
+            ADDED: len(self.added),
+            OVERWRITTEN: len(self.overwritten),
+            TYPE_REPLACED: len(self.type_replaced),
+        }
+
+    def as_dict(self):
+        return {
+            ADDED: ['.'.join(path) for path in self.added],
+            OVERWRITTEN: ['.'.join(path) for path in self.overwritten],
+            TYPE_REPLACED: ['.'.join(path) for path in self.type_replaced],
+        }
+
+
+def same_value(old, new):
+    # 1 == True in Python, but they serialize differently
+    return type(old) is type(new) and old == new
+
+
+def _expand(node):
+    # Paths are built as (parent, key) cons cells so descending costs O(1);
+    # only paths that end up in the ChangeSet are materialized
+    keys = []
+    while node is not None:
+        node, key = node
+        keys.append(key)
+    return tuple(reversed(keys))
+
+
+def deep_merge(existing, new, changes=None):
+    """Merge new into existing in place and return the ChangeSet.
+
+    Nested dicts are merged key by key; any other value replaces what was
+    there, including a dict replacing a leaf and vice versa. The walk uses an
+    explicit stack of dict iterators, so nesting depth is not bounded by the
+    recursion limit and nothing from the patch is copied.
+    """
+    if changes is None:
+        changes = ChangeSet()
+
+    stack = [(existing, iter(new.items()), None)]
+    while stack:
+        target, items, path = stack[-1]
+        for key, value in items:
+            key_path = (path, key)
+            if isinstance(value, dict):
+                current = target.get(key)
+                if not isinstance(current, dict):
+                    # If the key doesn't exist or isn't a dict, replace it
+                    if key in target:
+                        changes.type_replaced.append(_expand(key_path))
+                    elif not value:
+                        changes.added.append(_expand(key_path))
+                    current = target[key] = {}
+                # Descend; this frame's iterator resumes once the child is done
+                stack.append((current, iter(value.items()), key_path))
+                break
+
+            if key not in target:
+                changes.added.append(_expand(key_path))
+            elif isinstance(target[key], dict):
+                changes.type_replaced.append(_expand(key_path))
+            elif not same_value(target[key], value):
+                changes.overwritten.append(_expand(key_path))
+            else:
+                continue
+            target[key] = value
+        else:
+            stack.pop()
+
+    return changes
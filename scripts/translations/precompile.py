@@ -0,0 +1,88 @@
+"""Build-time ICU parsing of message catalogs.
+
+precompile_catalog() replaces every message string with its parsed AST
+(see icu.py). IntlMessageFormat accepts such ASTs in place of message
+strings, so the app formats precompiled catalogs without parsing anything
+at runtime. Messages that fail to parse are left as strings and reported;
+at runtime they fail exactly as they did before.
+
+ParseCache keeps ASTs keyed by the sha256 of the message text, so a message
+that did not change since the last run (or that appears in several locales)
+is parsed once.
+"""
+import json
+import os
+
+from catalog import from_leaves, iter_leaves
+from fsutil import write_if_changed
+from icu import IcuSyntaxError, parse
+from manifest import hash_bytes
+
+CACHE_VERSION = 1
+
+
+class ParseCache:
+    """Parse results by message hash, persisted as JSON between runs."""
+
+    def __init__(self, path, entries=None):
+        self.path = path
+        self.entries = entries or {}
+        self.used = set()
+        self.hits = 0
+        self.misses = 0
+
+    @classmethod
+    def load(cls, path):
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (FileNotFoundError, ValueError):
+            # Losing the cache only costs a reparse
+            return cls(path)
+        if data.get('version') != CACHE_VERSION:
+            return cls(path)
+        return cls(path, data.get('messages', {}))
+
+    def parse(self, message):
+        """Return (ast, None), or (None, error message) if message is not valid ICU."""
+        key = hash_bytes(message.encode('utf-8'))
+        self.used.add(key)
+        entry = self.entries.get(key)
+        if entry is None:
+            self.misses += 1
+            try:
+                entry = {'ast': parse(message)}
+            except IcuSyntaxError as e:
+                entry = {'error': str(e)}
+            self.entries[key] = entry
+        else:
+            self.hits += 1
+        return entry.get('ast'), entry.get('error')
+
+    def save(self):
+        # Only messages seen in this run are kept, so the cache cannot grow without bound
+        messages = {key: self.entries[key] for key in self.used}
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        data = {'version': CACHE_VERSION, 'messages': messages}
+        encoded = json.dumps(data, ensure_ascii=False, separators=(',', ':'), sort_keys=True)
+        write_if_changed(self.path, encoded.encode('utf-8'))
+
+
+def precompile_catalog(catalog, cache):
+    """Return (precompiled catalog, [(dotted path, error)]) for catalog."""
+    leaves = []
+    errors = []
+    for path, value in iter_leaves(catalog, include_empty=True):
+        if isinstance(value, str):
+            ast, error = cache.parse(value)
+            if error is None:
+                value = ast
+            else:
+                errors.append(('.'.join(path), error))
+        leaves.append((path, value))
+    return from_leaves(leaves), errors
+
+
+def dumps_precompiled(catalog):
+    # ASTs are read by the app, not by people, so they are written compactly
+    return json.dumps(catalog, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
@@ -0,0 +1,269 @@
+"""Machine translation pre-fill for keys a locale is missing.
+
+Every string the default locale has and a target locale lacks is queued.
+Identical source strings are translated once per target locale, in
+batches, through a pluggable backend, and results are kept in a persistent
+LRU cache keyed by (backend, source text hash, target locale), so repeated
+runs only send what they have never seen. Each backend only ever gets its
+own translations back from the cache.
+
+ICU arguments, tags and plural/select blocks are swapped for numbered
+tokens before a string is sent and put back afterwards; a translation that
+lost or duplicated a token is rejected rather than filled in.
+
+A backend is any object with
+
+    max_batch                             maximum texts per call
+    translate(texts, source, target)      list of translated texts, same order
+"""
+import importlib
+import json
+import os
+import re
+import time
+from collections import OrderedDict
+
+from catalog import MISSING, get_path, iter_leaves, set_path
+from fsutil import atomic_write
+from manifest import hash_bytes
+
+# Version 1 caches had no backend in their keys
+CACHE_VERSION = 2
+DEFAULT_CACHE_SIZE = 50000
+DEFAULT_BATCH_SIZE = 50
+
+TOKEN = '⟦{}⟧'
+_TOKEN = re.compile(r'⟦(\d+)⟧')
+_TAG = re.compile(r'</?[A-Za-z][\w.-]*\s*/?>')
+
+
+class PrefillError(Exception):
+    pass
+
+
+def _placeholder_spans(message):
+    """(start, end) of every top-level {...} block and tag in message."""
+    spans = []
+    depth = 0
+    start = None
+    index = 0
+    while index < len(message):
+        char = message[index]
+        if char == "'" and index + 1 < len(message) and message[index + 1] in "{}'":
+            # Quoted syntax characters are text, not placeholders
+            end = message.find("'", index + 2) if message[index + 1] != "'" else index + 1
+            index = (end if end >= 0 else len(message)) + 1
+            continue
+        if char == '{':
+            if depth == 0:
+                start = index
+            depth += 1
+        elif char == '}' and depth:
+            depth -= 1
+            if depth == 0:
+                spans.append((start, index + 1))
+        elif char == '<' and depth == 0:
+            match = _TAG.match(message, index)
+            if match:
+                spans.append(match.span())
+                index = match.end()
+                continue
+        index += 1
+    return spans
+
+
+def protect(message):
+    """Replace placeholders with ⟦n⟧ tokens; returns (text, placeholders)."""
+    parts = []
+    placeholders = []
+    position = 0
+    for start, end in _placeholder_spans(message):
+        parts.append(message[position:start])
+        parts.append(TOKEN.format(len(placeholders)))
+        placeholders.append(message[start:end])
+        position = end
+    parts.append(message[position:])
+    return ''.join(parts), placeholders
+
+
+def restore(text, placeholders):
+    """Put placeholders back; None if the tokens in text don't match them exactly."""
+    found = [int(number) for number in _TOKEN.findall(text)]
+    if sorted(found) != list(range(len(placeholders))):
+        return None
+    return _TOKEN.sub(lambda match: placeholders[int(match.group(1))], text)
+
+
+class StubBackend:
+    """Offline backend for tests and dry runs: tags each text with its target locale."""
+
+    max_batch = DEFAULT_BATCH_SIZE
+
+    def __init__(self):
+        self.calls = 0
+        self.texts = 0
+
+    def translate(self, texts, source_locale, target_locale):
+        self.calls += 1
+        self.texts += len(texts)
+        return [f'[{target_locale}] {text}' for text in texts]
+
+
+BACKENDS = {'stub': StubBackend}
+# Backends whose output is not a translation and must never reach the catalogs
+TEST_BACKENDS = frozenset({'stub'})
+
+
+def load_backend(spec):
+    """'stub', or 'module:attribute' naming a backend class or factory on sys.path."""
+    if spec in BACKENDS:
+        return BACKENDS[spec]()
+    module_name, separator, attribute = spec.partition(':')
+    if not separator:
+        raise PrefillError(f'Unknown backend {spec!r}; use one of {sorted(BACKENDS)} or module:attribute')
+    try:
+        factory = getattr(importlib.import_module(module_name), attribute)
+    except (ImportError, AttributeError) as e:
+        raise PrefillError(f'Cannot load backend {spec!r}: {e}') from None
+    try:
+        return factory()
+    except Exception as e:
+        raise PrefillError(f'Cannot create backend {spec!r}: {type(e).__name__}: {e}') from e
+
+
+class RateLimiter:
+    """Spaces calls at least 1/rate seconds apart; a rate of 0 means unlimited."""
+
+    def __init__(self, rate=0, clock=time.monotonic, sleep=time.sleep):
+        self.interval = 1 / rate if rate else 0
+        self.clock = clock
+        self.sleep = sleep
+        self._next = 0.0
+
+    def wait(self):
+        if not self.interval:
+            return
+        now = self.clock()
+        if now < self._next:
+            self.sleep(self._next - now)
+            now = self._next
+        self._next = now + self.interval
+
+
+class TranslationCache:
+    """A backend's translations by (source text hash, target locale), evicting least recently used.
+
+    The entries of every backend share one file; backend is the spec it was
+    loaded from, and only its own entries are ever returned.
+    """
+
+    def __init__(self, path, backend, max_entries=DEFAULT_CACHE_SIZE, entries=None):
+        self.path = path
+        self.backend = backend
+        self.max_entries = max_entries
+        self.entries = OrderedDict(entries or ())
+        self.hits = 0
+        self.misses = 0
+
+    @classmethod
+    def load(cls, path, backend, max_entries=DEFAULT_CACHE_SIZE):
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (FileNotFoundError, ValueError):
+            return cls(path, backend, max_entries)
+        if data.get('version') != CACHE_VERSION:
+            return cls(path, backend, max_entries)
+        # Stored oldest first, like the OrderedDict
+        return cls(path, backend, max_entries, data.get('entries', []))
+
+    def key(self, text, target_locale):
+        # Neither the locale nor the hex digest contains a colon, so the backend spec can
+        return f'{target_locale}:{hash_bytes(text.encode("utf-8"))}:{self.backend}'
+
+    def get(self, text, target_locale):
+        key = self.key(text, target_locale)
+        translation = self.entries.get(key)
+        if translation is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self.entries.move_to_end(key)
+        return translation
+
+    def put(self, text, target_locale, translation):
+        key = self.key(text, target_locale)
+        self.entries[key] = translation
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    def save(self):
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        data = {'version': CACHE_VERSION, 'entries': list(self.entries.items())}
+        atomic_write(self.path, json.dumps(data, ensure_ascii=False, separators=(',', ':')).encode('utf-8'))
+
+
+def collect_missing(catalogs, default_locale, locales=None):
+    """{locale: [(path, source text)]} for strings of the default locale other locales lack."""
+    base = catalogs[default_locale]
+    missing = {}
+    for lang_code, catalog in catalogs.items():
+        if lang_code == default_locale or (locales and lang_code not in locales):
+            continue
+        missing[lang_code] = [
+            (path, value) for path, value in iter_leaves(base)
+            if isinstance(value, str) and value and get_path(catalog, path, MISSING) is MISSING
+        ]
+    return missing
+
+
+def prefill(missing, backend, cache, source_locale, batch_size=None, limiter=None):
+    """Translate the missing strings; returns ({locale: payload}, [(locale, path, reason)]).
+
+    Payloads are nested like TRANSLATIONS[locale]. Only cache misses reach
+    the backend, each distinct text once per locale.
+    """
+    batch_size = min(batch_size or backend.max_batch, backend.max_batch)
+    limiter = limiter or RateLimiter()
+    payloads = {}
+    rejected = []
+    for lang_code, entries in missing.items():
+        translations = {}
+        queue = {}
+        for _, text in entries:
+            if text in translations or text in queue:
+                continue
+            cached = cache.get(text, lang_code)
+            if cached is not None:
+                translations[text] = cached
+            else:
+                queue[text] = protect(text)
+
+        pending = list(queue.items())
+        for start in range(0, len(pending), batch_size):
+            batch = pending[start:start + batch_size]
+            limiter.wait()
+            try:
+                results = backend.translate([protected for _, (protected, _) in batch], source_locale, lang_code)
+            except PrefillError:
+                raise
+            except Exception as e:
+                # e.g. a network or quota error from the translation service
+                raise PrefillError(f'Backend failed translating into {lang_code}: {type(e).__name__}: {e}') from e
+            if len(results) != len(batch):
+                raise PrefillError(f'Backend returned {len(results)} translations for {len(batch)} texts')
+            for (text, (_, placeholders)), result in zip(batch, results):
+                restored = restore(result, placeholders)
+                if restored is not None:
+                    translations[text] = restored
+                    cache.put(text, lang_code, restored)
+
+        payload = {}
+        for path, text in entries:
+            if text in translations:
+                set_path(payload, path, translations[text])
+            else:
+                rejected.append((lang_code, '.'.join(path), 'placeholders changed in translation'))
+        payloads[lang_code] = payload
+    return payloads, rejected
@@ -0,0 +1,194 @@
+"""Localized route slugs: the routing.ts pathnames table and a path trie for the middleware.
+
+Routes are declared once, as ROUTES in update_translations_example.py:
+
+    '/invoice/create': {'paths': {'en': '/invoice/create', 'es': '/factura/crear', ...}, 'public': True}
+
+where 'paths' is either one path for every locale or a path per locale,
+'public' routes (and everything below them, except below '/') need no
+sign-in, and 'page': False keeps a route such as an API endpoint out of the
+pathnames table. From them we generate a TypeScript module with
+
+    pathnames   the table routing.ts hands to next-intl
+    routeTrie   {locales: {locale: node}, any: node}, nodes keyed by decoded path segment
+
+so the middleware finds the locale, the canonical route and whether it is
+public by walking the path once (see src/i18n/route-matcher.ts, which
+match_path() mirrors). 'any' holds every locale's paths, for requests that
+have no locale prefix yet. Segments are matched percent-decoded and NFC
+normalized, so '/zh/%E7%99%BB%E5%BD%95' finds '/zh/登录'.
+"""
+import json
+import re
+import unicodedata
+from urllib.parse import quote, unquote
+
+HEADER = '// Generated by scripts/translations/update_translations_example.py routes. Do not edit.\n'
+_IDENTIFIER = re.compile(r'^[A-Za-z_$][\w$]*$')
+
+
+class RouteError(ValueError):
+    pass
+
+
+def segments(path):
+    """Decoded, NFC-normalized segments of a path: '/a/%C3%A9/' -> ['a', 'é']."""
+    return [unicodedata.normalize('NFC', unquote(segment, errors='strict')) for segment in path.split('/') if segment]
+
+
+def localized_paths(routes, locales):
+    """{route: {locale: path}}, with single paths repeated for every locale."""
+    return {
+        route: dict(spec['paths']) if isinstance(spec['paths'], dict) else dict.fromkeys(locales, spec['paths'])
+        for route, spec in routes.items()
+    }
+
+
+def check_routes(routes, locales):
+    """Problems with the route declarations, as messages; empty if they are consistent."""
+    problems = []
+    paths = localized_paths(routes, locales)
+    # Normalized path -> route, per locale and across all of them
+    seen = {lang_code: {} for lang_code in locales}
+    unprefixed = {}
+    for route, by_locale in paths.items():
+        if not route.startswith('/'):
+            problems.append(f'{route}: routes must start with /')
+        missing = [lang_code for lang_code in locales if lang_code not in by_locale]
+        extra = [lang_code for lang_code in by_locale if lang_code not in locales]
+        if missing:
+            problems.append(f'{route}: no path for {", ".join(missing)}')
+        if extra:
+            problems.append(f'{route}: path for unknown locales {", ".join(extra)}')
+        for lang_code, path in by_locale.items():
+            if lang_code not in seen:
+                continue
+            if not path.startswith('/') or '//' in path or (path != '/' and path.endswith('/')):
+                problems.append(f'{route}: {lang_code} path {path!r} must start with / and have no empty segments')
+                continue
+            if '?' in path or '#' in path:
+                problems.append(f'{route}: {lang_code} path {path!r} contains a query or fragment')
+                continue
+            key = tuple(segments(path))
+            if key and key[0] in locales:
+                problems.append(f'{route}: {lang_code} path {path!r} starts with a locale code')
+            other = seen[lang_code].setdefault(key, route)
+            if other != route:
+                problems.append(f'{route}: {lang_code} path {path!r} is also the path of {other}')
+                continue
+            other = unprefixed.setdefault(key, route)
+            if other != route:
+                problems.append(f'{route}: {lang_code} path {path!r} is ambiguous without a locale prefix '
+                                f'(another locale uses it for {other})')
+    return problems
+
+
+def _insert(node, path, route, public):
+    for segment in segments(path):
+        node = node.setdefault('children', {}).setdefault(segment, {})
+    node['route'] = route
+    if public:
+        node['public'] = True
+
+
+def build_trie(routes, locales):
+    problems = check_routes(routes, locales)
+    if problems:
+        raise RouteError('\n'.join(problems))
+    trie = {'locales': {lang_code: {} for lang_code in locales}, 'any': {}}
+    for route, by_locale in localized_paths(routes, locales).items():
+        public = routes[route].get('public', False)
+        for lang_code, path in by_locale.items():
+            _insert(trie['locales'][lang_code], path, route, public)
+            _insert(trie['any'], path, route, public)
+    return trie
+
+
+def _walk(node, parts):
+    """(node reached or None, whether a public route at or above it covers the path)."""
+    public = False
+    for segment in parts:
+        node = node.get('children', {}).get(segment)
+        if node is None:
+            return None, public
+        public = public or node.get('public', False)
+    return node, public
+
+
+def match_path(trie, pathname):
+    """(locale or None, canonical route or None, public) for a request path."""
+    try:
+        parts = segments(pathname)
+    except UnicodeDecodeError:
+        return None, None, False
+    locale = parts[0] if parts and parts[0] in trie['locales'] else None
+    node = None
+    if locale is not None:
+        node, public = _walk(trie['locales'][locale], parts[1:])
+    if node is None:
+        # Unprefixed, or another locale's slug: try every locale's paths
+        node, public = _walk(trie['any'], parts[1:] if locale is not None else parts)
+    if node is None:
+        return locale, None, public
+    return locale, node.get('route'), public or node.get('public', False)
+
+
+def verify_trie(trie, routes, locales):
+    """Check every localized path, plain and percent-encoded, resolves as declared."""
+    problems = []
+    for route, by_locale in localized_paths(routes, locales).items():
+        public = routes[route].get('public', False)
+        for lang_code, path in by_locale.items():
+            for form in (path, quote(path)):
+                expected = (lang_code, route, public)
+                found = match_path(trie, f'/{lang_code}{form}')
+                if found != expected:
+                    problems.append(f'/{lang_code}{form}: resolves to {found}, expected {expected}')
+                found = match_path(trie, form)
+                if found[1:] != expected[1:]:
+                    problems.append(f'{form}: resolves to {found[1:]} without a prefix, expected {expected[1:]}')
+            if public and path != '/':
+                below = f'/{lang_code}{path}/details'
+                if not match_path(trie, below)[2]:
+                    problems.append(f'{below}: not public although {route} is')
+    return problems
+
+
+def _ts_key(key):
+    return key if _IDENTIFIER.match(key) or key.isidentifier() else _ts_string(key)
+
+
+def _ts_string(value):
+    # Single quotes, as prettier writes them
+    return "'" + json.dumps(value, ensure_ascii=False)[1:-1].replace('\\"', '"').replace("'", "\\'") + "'"
+
+
+def _ts_value(value, indent):
+    if isinstance(value, dict):
+        if not value:
+            return '{}'
+        inner = '  ' * (indent + 1)
+        lines = [f'{inner}{_ts_key(key)}: {_ts_value(item, indent + 1)},' for key, item in value.items()]
+        return '{\n' + '\n'.join(lines) + '\n' + '  ' * indent + '}'
+    if isinstance(value, bool):
+        return 'true' if value else 'false'
+    return _ts_string(value)
+
+
+def render_module(routes, locales, trie):
+    """TypeScript source of the generated routes module."""
+    pathnames = {route: spec['paths'] for route, spec in routes.items() if spec.get('page', True)}
+    return (
+        HEADER
+        + '\n'
+        + 'export type RouteNode = {\n'
+        + '  route?: string;\n'
+        + '  public?: boolean;\n'
+        + '  children?: Record<string, RouteNode>;\n'
+        + '};\n'
+        + '\n'
+        + f'export const pathnames = {_ts_value(pathnames, 0)} as const;\n'
+        + '\n'
+        + 'export const routeTrie: { locales: Record<string, RouteNode>; any: RouteNode } = '
+        + f'{_ts_value(trie, 0)};\n'
+    )
@@ -0,0 +1,72 @@
+"""Per-namespace shards of a locale catalog.
+
+Each top-level namespace of messages/<locale>.json is written to
+messages/<locale>/<namespace>.json as a one-key fragment ({namespace: ...}),
+so a route can load just the namespaces it uses and merge them with a plain
+object spread. messages/<locale>/index.json lists the shards together with
+the hash of the catalog they were cut from.
+"""
+import json
+import os
+import re
+
+from fsutil import write_if_changed
+from json_writer import dumps_catalog
+from manifest import hash_bytes
+
+INDEX_FILE = 'index.json'
+# Namespaces become file names, so they must be plain identifiers
+NAMESPACE_PATTERN = re.compile(r'^[A-Za-z0-9_-]+$')
+
+
+def shard_dir(messages_dir, lang_code):
+    return os.path.join(messages_dir, lang_code)
+
+
+def load_index(messages_dir, lang_code):
+    try:
+        with open(os.path.join(shard_dir(messages_dir, lang_code), INDEX_FILE), 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return None
+
+
+def shards_current(messages_dir, lang_code, source_hash):
+    """Whether the shards on disk were cut from the catalog with source_hash."""
+    index = load_index(messages_dir, lang_code)
+    return index is not None and index.get('source') == source_hash
+
+
+def write_shards(messages_dir, lang_code, catalog, source_hash, batch=None):
+    """Write the namespace shards and index for catalog, returning the number of files written."""
+    directory = shard_dir(messages_dir, lang_code)
+    os.makedirs(directory, exist_ok=True)
+    previous = load_index(messages_dir, lang_code) or {}
+
+    namespaces = {}
+    written = 0
+    for namespace, subtree in catalog.items():
+        if not NAMESPACE_PATTERN.match(namespace):
+            raise ValueError(f'Namespace {namespace!r} in {lang_code} cannot be used as a shard file name')
+        file_name = f'{namespace}.json'
+        if file_name == INDEX_FILE:
+            raise ValueError(f'Namespace {namespace!r} in {lang_code} clashes with the shard index')
+        data = dumps_catalog({namespace: subtree})
+        if write_if_changed(os.path.join(directory, file_name), data, batch):
+            written += 1
+        namespaces[namespace] = {'file': file_name, 'sha256': hash_bytes(data), 'size': len(data)}
+
+    # Drop shards of namespaces that no longer exist; only files we listed
+    # ourselves are removed
+    for namespace, entry in previous.get('namespaces', {}).items():
+        if namespace not in namespaces:
+            stale_path = os.path.join(directory, entry['file'])
+            if batch is not None:
+                batch.remove(stale_path)
+            elif os.path.exists(stale_path):
+                os.unlink(stale_path)
+
+    index = {'locale': lang_code, 'source': source_hash, 'namespaces': namespaces}
+    if write_if_changed(os.path.join(directory, INDEX_FILE), dumps_catalog(index), batch):
+        written += 1
+    return written
@@ -0,0 +1,231 @@
+"""Translation payloads read from translator deliveries instead of TRANSLATIONS.
+
+A source lists the locales it has a patch for and loads one locale's patch
+on demand, so a sync only ever holds the patch of the locale it is working
+on. Supported files:
+
+    <locale>.json, <locale>.yaml/.yml   nested payloads, like TRANSLATIONS[locale]
+    *.csv                               a 'key' column of dotted keys plus one
+                                        column per locale (e.g. key,es,pt);
+                                        empty cells are skipped
+    *.xlf/.xliff                        XLIFF 1.2 or 2.0; unit ids (or resname)
+                                        are dotted keys, the target language
+                                        is the locale
+
+A directory is scanned for those files. CSV and XLIFF files are streamed:
+only the cells of the locale being loaded are kept.
+"""
+import csv
+import json
+import os
+import re
+import xml.etree.ElementTree as ElementTree
+from functools import partial
+
+from catalog import from_leaves
+from merge import deep_merge
+
+LOCALE_PATTERN = re.compile(r'^[a-z]{2,3}(?:[-_][A-Za-z0-9]{2,8})*$')
+JSON_EXTENSIONS = ('.json',)
+YAML_EXTENSIONS = ('.yaml', '.yml')
+CSV_EXTENSIONS = ('.csv',)
+XLIFF_EXTENSIONS = ('.xlf', '.xliff')
+
+
+class SourceError(ValueError):
+    pass
+
+
+class DictSource:
+    """Payloads already in memory, such as the TRANSLATIONS literal."""
+
+    def __init__(self, translations):
+        self.translations = translations
+
+    def locales(self):
+        return list(self.translations)
+
+    def load(self, lang_code):
+        return self.translations[lang_code]
+
+
+def _dotted_payload(pairs, file_path):
+    leaves = []
+    for key, value in pairs:
+        path = tuple(key.split('.'))
+        if not all(path):
+            raise SourceError(f'{file_path}: invalid key {key!r}')
+        leaves.append((path, value))
+    return from_leaves(leaves)
+
+
+class DocumentSource:
+    """One locale's payload as a JSON or YAML document, named <locale>.<ext>."""
+
+    def __init__(self, file_path):
+        self.file_path = file_path
+        self.lang_code = os.path.splitext(os.path.basename(file_path))[0]
+        if not LOCALE_PATTERN.match(self.lang_code):
+            raise SourceError(f'{file_path}: file name is not a locale code')
+
+    def locales(self):
+        return [self.lang_code]
+
+    def load(self, lang_code):
+        if self.file_path.endswith(YAML_EXTENSIONS):
+            try:
+                import yaml
+            except ImportError:
+                raise SourceError(f'{self.file_path}: reading YAML requires PyYAML (pip install pyyaml)') from None
+            parse = partial(yaml.load, Loader=getattr(yaml, 'CSafeLoader', yaml.SafeLoader))
+            # UnicodeDecodeError, like json's decode errors, is a ValueError
+            errors = (ValueError, yaml.YAMLError)
+        else:
+            parse, errors = json.load, ValueError
+        try:
+            with open(self.file_path, 'r', encoding='utf-8') as f:
+                payload = parse(f)
+        except errors as e:
+            raise SourceError(f'{self.file_path}: {e}') from e
+        if not isinstance(payload, dict):
+            raise SourceError(f'{self.file_path}: expected a mapping of message keys')
+        return payload
+
+
+class CsvSource:
+    """A spreadsheet export: a 'key' column and one column per locale."""
+
+    def __init__(self, file_path):
+        self.file_path = file_path
+        try:
+            with open(file_path, 'r', encoding='utf-8-sig', newline='') as f:
+                header = next(csv.reader(f), [])
+        except (csv.Error, UnicodeDecodeError) as e:
+            raise SourceError(f'{file_path}: {e}') from e
+        if 'key' not in header:
+            raise SourceError(f'{file_path}: no "key" column')
+        self._columns = {
+            name: index for index, name in enumerate(header) if name != 'key' and LOCALE_PATTERN.match(name)
+        }
+
+    def locales(self):
+        return list(self._columns)
+
+    def load(self, lang_code):
+        column = self._columns[lang_code]
+        try:
+            with open(self.file_path, 'r', encoding='utf-8-sig', newline='') as f:
+                rows = csv.reader(f)
+                key_column = next(rows).index('key')
+
+                def cells():
+                    for row in rows:
+                        if len(row) > column and row[column] and row[key_column]:
+                            yield row[key_column], row[column]
+
+                return _dotted_payload(cells(), self.file_path)
+        except (csv.Error, UnicodeDecodeError) as e:
+            raise SourceError(f'{self.file_path}: {e}') from e
+
+
+def _local_name(tag):
+    return tag.rpartition('}')[2]
+
+
+class XliffSource:
+    """An XLIFF 1.2 or 2.0 file holding one target language."""
+
+    def __init__(self, file_path):
+        self.file_path = file_path
+        self.lang_code = None
+        # Only read as far as the element naming the target language
+        try:
+            for _, element in ElementTree.iterparse(file_path, events=('start',)):
+                name = _local_name(element.tag)
+                if name == 'xliff' and element.get('trgLang'):
+                    self.lang_code = element.get('trgLang')
+                    break
+                if name == 'file' and element.get('target-language'):
+                    self.lang_code = element.get('target-language')
+                    break
+        except ElementTree.ParseError as e:
+            raise SourceError(f'{file_path}: {e}') from None
+        if self.lang_code is None:
+            raise SourceError(f'{file_path}: no target language')
+
+    def locales(self):
+        return [self.lang_code]
+
+    def _units(self):
+        for _, element in ElementTree.iterparse(self.file_path, events=('end',)):
+            name = _local_name(element.tag)
+            if name not in ('trans-unit', 'unit'):
+                continue
+            key = element.get('resname') or element.get('id')
+            target = next((child for child in element.iter() if _local_name(child.tag) == 'target'), None)
+            if key and target is not None:
+                # Inline markup is flattened to its text
+                text = ''.join(target.itertext())
+                if text:
+                    yield key, text
+            element.clear()
+
+    def load(self, lang_code):
+        try:
+            return _dotted_payload(self._units(), self.file_path)
+        except ElementTree.ParseError as e:
+            raise SourceError(f'{self.file_path}: {e}') from e
+
+
+def source_files(path):
+    """The supported files path stands for: itself, or those in the directory."""
+    if not os.path.exists(path):
+        raise SourceError(f'{path}: no such file or directory')
+    if not os.path.isdir(path):
+        if not _is_supported(path):
+            raise SourceError(f'{path}: unsupported file type')
+        return [path]
+    return sorted(
+        os.path.join(path, name) for name in os.listdir(path)
+        if not name.startswith('.') and _is_supported(name) and os.path.isfile(os.path.join(path, name))
+    )
+
+
+def open_source(path):
+    """Return the source for a file, or for every supported file in a directory."""
+    if os.path.isdir(path):
+        return MultiSource([_open_file(file_path) for file_path in source_files(path)])
+    return _open_file(source_files(path)[0])
+
+
+def _is_supported(file_path):
+    return file_path.endswith(JSON_EXTENSIONS + YAML_EXTENSIONS + CSV_EXTENSIONS + XLIFF_EXTENSIONS)
+
+
+def _open_file(file_path):
+    if file_path.endswith(CSV_EXTENSIONS):
+        return CsvSource(file_path)
+    if file_path.endswith(XLIFF_EXTENSIONS):
+        return XliffSource(file_path)
+    return DocumentSource(file_path)
+
+
+class MultiSource:
+    """Several sources read as one; later sources win where keys overlap."""
+
+    def __init__(self, sources):
+        self.sources = sources
+
+    def locales(self):
+        locales = {}
+        for source in self.sources:
+            for lang_code in source.locales():
+                locales.setdefault(lang_code, None)
+        return list(locales)
+
+    def load(self, lang_code):
+        payload = {}
+        for source in self.sources:
+            if lang_code in source.locales():
+                deep_merge(payload, source.load(lang_code))
+        return payload
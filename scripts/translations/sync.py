@@ -0,0 +1,334 @@
+"""Locale sync engine used by update_translations_example.py.
+
+Each locale is synced independently (read, merge, write), so the work can be
+spread across a process pool. Results always come back in task order, which
+keeps output and error reporting identical to a serial run.
+"""
+import asyncio
+import json
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from functools import partial
+from typing import Optional
+
+from catalog import from_leaves
+from fsutil import WriteBatch, fsync_directory
+from incremental import load_snapshot, payload_delta, save_snapshot
+from json_writer import MAX_IN_PLACE_CHANGES, apply_patches, patch_catalog, plan_patches, write_catalog
+from manifest import hash_bytes, hash_payload
+from merge import ChangeSet, deep_merge
+from shards import shards_current, write_shards
+from telemetry import PhaseTimer, profiled
+
+# Result statuses
+UPDATED = 'updated'
+UNCHANGED = 'unchanged'
+FAILED = 'failed'
+
+# Locales handled at once by run_sync_async()
+DEFAULT_IO_CONCURRENCY = 8
+
+
+@dataclass
+class SyncOptions:
+    # Patch changed values into the existing file instead of rewriting it;
+    # not crash-safe (see json_writer.apply_patches())
+    in_place: bool = False
+    # Also write per-namespace shards (see shards.py)
+    shards: bool = False
+    # Only apply payload keys that changed since the last snapshot
+    incremental: bool = False
+    # Write a cProfile dump per locale to this directory
+    profile_dir: Optional[str] = None
+    # Record the tracemalloc peak per locale
+    trace_memory: bool = False
+
+
+@dataclass
+class LocaleTask:
+    lang_code: str
+    file_path: str
+    translations: dict
+    # Manifest entry from the previous run, if any
+    previous: Optional[dict] = None
+    options: SyncOptions = field(default_factory=SyncOptions)
+    # Where the applied payload is kept; incremental runs diff against it
+    snapshot_path: Optional[str] = None
+
+
+@dataclass
+class LocaleResult:
+    lang_code: str
+    file_path: str
+    status: str
+    payload_hash: Optional[str] = None
+    output_hash: Optional[str] = None
+    changes: ChangeSet = field(default_factory=ChangeSet)
+    bytes_read: int = 0
+    bytes_written: int = 0
+    # Exclusive seconds per phase (see telemetry.PHASES)
+    timings: dict = field(default_factory=dict)
+    peak_traced_bytes: Optional[int] = None
+    # Highest traced memory per phase, with trace_memory
+    phase_peaks: dict = field(default_factory=dict)
+    error: Optional[str] = None
+
+    @property
+    def ok(self):
+        return self.status != FAILED
+
+
+class SyncError(Exception):
+    def __init__(self, failures):
+        self.failures = failures
+        details = ', '.join(f'{result.lang_code} ({result.error})' for result in failures)
+        super().__init__(f'Failed to update translations for {details}')
+
+
+class _LocaleSync:
+    """State of one locale's sync, shared by the steps below."""
+
+    def __init__(self, task, batch=None):
+        self.task = task
+        self.batch = batch
+        self.timer = PhaseTimer(task.options.trace_memory)
+        self.payload_hash = None
+        self.existing_bytes = b''
+        self.existing_hash = None
+
+    def result(self, status, output_hash, changes=None, bytes_written=0):
+        return LocaleResult(
+            self.task.lang_code,
+            self.task.file_path,
+            status,
+            self.payload_hash,
+            output_hash,
+            changes or ChangeSet(),
+            bytes_read=len(self.existing_bytes),
+            bytes_written=bytes_written,
+            timings=self.timer.totals,
+            phase_peaks=self.timer.peaks,
+        )
+
+    def in_place_hash(self):
+        """The manifest's hash of the file, if it may be patched in place (see apply_patches())."""
+        if not self.task.options.in_place:
+            return None
+        previous = self.task.previous or {}
+        # Only a file exactly as the last sync left it
+        return self.existing_hash if previous.get('output') == self.existing_hash else None
+
+    def apply_delta_in_place(self, delta):
+        """Patch the payload delta straight into the file's bytes, or return None."""
+        if not delta:
+            return self.result(UNCHANGED, self.existing_hash)
+        if len(delta) > MAX_IN_PLACE_CHANGES:
+            return None
+
+        with self.timer.phase('serialize'):
+            planned = plan_patches(self.existing_bytes, delta)
+        if planned is None:
+            return None
+        patches, changed = planned
+        if not patches:
+            return self.result(UNCHANGED, self.existing_hash)
+
+        with self.timer.phase('write'):
+            written = apply_patches(self.task.file_path, self.existing_bytes, patches, self.batch,
+                                    self.in_place_hash())
+        if written is None:
+            return None
+        changes = ChangeSet()
+        changes.overwritten.extend(changed)
+        return self.result(UPDATED, written[0], changes, written[1])
+
+    def run(self):
+        task, timer = self.task, self.timer
+        options = task.options
+        messages_dir = os.path.dirname(task.file_path)
+
+        with timer.phase('read'):
+            with open(task.file_path, 'rb') as f:
+                self.existing_bytes = f.read()
+        with timer.phase('hash'):
+            self.payload_hash = hash_payload(task.translations)
+            self.existing_hash = hash_bytes(self.existing_bytes)
+
+        # The file is exactly what the last sync produced
+        previous = task.previous or {}
+        file_is_current = previous.get('output') == self.existing_hash
+
+        # Same payload merged into the same file we produced last time:
+        # the result is known without parsing or merging anything
+        if file_is_current and previous.get('payload') == self.payload_hash:
+            if not options.shards or shards_current(messages_dir, task.lang_code, self.existing_hash):
+                return self.result(UNCHANGED, self.existing_hash)
+
+        patch = task.translations
+        if options.incremental and task.snapshot_path and file_is_current:
+            with timer.phase('read'):
+                snapshot = load_snapshot(task.snapshot_path)
+            if snapshot is not None:
+                with timer.phase('merge'):
+                    delta = payload_delta(snapshot, task.translations)
+                # Shards need the parsed catalog, so they always take the merge path
+                if not options.shards:
+                    result = self.apply_delta_in_place(delta)
+                    if result is not None:
+                        return result
+                patch = from_leaves(delta)
+
+        with timer.phase('parse'):
+            existing_translations = json.loads(self.existing_bytes.decode('utf-8'))
+        with timer.phase('merge'):
+            changes = deep_merge(existing_translations, patch)
+
+        # Nothing merged means nothing to serialize; the file is left as-is
+        status, output_hash, bytes_written = UNCHANGED, self.existing_hash, 0
+        if changes:
+            written = None
+            with timer.phase('write'):
+                if options.in_place:
+                    written = patch_catalog(task.file_path, self.existing_bytes, existing_translations, changes,
+                                            self.batch, self.in_place_hash())
+                if written is None:
+                    written = write_catalog(task.file_path, existing_translations, timer, self.batch)
+            status = UPDATED
+            output_hash, bytes_written = written
+
+        # Shards are cut from the merged catalog, never from a separate read
+        if options.shards and not shards_current(messages_dir, task.lang_code, output_hash):
+            with timer.phase('shards'):
+                write_shards(messages_dir, task.lang_code, existing_translations, output_hash, self.batch)
+
+        return self.result(status, output_hash, changes, bytes_written)
+
+
+def _sync_locale(task, batch=None):
+    result = _LocaleSync(task, batch).run()
+    # Saved here, with the catalog, since the payload is not kept after the
+    # task; a batched snapshot only lands if the catalog does
+    if task.snapshot_path:
+        previous = task.previous or {}
+        if previous.get('payload') != result.payload_hash or not os.path.exists(task.snapshot_path):
+            save_snapshot(task.snapshot_path, task.translations, batch)
+    return result
+
+
+def sync_locale(task, batch=None):
+    # Errors are captured rather than raised so that one broken locale
+    # doesn't abort the others, whichever executor runs the task
+    options = task.options
+    profile_path = None
+    if options.profile_dir:
+        profile_path = os.path.join(options.profile_dir, f'{task.lang_code}.prof')
+    try:
+        result, peak = profiled(partial(_sync_locale, batch=batch), task, profile_path, options.trace_memory)
+    except Exception as e:
+        return LocaleResult(task.lang_code, task.file_path, FAILED, error=f'{type(e).__name__}: {e}')
+    if peak is not None:
+        # Phases reset tracemalloc's peak as they start, so theirs count too
+        peak = max([peak, *result.phase_peaks.values()])
+    result.peak_traced_bytes = peak
+    return result
+
+
+def run_sync(tasks, jobs=1):
+    """Run LocaleTasks, returning their results in task order.
+
+    tasks may be a lazy iterable; at most `jobs` tasks (and their payloads)
+    are held at a time.
+    """
+    if jobs <= 1:
+        return [sync_locale(task) for task in tasks]
+
+    results = []
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        pending = deque()
+        for task in tasks:
+            if len(pending) >= jobs:
+                results.append(pending.popleft().result())
+            pending.append(pool.submit(sync_locale, task))
+        results.extend(future.result() for future in pending)
+    return results
+
+
+def _failed(result, error):
+    return LocaleResult(result.lang_code, result.file_path, FAILED, result.payload_hash, error=error)
+
+
+async def _run_sync_async(tasks, concurrency):
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def bounded(function, *args):
+        async with semaphore:
+            return await asyncio.to_thread(function, *args)
+
+    # Workers pull tasks as they go, so a lazy iterable is only read
+    # `concurrency` tasks ahead
+    pending = enumerate(tasks)
+    pull_lock = asyncio.Lock()
+    outcomes = {}
+
+    async def worker():
+        while True:
+            async with pull_lock:
+                index, task = await asyncio.to_thread(next, pending, (None, None))
+            if task is None:
+                return
+            batch = WriteBatch()
+            outcomes[index] = (await bounded(sync_locale, task, batch), batch)
+
+    # Let running workers finish before bailing out, so nothing is staged
+    # behind our back
+    errors = [
+        error for error in await asyncio.gather(*(worker() for _ in range(concurrency)), return_exceptions=True)
+        if error is not None
+    ]
+    if errors:
+        # e.g. a payload that failed to load; nothing staged is committed
+        for _, batch in outcomes.values():
+            batch.discard()
+        raise errors[0]
+    results = [outcomes[index][0] for index in range(len(outcomes))]
+    batches = [outcomes[index][1] for index in range(len(outcomes))]
+
+    async def flush(result, batch):
+        if result.ok:
+            try:
+                await bounded(batch.flush)
+            except OSError as e:
+                return e
+        return None
+
+    # One concurrent round of fsyncs for every file written, instead of one
+    # fsync per write; nothing is renamed into place until its locale's
+    # files have all landed
+    errors = await asyncio.gather(*(flush(result, batch) for result, batch in zip(results, batches)))
+    directories = set()
+    for index, (result, batch, error) in enumerate(zip(results, batches, errors)):
+        if result.ok and error is None:
+            try:
+                directories |= batch.commit()
+                continue
+            except OSError as e:
+                error = e
+        batch.discard()
+        if error is not None:
+            results[index] = _failed(result, f'{type(error).__name__}: {error}')
+
+    await asyncio.gather(*(bounded(fsync_directory, directory) for directory in sorted(directories)))
+    return results
+
+
+def run_sync_async(tasks, concurrency=DEFAULT_IO_CONCURRENCY):
+    """Run LocaleTasks with overlapping, thread-offloaded file I/O.
+
+    Meant for catalogs on network filesystems, where a sync is bound by
+    round-trips rather than CPU: up to `concurrency` locales read, merge
+    and stage their files at once, then all staged files are fsynced
+    together and renamed into place. Results come back in task order.
+    """
+    return asyncio.run(_run_sync_async(tasks, max(1, concurrency)))
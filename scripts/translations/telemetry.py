@@ -0,0 +1,129 @@
+"""Run instrumentation: phase timings, profiling and JSON-lines telemetry."""
+import cProfile
+import json
+import os
+import time
+import tracemalloc
+import uuid
+from contextlib import contextmanager
+
+# Sync phases, in the order they happen
+PHASES = ('read', 'hash', 'parse', 'merge', 'serialize', 'write', 'shards')
+
+
+class PhaseTimer:
+    """Accumulates exclusive wall time per phase.
+
+    Phases nest: time spent in an inner phase is not counted towards the
+    phase around it, so the totals add up to the measured wall time.
+
+    With trace_memory, and while tracemalloc is tracing, peaks records the
+    highest traced memory seen while each phase ran. Entering a phase resets
+    tracemalloc's peak, so the peak until then is carried over to the
+    enclosing phase first.
+    """
+
+    def __init__(self, trace_memory=False):
+        self.totals = {}
+        self.peaks = {}
+        self.trace_memory = trace_memory
+        self._stack = []
+
+    def _carry_peak(self, peak):
+        if self._stack:
+            self._stack[-1][2] = max(self._stack[-1][2], peak)
+
+    @contextmanager
+    def phase(self, name):
+        tracing = self.trace_memory and tracemalloc.is_tracing()
+        peak = 0
+        if tracing:
+            self._carry_peak(tracemalloc.get_traced_memory()[1])
+            tracemalloc.reset_peak()
+            peak = tracemalloc.get_traced_memory()[1]
+        # [start, seconds spent in inner phases, peak traced bytes so far]
+        frame = [time.perf_counter(), 0.0, peak]
+        self._stack.append(frame)
+        try:
+            yield
+        finally:
+            self._stack.pop()
+            elapsed = time.perf_counter() - frame[0]
+            self.totals[name] = self.totals.get(name, 0.0) + elapsed - frame[1]
+            if self._stack:
+                self._stack[-1][1] += elapsed
+            if tracing:
+                peak = max(frame[2], tracemalloc.get_traced_memory()[1])
+                self.peaks[name] = max(self.peaks.get(name, 0), peak)
+                self._carry_peak(peak)
+
+    def wrap(self, name, iterable):
+        """Yield from iterable, charging the time spent producing items to phase name."""
+        iterator = iter(iterable)
+        while True:
+            with self.phase(name):
+                try:
+                    item = next(iterator)
+                except StopIteration:
+                    return
+            yield item
+
+
+class NullTimer:
+    """Stand-in for PhaseTimer when nothing is being measured."""
+
+    totals = {}
+
+    @contextmanager
+    def phase(self, name):
+        yield
+
+    def wrap(self, name, iterable):
+        return iterable
+
+
+NULL_TIMER = NullTimer()
+
+
+def profiled(function, argument, profile_path=None, trace_memory=False):
+    """Call function(argument) under cProfile and/or tracemalloc.
+
+    Returns (result, peak traced bytes or None). The profile is written to
+    profile_path when one is given. tracemalloc is process-wide, so calls
+    must not overlap (one locale at a time per process).
+    """
+    started_tracing = False
+    if trace_memory:
+        if tracemalloc.is_tracing():
+            tracemalloc.reset_peak()
+        else:
+            tracemalloc.start()
+            started_tracing = True
+
+    try:
+        if profile_path:
+            profiler = cProfile.Profile()
+            result = profiler.runcall(function, argument)
+            os.makedirs(os.path.dirname(os.path.abspath(profile_path)), exist_ok=True)
+            profiler.dump_stats(profile_path)
+        else:
+            result = function(argument)
+        peak = tracemalloc.get_traced_memory()[1] if trace_memory else None
+    finally:
+        if started_tracing:
+            tracemalloc.stop()
+    return result, peak
+
+
+class TelemetryWriter:
+    """Appends one JSON object per line to a file, tagged with a run id."""
+
+    def __init__(self, path):
+        self.path = path
+        self.run_id = uuid.uuid4().hex
+
+    def emit(self, event, **fields):
+        record = {'event': event, 'run_id': self.run_id, 'time': time.time(), **fields}
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        with open(self.path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(record, ensure_ascii=False, sort_keys=True) + '\n')
@@ -0,0 +1,175 @@
+"""Per-tenant overlays on the global catalogs.
+
+A tenant's overlay is a translation source (see sources.py), usually a
+directory tenants/<tenant>/ of <locale>.json patches, merged over the base
+catalog of each locale with deep_merge(). The merge is copy-on-write: only
+the dicts on the path to a key the patch sets are copied, and every other
+subtree is the base catalog's own object, so thousands of tenants that
+reword a few invoiceTemplate or emailTemplate strings cost little more
+than the strings themselves.
+
+BundleCache serves bundles to long-running callers such as a render
+server: get_bundle(tenant, locale) keeps a bounded number of materialized
+bundles, evicting the least recently used, and counts hits, misses and the
+memory the cached bundles hold on top of the shared catalogs.
+"""
+import os
+import sys
+from collections import OrderedDict
+
+from catalog import MISSING
+from merge import ChangeSet, deep_merge
+from sources import SourceError, open_source
+
+DEFAULT_CACHE_SIZE = 256
+
+
+def tenant_dirs(tenants_dir):
+    """{tenant: directory} for the tenant overlay directories in tenants_dir."""
+    if not os.path.isdir(tenants_dir):
+        return {}
+    return {
+        name: os.path.join(tenants_dir, name) for name in sorted(os.listdir(tenants_dir))
+        if not name.startswith('.') and os.path.isdir(os.path.join(tenants_dir, name))
+    }
+
+
+def tenant_dir(tenants_dir, tenant):
+    directory = os.path.join(tenants_dir, tenant)
+    # Tenant names may come from requests; they never reach outside tenants_dir
+    if not tenant or tenant.startswith('.') or os.path.basename(directory) != tenant or not os.path.isdir(directory):
+        raise SourceError(f'{tenants_dir}: no overlay directory for tenant {tenant!r}')
+    return directory
+
+
+def _copy_patched_dicts(base, patch):
+    """Shallow copy of base in which every dict the patch descends into is a copy too."""
+    copy = dict(base)
+    stack = [(copy, patch)]
+    while stack:
+        target, patch_node = stack.pop()
+        for key, value in patch_node.items():
+            current = target.get(key)
+            if isinstance(value, dict) and isinstance(current, dict):
+                current = target[key] = dict(current)
+                stack.append((current, value))
+    return copy
+
+
+def overlay(base, patch, changes=None):
+    """deep_merge(copy of base, patch) without copying what the patch leaves alone; returns the bundle.
+
+    base is never modified. The bundle is base itself when the patch
+    changes nothing, and shares every subtree the patch doesn't reach into
+    with base.
+    """
+    if changes is None:
+        changes = ChangeSet()
+    changed_before = len(changes)
+    bundle = _copy_patched_dicts(base, patch)
+    deep_merge(bundle, patch, changes)
+    return bundle if len(changes) > changed_before else base
+
+
+def unshared_size(bundle, base):
+    """Approximate bytes held by bundle that aren't shared with base."""
+    size = 0
+    stack = [(bundle, base)]
+    while stack:
+        node, shared = stack.pop()
+        if node is shared:
+            continue
+        size += sys.getsizeof(node)
+        if not isinstance(shared, dict):
+            shared = {}
+        for key, value in node.items():
+            other = shared.get(key, MISSING)
+            if value is other:
+                continue
+            if isinstance(value, dict):
+                stack.append((value, other))
+            else:
+                size += sys.getsizeof(value)
+    return size
+
+
+def tenant_bundles(catalogs, directory):
+    """Yield (locale, bundle, ChangeSet) for each catalog in {locale: catalog}.
+
+    The tenant's source is opened once and each locale's patch is loaded as
+    its bundle is built; locales the tenant has no patch for get the
+    catalog itself.
+    """
+    source = open_source(directory)
+    locales = set(source.locales())
+    for lang_code, catalog in catalogs.items():
+        changes = ChangeSet()
+        bundle = overlay(catalog, source.load(lang_code), changes) if lang_code in locales else catalog
+        yield lang_code, bundle, changes
+
+
+
+class BundleCache:
+    """LRU cache of tenant bundles over the catalogs in {locale: catalog}.
+
+    A tenant's source is opened again on each miss, so nothing but the
+    cached bundles is kept between lookups.
+    """
+
+    def __init__(self, catalogs, tenants_dir, max_entries=DEFAULT_CACHE_SIZE):
+        self.catalogs = catalogs
+        self.tenants_dir = tenants_dir
+        self.max_entries = max_entries
+        # (tenant, locale) -> (bundle, ChangeSet, unshared size)
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.resident_bytes = 0
+
+    def get(self, tenant, lang_code):
+        """(bundle, ChangeSet) of the tenant in the locale; raises SourceError for an unknown tenant."""
+        key = (tenant, lang_code)
+        entry = self.entries.get(key)
+        if entry is not None:
+            self.hits += 1
+            self.entries.move_to_end(key)
+            return entry[0], entry[1]
+
+        self.misses += 1
+        base = self.catalogs[lang_code]
+        source = open_source(tenant_dir(self.tenants_dir, tenant))
+        changes = ChangeSet()
+        bundle = overlay(base, source.load(lang_code), changes) if lang_code in source.locales() else base
+        size = unshared_size(bundle, base)
+        self.entries[key] = (bundle, changes, size)
+        self.resident_bytes += size
+        while len(self.entries) > self.max_entries:
+            self._evict(next(iter(self.entries)))
+            self.evictions += 1
+        return bundle, changes
+
+    def get_bundle(self, tenant, lang_code):
+        """The tenant's catalog for the locale. Shared with the cache and the base catalog; don't modify it."""
+        return self.get(tenant, lang_code)[0]
+
+    def _evict(self, key):
+        _, _, size = self.entries.pop(key)
+        self.resident_bytes -= size
+
+    def invalidate(self, tenant=None):
+        """Drop the cached bundles of a tenant (or all), e.g. after its overlay changed."""
+        for key in [key for key in self.entries if tenant is None or key[0] == tenant]:
+            self._evict(key)
+
+    def metrics(self):
+        lookups = self.hits + self.misses
+        return {
+            'entries': len(self.entries),
+            'max_entries': self.max_entries,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'evictions': self.evictions,
+            'resident_bytes': self.resident_bytes,
+        }
@@ -0,0 +1,18 @@
+import json
+import os
+import sys
+
+import pytest
+
+# The scripts import their sibling modules directly, as they do when run from scripts/translations
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture
+def catalog_file(tmp_path):
+    """Write a catalog to tmp_path the way update_translations() does; returns its path."""
+    def write(catalog, name='de.json'):
+        file_path = tmp_path / name
+        file_path.write_text(json.dumps(catalog, indent=2, ensure_ascii=False), encoding='utf-8')
+        return file_path
+    return write
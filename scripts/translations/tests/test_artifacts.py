@@ -0,0 +1,83 @@
+import gzip
+import json
+import os
+
+import pytest
+
+import artifacts
+from artifacts import MANIFEST_FILE, build_artifacts, load_manifest, minify
+from manifest import hash_bytes
+
+CATALOGS = [
+    ('en', {'invoice': {'title': 'Invoice', 'total': 'Total'}, 'common': {'save': 'Save'}}),
+    ('zh', {'invoice': {'title': '发票', 'total': '总计'}, 'common': {'save': '保存'}}),
+]
+
+
+@pytest.fixture(autouse=True)
+def gzip_only(monkeypatch):
+    # Whether brotli is installed must not change what the tests see
+    monkeypatch.setattr(artifacts, 'brotli', None)
+
+
+def _listing(out_dir):
+    return sorted(os.listdir(out_dir))
+
+
+def test_artifacts_are_minified_hashed_and_precompressed(tmp_path):
+    manifest = build_artifacts(CATALOGS, str(tmp_path))
+    assert manifest == load_manifest(str(tmp_path))
+
+    entry = manifest['zh']
+    data = (tmp_path / entry['file']).read_bytes()
+    assert data == minify(CATALOGS[1][1])
+    assert '发票'.encode('utf-8') in data
+    assert entry['file'] == f'zh.{hash_bytes(data)[:12]}.json'
+    assert (entry['sha256'], entry['size']) == (hash_bytes(data), len(data))
+    gz = entry['encodings']['gzip']
+    assert gz['file'] == entry['file'] + '.gz'
+    assert gzip.decompress((tmp_path / gz['file']).read_bytes()) == data
+    assert gz['size'] == os.path.getsize(tmp_path / gz['file'])
+
+    namespace = entry['namespaces']['invoice']
+    assert namespace['file'].startswith('zh.invoice.')
+    assert json.loads((tmp_path / namespace['file']).read_bytes()) == {'invoice': CATALOGS[1][1]['invoice']}
+    # Two locales, each with a whole-catalog file and two namespaces, plus their .gz copies and the manifest
+    assert len(_listing(tmp_path)) == 2 * 3 * 2 + 1
+
+
+def test_output_depends_only_on_content(tmp_path):
+    build_artifacts(CATALOGS, str(tmp_path / 'first'))
+    build_artifacts(CATALOGS, str(tmp_path / 'second'))
+    assert _listing(tmp_path / 'first') == _listing(tmp_path / 'second')
+    for name in _listing(tmp_path / 'first'):
+        assert (tmp_path / 'first' / name).read_bytes() == (tmp_path / 'second' / name).read_bytes()
+
+
+def test_rebuilds_keep_unchanged_files_and_remove_stale_ones(tmp_path):
+    first = build_artifacts(CATALOGS, str(tmp_path))
+    kept = tmp_path / first['en']['namespaces']['common']['file']
+    kept_mtime = os.stat(kept).st_mtime_ns
+    (tmp_path / 'robots.txt').write_text('not ours')
+
+    changed = [('en', {'invoice': {'title': 'Bill', 'total': 'Total'}, 'common': {'save': 'Save'}})]
+    second = build_artifacts(changed, str(tmp_path))
+    assert os.stat(kept).st_mtime_ns == kept_mtime
+    assert second['en']['namespaces']['common'] == first['en']['namespaces']['common']
+    assert second['en']['file'] != first['en']['file']
+    assert not (tmp_path / first['en']['file']).exists()
+    assert not (tmp_path / (first['en']['file'] + '.gz')).exists()
+    assert not (tmp_path / first['zh']['file']).exists()
+    assert 'robots.txt' in _listing(tmp_path)
+    assert len(_listing(tmp_path)) == 3 * 2 + 2
+
+
+def test_namespaces_must_be_usable_as_file_names(tmp_path):
+    with pytest.raises(ValueError, match="'../escape' in en"):
+        build_artifacts([('en', {'../escape': {}})], str(tmp_path))
+
+
+def test_a_broken_manifest_is_treated_as_empty(tmp_path):
+    (tmp_path / MANIFEST_FILE).write_text('{')
+    assert load_manifest(str(tmp_path)) == {}
+    assert load_manifest(str(tmp_path / 'missing')) == {}
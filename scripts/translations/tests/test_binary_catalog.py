@@ -0,0 +1,112 @@
+import json
+import os
+
+import pytest
+
+from binary_catalog import BinaryCatalog, CatalogFormatError, compile_catalog, verify_catalog
+
+MESSAGES_DIR = os.path.join(os.path.dirname(__file__), '..', '..', '..', 'src', 'i18n', 'messages')
+
+CATALOG = {
+    'invoice': {
+        'title': 'Rechnung',
+        'email': {'toast': {'success': {'description': 'E-Mail an {recipient} gesendet'}}},
+        'limits': {'maxItems': 50, 'enabled': True, 'note': None, 'steps': ['one', 'two']},
+        'drafts': {},
+    },
+    'zh': {'登录': '登录'},
+    'a': 'first in document order, not in key order',
+}
+
+
+def test_repository_catalogs_round_trip(tmp_path):
+    for name in sorted(os.listdir(MESSAGES_DIR)):
+        with open(os.path.join(MESSAGES_DIR, name), 'r', encoding='utf-8') as f:
+            catalog = json.load(f)
+        file_path = str(tmp_path / name.replace('.json', '.bin'))
+        compile_catalog(catalog, file_path)
+        assert verify_catalog(file_path, catalog) == [], name
+        with BinaryCatalog(file_path) as compiled:
+            assert json.dumps(compiled.to_catalog(), ensure_ascii=False) == json.dumps(catalog, ensure_ascii=False)
+
+
+def test_values_keep_their_types_and_key_order(tmp_path):
+    file_path = str(tmp_path / 'de.bin')
+    compile_catalog(CATALOG, file_path)
+    with BinaryCatalog(file_path) as compiled:
+        assert len(compiled) == 9
+        assert compiled.get('invoice.limits.maxItems') == 50
+        assert compiled.get('invoice.limits.enabled') is True
+        assert compiled.get('invoice.limits.note') is None
+        assert compiled.get('invoice.limits.steps') == ['one', 'two']
+        assert compiled.get('invoice.drafts') == {}
+        assert list(compiled.to_catalog()) == ['invoice', 'zh', 'a']
+        assert compiled.to_catalog() == CATALOG
+
+
+def test_lookups(tmp_path):
+    file_path = str(tmp_path / 'de.bin')
+    compile_catalog(CATALOG, file_path)
+    with BinaryCatalog(file_path) as compiled:
+        assert compiled.get('invoice.email.toast.success.description') == 'E-Mail an {recipient} gesendet'
+        assert compiled.get('zh.登录') == '登录'
+        assert 'invoice.title' in compiled
+        assert compiled.get('invoice.limits.note', default='absent') is None
+        # Only leaves are addressable
+        assert 'invoice' not in compiled
+        assert 'invoice.titl' not in compiled
+        assert compiled.get('missing', default='absent') == 'absent'
+
+
+def test_items_are_limited_to_the_prefix(tmp_path):
+    file_path = str(tmp_path / 'de.bin')
+    compile_catalog({'invoice': {'b': '2', 'a': '1'}, 'invoiceTemplate': {'c': '3'}, 'z': '4'}, file_path)
+    with BinaryCatalog(file_path) as compiled:
+        assert list(compiled.items('invoice')) == [('invoice.a', '1'), ('invoice.b', '2')]
+        assert [key for key, _ in compiled.items()] == ['invoice.a', 'invoice.b', 'invoiceTemplate.c', 'z']
+        assert list(compiled.items('nothing')) == []
+
+
+def test_verify_reports_a_stale_compiled_catalog(tmp_path):
+    file_path = str(tmp_path / 'de.bin')
+    compile_catalog(CATALOG, file_path)
+    changed = json.loads(json.dumps(CATALOG))
+    changed['invoice']['title'] = 'Faktura'
+    changed['invoice']['limits']['maxItems'] = '50'
+    assert verify_catalog(file_path, changed) == [
+        "invoice.title: expected 'Faktura', found 'Rechnung'",
+        "invoice.limits.maxItems: expected '50', found 50",
+    ]
+
+
+def test_dotted_keys_cannot_be_compiled(tmp_path):
+    with pytest.raises(CatalogFormatError, match='a.b'):
+        compile_catalog({'a.b': 'x'}, str(tmp_path / 'de.bin'))
+
+
+@pytest.mark.parametrize('data, message', [
+    (b'BEC', 'too small'),
+    (b'XXXX' + bytes(20), 'not a version 1'),
+])
+def test_unreadable_files_are_rejected(tmp_path, data, message):
+    file_path = tmp_path / 'de.bin'
+    file_path.write_bytes(data)
+    with pytest.raises(CatalogFormatError, match=message):
+        BinaryCatalog(str(file_path))
+
+
+def test_truncated_files_are_rejected(tmp_path):
+    file_path = tmp_path / 'de.bin'
+    compile_catalog(CATALOG, str(file_path))
+    file_path.write_bytes(file_path.read_bytes()[:-1])
+    with pytest.raises(CatalogFormatError, match='truncated'):
+        BinaryCatalog(str(file_path))
+
+
+def test_close_releases_the_map(tmp_path):
+    file_path = str(tmp_path / 'de.bin')
+    compile_catalog(CATALOG, file_path)
+    compiled = BinaryCatalog(file_path)
+    compiled.close()
+    compiled.close()
+    assert compiled._map is None and compiled._view is None
@@ -0,0 +1,152 @@
+import json
+import os
+
+import pytest
+
+import checkpoint
+from checkpoint import COMMIT_PHASE, STAGED, Journal, run_checkpointed, staged_path
+from merge import deep_merge
+from sync import FAILED, UNCHANGED, UPDATED, LocaleTask
+
+ORIGINAL = {'common': {'title': 'Alt'}, 'form': {'save': 'Speichern'}}
+
+
+@pytest.fixture
+def messages(tmp_path):
+    directory = tmp_path / 'messages'
+    directory.mkdir()
+    for lang_code in ('de', 'fr'):
+        (directory / f'{lang_code}.json').write_text(json.dumps(ORIGINAL, indent=2), encoding='utf-8')
+    return directory
+
+
+def _task_factory(messages, state_dir, payloads):
+    def make_task(lang_code):
+        payload = payloads[lang_code]
+        if isinstance(payload, Exception):
+            raise payload
+        return LocaleTask(lang_code, str(messages / f'{lang_code}.json'), payload,
+                          snapshot_path=os.path.join(state_dir, 'snapshots', f'{lang_code}.json'))
+    return make_task
+
+
+def _catalog(messages, lang_code):
+    return json.loads((messages / f'{lang_code}.json').read_text(encoding='utf-8'))
+
+
+def _run(messages, state_dir, payloads):
+    make_task = _task_factory(messages, state_dir, payloads)
+    return run_checkpointed(list(payloads), make_task, state_dir, log=lambda line: None)
+
+
+def _record_merges(monkeypatch, merged):
+    def recording_merge(catalog, patch):
+        merged.append(patch)
+        return deep_merge(catalog, patch)
+    monkeypatch.setattr(checkpoint, 'deep_merge', recording_merge)
+
+
+def test_successful_run_commits_every_locale(messages, tmp_path):
+    state_dir = str(tmp_path / 'state')
+    payloads = {'de': {'common': {'title': 'Neu'}}, 'fr': {'form': {'save': 'Enregistrer'}}}
+    results = _run(messages, state_dir, payloads)
+    assert [result.status for result in results] == [UPDATED, UPDATED]
+    assert _catalog(messages, 'de')['common']['title'] == 'Neu'
+    assert _catalog(messages, 'fr')['form']['save'] == 'Enregistrer'
+    # Nothing staged or journaled is left behind
+    assert not os.path.exists(os.path.join(state_dir, checkpoint.JOURNAL_DIR))
+    assert sorted(os.listdir(messages)) == ['de.json', 'fr.json']
+    assert os.path.exists(os.path.join(state_dir, 'snapshots', 'de.json'))
+
+
+def test_failed_locale_stages_the_others_without_touching_the_catalogs(messages, tmp_path):
+    state_dir = str(tmp_path / 'state')
+    payloads = {'de': {'common': {'title': 'Neu'}}, 'fr': ValueError('bad delivery')}
+    results = _run(messages, state_dir, payloads)
+    assert [result.status for result in results] == [STAGED, FAILED]
+    assert 'bad delivery' in results[1].error
+    assert _catalog(messages, 'de') == ORIGINAL
+    assert os.path.exists(staged_path(str(messages / 'de.json')))
+    assert 'de' in Journal.load(state_dir).locales
+
+
+def test_rerun_resumes_without_merging_staged_locales_again(messages, tmp_path, monkeypatch):
+    state_dir = str(tmp_path / 'state')
+    payloads = {'de': {'common': {'title': 'Neu'}}, 'fr': ValueError('bad delivery')}
+    _run(messages, state_dir, payloads)
+
+    merged = []
+    _record_merges(monkeypatch, merged)
+    payloads['fr'] = {'form': {'save': 'Enregistrer'}}
+    results = _run(messages, state_dir, payloads)
+    assert [result.status for result in results] == [UPDATED, UPDATED]
+    assert results[0].changes.overwritten == [('common', 'title')]
+    assert merged == [{'form': {'save': 'Enregistrer'}}]
+    assert _catalog(messages, 'de')['common']['title'] == 'Neu'
+    assert _catalog(messages, 'fr')['form']['save'] == 'Enregistrer'
+    assert not os.path.exists(staged_path(str(messages / 'de.json')))
+
+
+def test_interrupted_locale_resumes_after_its_last_checkpointed_namespace(messages, tmp_path, monkeypatch):
+    state_dir = str(tmp_path / 'state')
+    payloads = {'de': {'common': {'title': 'Neu'}, 'form': {'save': 'Sichern'}}}
+    merged = []
+
+    def interrupted(catalog, patch):
+        if 'form' in patch:
+            raise KeyboardInterrupt
+        merged.append(patch)
+        return deep_merge(catalog, patch)
+
+    monkeypatch.setattr(checkpoint, 'deep_merge', interrupted)
+    with pytest.raises(KeyboardInterrupt):
+        _run(messages, state_dir, payloads)
+    assert Journal.load(state_dir).locales['de']['namespaces'] == 1
+
+    _record_merges(monkeypatch, merged)
+    results = _run(messages, state_dir, payloads)
+    assert results[0].status == UPDATED
+    assert merged == [{'common': {'title': 'Neu'}}, {'form': {'save': 'Sichern'}}]
+    assert _catalog(messages, 'de') == {'common': {'title': 'Neu'}, 'form': {'save': 'Sichern'}}
+
+
+def test_changed_catalog_discards_the_staged_work(messages, tmp_path):
+    state_dir = str(tmp_path / 'state')
+    payloads = {'de': {'common': {'title': 'Neu'}}, 'fr': ValueError('bad delivery')}
+    _run(messages, state_dir, payloads)
+
+    edited = dict(ORIGINAL, extra='von Hand')
+    (messages / 'de.json').write_text(json.dumps(edited, indent=2), encoding='utf-8')
+    payloads['fr'] = {}
+    _run(messages, state_dir, payloads)
+    assert _catalog(messages, 'de') == dict(edited, common={'title': 'Neu'})
+
+
+def test_interrupted_commit_is_rolled_forward(messages, tmp_path, monkeypatch):
+    state_dir = str(tmp_path / 'state')
+    payloads = {'de': {'common': {'title': 'Neu'}}, 'fr': {'common': {'title': 'Nouveau'}}}
+
+    replace = os.replace
+    renamed = []
+
+    def crash_after_first_catalog(source, target):
+        if source.endswith(checkpoint.STAGED_SUFFIX) and renamed:
+            raise OSError('power cut')
+        replace(source, target)
+        if source.endswith(checkpoint.STAGED_SUFFIX):
+            renamed.append(target)
+
+    monkeypatch.setattr(checkpoint.os, 'replace', crash_after_first_catalog)
+    with pytest.raises(OSError):
+        _run(messages, state_dir, payloads)
+    monkeypatch.setattr(checkpoint.os, 'replace', replace)
+    assert Journal.load(state_dir).phase == COMMIT_PHASE
+    assert _catalog(messages, 'de')['common']['title'] == 'Neu'
+    assert _catalog(messages, 'fr') == ORIGINAL
+
+    logged = []
+    results = run_checkpointed(['de', 'fr'], _task_factory(messages, state_dir, payloads), state_dir, log=logged.append)
+    assert logged == ['Finished committing the interrupted sync of de, fr']
+    assert _catalog(messages, 'fr')['common']['title'] == 'Nouveau'
+    assert [result.status for result in results] == [UNCHANGED, UNCHANGED]
+    assert not os.path.exists(os.path.join(state_dir, checkpoint.JOURNAL_DIR))
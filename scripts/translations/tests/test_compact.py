@@ -0,0 +1,64 @@
+import json
+import os
+
+import pytest
+
+from compact import BRANCH, CompactCatalog, KeyTable, compact_catalogs
+
+MESSAGES_DIR = os.path.join(os.path.dirname(__file__), '..', '..', '..', 'src', 'i18n', 'messages')
+
+EDGE_CASES = {
+    'empty': {},
+    'scalars': {'text': 'Rechnung', 'int': 0, 'float': 1.5, 'true': True, 'false': False, 'none': None,
+                'list': [1, 'a']},
+    'nested': {'z': {'y': {'x': 'deep', 'empty': {}}}, 'a': {}},
+}
+
+
+def _items(value):
+    """Nested (key, value) pairs, so comparisons check key order and types (1 vs True) too."""
+    if isinstance(value, dict):
+        return [(key, _items(item)) for key, item in value.items()]
+    return (type(value), value)
+
+
+def _repository_catalogs():
+    for name in sorted(os.listdir(MESSAGES_DIR)):
+        with open(os.path.join(MESSAGES_DIR, name), 'r', encoding='utf-8') as f:
+            yield name[:-len('.json')], json.load(f)
+
+
+def test_repository_catalogs_round_trip():
+    catalogs = dict(_repository_catalogs())
+    table = KeyTable()
+    compact = compact_catalogs(catalogs.items(), table)
+    for lang_code, catalog in catalogs.items():
+        assert _items(compact[lang_code].to_catalog()) == _items(catalog), lang_code
+    # Every locale's key paths are interned once
+    assert len(table) < sum(len(compacted.order) for compacted in compact.values())
+
+
+@pytest.mark.parametrize('catalog', EDGE_CASES.values(), ids=EDGE_CASES.keys())
+def test_edge_cases_round_trip(catalog):
+    assert _items(CompactCatalog.from_catalog(catalog, KeyTable()).to_catalog()) == _items(catalog)
+
+
+def test_catalogs_share_node_ids():
+    table = KeyTable()
+    compact = compact_catalogs([('en', {'a': {'b': 'B'}, 'c': 'C'}), ('de', {'c': 'C2', 'a': {'d': 'D'}})], table)
+    a_b = table.node(table.node(0, 'a'), 'b')
+    assert table.path(a_b) == ('a', 'b')
+    assert table.dotted(a_b) == 'a.b'
+    assert compact['en'].values[a_b] == 'B'
+    assert compact['en'].values[table.node(0, 'a')] is BRANCH
+    # de keeps its own key order
+    assert list(compact['de'].to_catalog()) == ['c', 'a']
+
+
+def test_iter_leaves():
+    table = KeyTable()
+    compact = CompactCatalog.from_catalog({'a': {'b': 'B', 'e': {}}, 'c': {}, 'd': 1}, table)
+    assert [(table.dotted(node_id), value) for node_id, value in compact.iter_leaves()] == [('a.b', 'B'), ('d', 1)]
+    assert [(table.dotted(node_id), value) for node_id, value in compact.iter_leaves(include_empty=True)] == [
+        ('a.b', 'B'), ('a.e', {}), ('c', {}), ('d', 1),
+    ]
@@ -0,0 +1,88 @@
+import json
+import shutil
+import subprocess
+
+import pytest
+
+from diff import DiffError, changelog_report, diff_catalogs, format_changelog, git_catalogs
+
+OLD = {
+    'de': {
+        'invoice': {'title': 'Rechnung', 'total': 'Summe', 'status': 'Offen', 'items': 3},
+        'common': {'save': 'Speichern'},
+    },
+    'fr': {'invoice': {'title': 'Facture'}},
+}
+NEW = {
+    'de': {
+        'invoice': {
+            'title': 'Rechnung', 'total': 'Gesamt', 'status': {'open': 'Offen', 'paid': 'Bezahlt'}, 'items': 3.0,
+        },
+        'common': {'save': 'Speichern', 'cancel': 'Abbrechen'},
+    },
+    'pl': {'invoice': {'title': 'Faktura'}},
+}
+
+
+def test_changelogs_per_locale():
+    changelogs = diff_catalogs(OLD, NEW)
+    assert list(changelogs) == ['de', 'fr', 'pl']
+    assert changelogs['de'] == {
+        'added': [
+            ('common.cancel', 'Abbrechen'),
+            ('invoice.status.open', 'Offen'),
+            ('invoice.status.paid', 'Bezahlt'),
+        ],
+        # A string turned into a section is removed, then its leaves added
+        'removed': [('invoice.status', 'Offen')],
+        'changed': [('invoice.items', 3, 3.0), ('invoice.total', 'Summe', 'Gesamt')],
+    }
+    assert changelogs['fr'] == {'added': [], 'removed': [('invoice.title', 'Facture')], 'changed': []}
+    assert changelogs['pl'] == {'added': [('invoice.title', 'Faktura')], 'removed': [], 'changed': []}
+
+
+def test_identical_catalogs_have_no_changelog():
+    assert diff_catalogs(OLD, json.loads(json.dumps(OLD))) == {}
+    assert diff_catalogs({'de': {'drafts': {}}}, {'de': {'drafts': {}}}) == {}
+    assert diff_catalogs({'de': {'drafts': {}}}, {'de': {}}) == {
+        'de': {'added': [], 'removed': [('drafts', {})], 'changed': []},
+    }
+
+
+def test_text_and_json_formats():
+    changelogs = diff_catalogs({'de': {'a': 'x', 'b': 'Straße'}}, {'de': {'a': 'y', 'c': ['1']}})
+    assert format_changelog(changelogs) == (
+        'de: 1 added, 1 removed, 1 changed\n'
+        '  + c: ["1"]\n'
+        '  - b: "Straße"\n'
+        '  ~ a: "x" -> "y"'
+    )
+    assert changelog_report(changelogs) == {
+        'de': {
+            'added': [{'key': 'c', 'value': ['1']}],
+            'removed': [{'key': 'b', 'value': 'Straße'}],
+            'changed': [{'key': 'a', 'old': 'x', 'new': 'y'}],
+        },
+    }
+    assert format_changelog({}) == ''
+
+
+@pytest.mark.skipif(shutil.which('git') is None, reason='needs git')
+def test_catalogs_are_read_from_a_git_revision(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    messages = tmp_path / 'messages'
+    messages.mkdir()
+    (messages / 'de.json').write_text(json.dumps({'a': 'alt'}), encoding='utf-8')
+    (messages / 'notes.txt').write_text('skipped', encoding='utf-8')
+
+    def git(*args):
+        subprocess.run(['git', *args], check=True, capture_output=True)
+
+    git('init', '-q')
+    git('add', '.')
+    git('-c', 'user.name=test', '-c', 'user.email=test@example.com', 'commit', '-qm', 'catalogs')
+    (messages / 'de.json').write_text(json.dumps({'a': 'neu'}), encoding='utf-8')
+
+    assert list(git_catalogs('HEAD', str(messages))) == [('de', {'a': 'alt'})]
+    with pytest.raises(DiffError):
+        list(git_catalogs('no-such-revision', str(messages)))
@@ -0,0 +1,77 @@
+import pytest
+
+from fallback import Resolver, default_chain, parse_chain
+
+CATALOGS = {
+    'en': {
+        'invoice': {'title': 'Invoice', 'total': 'Total', 'email': {'subject': 'Invoice {number}'}},
+        'common': {'save': 'Save', 'cancel': 'Cancel'},
+    },
+    'pt': {
+        'invoice': {'title': 'Fatura', 'email': {'subject': 'Fatura {number}'}},
+        'common': {'save': 'Salvar'},
+    },
+    'pt-BR': {'invoice': {'title': 'Nota fiscal'}},
+}
+
+
+@pytest.mark.parametrize('lang_code, chain', [
+    ('pt-BR', ['pt-BR', 'pt', 'en']),
+    ('zh_Hant_TW', ['zh_Hant_TW', 'zh_Hant', 'zh', 'en']),
+    ('en-GB', ['en-GB', 'en']),
+    ('en', ['en']),
+])
+def test_default_chain_drops_subtags_then_adds_the_default(lang_code, chain):
+    assert default_chain(lang_code, 'en') == chain
+
+
+def test_parse_chain():
+    assert parse_chain(' pt-BR = pt, en ') == ('pt-BR', ['pt-BR', 'pt', 'en'])
+    assert parse_chain('pt-BR=pt-BR,en') == ('pt-BR', ['pt-BR', 'en'])
+
+
+@pytest.mark.parametrize('spec', ['pt-BR', '=pt,en', 'pt-BR=', 'pt-BR= , '])
+def test_parse_chain_rejects_malformed_specs(spec):
+    with pytest.raises(ValueError, match='Invalid fallback chain'):
+        parse_chain(spec)
+
+
+def test_bundles_record_where_each_filled_key_came_from():
+    bundle, provenance = Resolver(CATALOGS).resolve(['pt-BR', 'pt', 'en'])
+    assert bundle == {
+        'invoice': {'title': 'Nota fiscal', 'email': {'subject': 'Fatura {number}'}, 'total': 'Total'},
+        'common': {'save': 'Salvar', 'cancel': 'Cancel'},
+    }
+    assert provenance == {
+        'invoice.email.subject': 'pt',
+        'invoice.total': 'en',
+        'common.save': 'pt',
+        'common.cancel': 'en',
+    }
+
+
+def test_bundles_share_untouched_subtrees_and_leave_catalogs_alone():
+    resolver = Resolver(CATALOGS)
+    en, _ = resolver.resolve(['en'])
+    pt, _ = resolver.resolve(['pt', 'en'])
+    bundle, _ = resolver.resolve(['pt-BR', 'pt', 'en'])
+    assert en is CATALOGS['en']
+    # Missing from pt-BR entirely, so it is pt's bundle subtree itself
+    assert bundle['common'] is pt['common']
+    assert pt['invoice']['email'] is CATALOGS['pt']['invoice']['email']
+    assert CATALOGS['pt-BR'] == {'invoice': {'title': 'Nota fiscal'}}
+    assert CATALOGS['pt'] == {
+        'invoice': {'title': 'Fatura', 'email': {'subject': 'Fatura {number}'}},
+        'common': {'save': 'Salvar'},
+    }
+
+
+def test_bundles_are_memoized_by_chain():
+    resolver = Resolver(CATALOGS)
+    assert resolver.resolve(['pt-BR', 'pt', 'en']) is resolver.resolve(['pt-BR', 'pt', 'en'])
+    # Locales without a catalog are skipped, so this is the same chain
+    assert resolver.resolve(['pt-BR', 'pt-PT', 'pt', 'en']) is resolver.resolve(['pt-BR', 'pt', 'en'])
+
+
+def test_a_chain_of_unknown_locales_resolves_to_an_empty_bundle():
+    assert Resolver(CATALOGS).resolve(['xx', 'yy']) == ({}, {})
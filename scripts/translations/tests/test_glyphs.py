@@ -0,0 +1,73 @@
+import json
+
+import pytest
+
+from glyphs import (INDEX_FILE, NUMERIC_TEXT, build_inventory, coverage_report, format_ranges, load_index,
+                    message_codepoints, parse_ranges)
+
+
+def _codepoints(text):
+    return {ord(char) for char in text}
+
+
+@pytest.mark.parametrize('codepoints, ranges', [
+    (set(), ''),
+    ({0x41}, 'U+0041'),
+    ({0x41, 0x42, 0x43, 0xE9, 0x4E00}, 'U+0041-0043,U+00E9,U+4E00'),
+])
+def test_ranges_round_trip(codepoints, ranges):
+    assert format_ranges(codepoints) == ranges
+    if ranges:
+        assert parse_ranges(ranges) == codepoints
+
+
+def test_only_rendered_text_is_counted():
+    message = 'Hi <b>{name}</b>: {count, plural, one {# Stück} other {Ä}} {total, number}\n'
+    assert message_codepoints(message) == _codepoints('Hi : Stück Ä' + NUMERIC_TEXT)
+    # Invalid ICU is displayed verbatim
+    assert message_codepoints('{broken') == _codepoints('{broken')
+
+
+def test_coverage_report():
+    report = coverage_report(_codepoints('Zażółć 发票'), loaded_subsets=('latin',))
+    assert report['subsets'] == ['latin', 'latin-ext']
+    assert report['uncovered'] == 'U+53D1,U+7968'
+    # ó is in latin; ż, ł and ć only in latin-ext
+    assert report['missing_from_loaded'] == 'U+0107,U+0142,U+017C,U+53D1,U+7968'
+    assert report['codepoints'] == 9
+    assert report['loaded_coverage'] == 0.4444
+    assert report['estimated_subset_bytes'] == 7 * 120 + 2 * 1000
+    assert coverage_report(set(), ('latin',))['loaded_coverage'] == 1.0
+
+
+def test_inventory_is_written_and_reused_while_messages_are_unchanged(tmp_path):
+    bundles = [
+        ('de', {'invoiceTemplate': {'title': 'Rechnung'}, 'common': {'save': 'Speichern'}}),
+        ('zh', {'emailTemplate': {'subject': '发票'}}),
+    ]
+    locales, reused = build_inventory(bundles, str(tmp_path))
+    assert reused == 0
+    assert (tmp_path / 'de.txt').read_text(encoding='utf-8') == 'Rceghnu'
+    assert (tmp_path / 'zh.txt').read_text(encoding='utf-8') == '发票'
+    assert locales['de']['namespaces'] == {'invoiceTemplate': format_ranges(_codepoints('Rechnung'))}
+    assert locales['zh']['coverage']['uncovered'] == 'U+53D1,U+7968'
+    assert load_index(str(tmp_path))['locales'] == json.loads(json.dumps(locales))
+
+    # Other namespaces are not part of the inventory
+    bundles[0][1]['common']['save'] = 'Sichern'
+    again, reused = build_inventory(bundles, str(tmp_path), loaded_subsets=('latin', 'latin-ext'))
+    assert reused == 2
+    assert again['de']['unicodes'] == locales['de']['unicodes']
+    assert again['de']['coverage']['subsets'] == ['latin']
+
+    bundles[0][1]['invoiceTemplate']['title'] = 'Faktura'
+    _, reused = build_inventory(bundles, str(tmp_path))
+    assert reused == 1
+    assert (tmp_path / 'de.txt').read_text(encoding='utf-8') == 'Fakrtu'
+
+
+def test_an_index_from_another_version_is_ignored(tmp_path):
+    (tmp_path / INDEX_FILE).write_text(json.dumps({'version': 0, 'locales': {'de': {}}}))
+    assert load_index(str(tmp_path)) == {}
+    (tmp_path / INDEX_FILE).write_text('{')
+    assert load_index(str(tmp_path)) == {}
@@ -0,0 +1,58 @@
+import pytest
+
+import icu
+from icu import ARGUMENT, LITERAL, PLURAL, POUND, TAG, IcuSyntaxError, message_arguments, parse
+
+
+@pytest.mark.parametrize('message, error, offset', [
+    ('Hi {name', "Malformed argument 'name'", 8),
+    ('Hi {}', 'Empty argument', 3),
+    ('{a b}', "Malformed argument 'a'", 3),
+    ('{n, foo}', "Invalid argument type 'foo'", 7),
+    ('{count, plural, one {x}}', 'Missing "other" clause in plural', 23),
+    ('{count, plural, one {a} one {b} other {c}}', "Duplicate selector 'one'", 24),
+    ('{n, plural, offset:x other {a}}', 'Invalid plural offset', 19),
+    ('<b>bold', 'Unclosed tag <b>', 0),
+    ('<b>x</i>', 'Mismatched closing tag for <b>', 6),
+    ('x</b>', 'Unmatched closing tag', 1),
+])
+def test_syntax_errors_report_their_offset(message, error, offset):
+    with pytest.raises(IcuSyntaxError) as raised:
+        parse(message)
+    assert str(raised.value) == f'{error} at offset {offset}'
+    assert raised.value.offset == offset
+    assert raised.value.source == message
+
+
+def test_message_arguments_raises_for_invalid_messages():
+    with pytest.raises(IcuSyntaxError):
+        message_arguments('{count, plural, one {# item}}')
+
+
+def test_parse_builds_intl_messageformat_nodes():
+    nodes = parse("It's '{literal}' {n, plural, =0 {none} other {# items}} <b>{name}</b>")
+    assert nodes == [
+        {'type': LITERAL, 'value': "It's {literal} "},
+        {'type': PLURAL, 'value': 'n', 'offset': 0, 'pluralType': 'cardinal', 'options': {
+            '=0': {'value': [{'type': LITERAL, 'value': 'none'}]},
+            'other': {'value': [{'type': POUND}, {'type': LITERAL, 'value': ' items'}]},
+        }},
+        {'type': LITERAL, 'value': ' '},
+        {'type': TAG, 'value': 'b', 'children': [{'type': ARGUMENT, 'value': 'name'}]},
+    ]
+
+
+@pytest.mark.parametrize('message, names', [
+    ('Plain text', set()),
+    ('Email sent to {recipient}', {'recipient'}),
+    ("'{quoted}' and {name}", {'name'}),
+    ('{count, plural, one {{name} x} other {#}} {when, date, short}', {'count', 'name', 'when'}),
+])
+def test_message_arguments(message, names):
+    assert message_arguments(message) == names
+
+
+def test_simple_messages_match_the_full_parser():
+    for message in ('Hi {name}', 'Total: { amount }', "Don't {verb}", '{a}{b} and {c}'):
+        assert icu._SIMPLE_MESSAGE.match(message)
+        assert message_arguments(message) == icu.argument_names(parse(message))
@@ -0,0 +1,30 @@
+import json
+
+from incremental import payload_delta
+from sync import UPDATED, LocaleTask, SyncOptions, sync_locale
+
+
+def test_incremental_sync_applies_only_the_payload_delta(tmp_path, catalog_file):
+    snapshot = str(tmp_path / 'snapshots' / 'de.json')
+    options = SyncOptions(incremental=True)
+    file_path = catalog_file({'form': {'title': 'Alt', 'save': 'Speichern'}})
+    first = sync_locale(LocaleTask('de', str(file_path), {'form': {'title': 'Neu'}}, options=options,
+                                   snapshot_path=snapshot))
+
+    # Only the key that changed since the snapshot is applied
+    payload = {'form': {'title': 'Neu', 'cancel': 'Abbrechen'}}
+    previous = {'payload': first.payload_hash, 'output': first.output_hash}
+    second = sync_locale(LocaleTask('de', str(file_path), payload, previous=previous, options=options,
+                                    snapshot_path=snapshot))
+    assert second.status == UPDATED
+    assert second.changes.added == [('form', 'cancel')]
+    assert second.changes.overwritten == []
+    assert json.loads(file_path.read_text(encoding='utf-8')) == {
+        'form': {'title': 'Neu', 'save': 'Speichern', 'cancel': 'Abbrechen'},
+    }
+
+
+def test_payload_delta():
+    snapshot = {'a': 'x', 'b': {'c': 'y'}, 'gone': 'z'}
+    translations = {'a': 'x', 'b': {'c': 'changed', 'd': {}}, 'e': 1}
+    assert payload_delta(snapshot, translations) == [(('b', 'c'), 'changed'), (('b', 'd'), {}), (('e',), 1)]
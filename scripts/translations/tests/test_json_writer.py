@@ -0,0 +1,89 @@
+import json
+import os
+
+import pytest
+
+from json_writer import apply_patches, dumps_catalog, patch_catalog, plan_patches, write_catalog
+from manifest import hash_bytes
+from merge import deep_merge
+
+MESSAGES_DIR = os.path.join(os.path.dirname(__file__), '..', '..', '..', 'src', 'i18n', 'messages')
+
+CATALOGS = [
+    {},
+    {'a': {}, 'b': [], 'c': [1, {'d': None}]},
+    {'title': 'Faktura', 'nested': {'deep': {'deeper': 'zażółć "gęślą" \\ jaźń\n\t'}}, 'emoji': '🧾'},
+    {'numbers': {'int': 10, 'negative': -3, 'float': 1.5, 'big': 1e300, 'tiny': 5e-324}, 'bools': [True, False]},
+    {'nan': float('nan'), 'inf': float('inf'), 'minus_inf': float('-inf')},
+    {'控制': '\u0000\u001f ', 'zh': '发票已发送给 {recipient}'},
+]
+
+
+def _dumps(catalog):
+    return json.dumps(catalog, indent=2, ensure_ascii=False).encode('utf-8')
+
+
+@pytest.mark.parametrize('catalog', CATALOGS)
+def test_dumps_catalog_matches_json_dumps(catalog):
+    assert dumps_catalog(catalog) == _dumps(catalog)
+
+
+@pytest.mark.parametrize('catalog', CATALOGS)
+def test_write_catalog_matches_json_dumps(tmp_path, catalog):
+    file_path = tmp_path / 'de.json'
+    file_path.write_text('{}')
+    output_hash, size = write_catalog(str(file_path), catalog)
+    data = file_path.read_bytes()
+    assert data == _dumps(catalog)
+    assert (output_hash, size) == (hash_bytes(data), len(data))
+
+
+def test_write_catalog_matches_repository_catalogs(tmp_path):
+    for name in sorted(os.listdir(MESSAGES_DIR)):
+        with open(os.path.join(MESSAGES_DIR, name), 'r', encoding='utf-8') as f:
+            catalog = json.load(f)
+        write_catalog(str(tmp_path / name), catalog)
+        assert (tmp_path / name).read_bytes() == _dumps(catalog), name
+
+
+def test_write_catalog_keeps_permissions(tmp_path):
+    file_path = tmp_path / 'de.json'
+    file_path.write_text('{}')
+    os.chmod(file_path, 0o640)
+    write_catalog(str(file_path), {'a': 'b'})
+    assert os.stat(file_path).st_mode & 0o777 == 0o640
+
+
+def _patched(tmp_path, catalog, patch, **kwargs):
+    file_path = tmp_path / 'de.json'
+    existing = _dumps(catalog)
+    file_path.write_bytes(existing)
+    changes = deep_merge(catalog, patch)
+    written = patch_catalog(str(file_path), existing, catalog, changes, **kwargs)
+    return file_path, written
+
+
+@pytest.mark.parametrize('expected_hash', [False, True])
+def test_patch_catalog_matches_a_full_write(tmp_path, expected_hash):
+    catalog = {'form': {'title': 'Alt', 'last': 'xx'}, 'count': 1}
+    existing_hash = hash_bytes(_dumps(catalog)) if expected_hash else None
+    file_path, written = _patched(tmp_path, catalog, {'form': {'title': 'Neu!', 'last': 'yy'}, 'count': 2},
+                                  expected_hash=existing_hash)
+    assert written is not None
+    assert file_path.read_bytes() == _dumps(catalog)
+    assert written == (hash_bytes(_dumps(catalog)), len(_dumps(catalog)))
+
+
+def test_patch_catalog_leaves_structural_changes_to_a_full_write(tmp_path):
+    _, written = _patched(tmp_path, {'a': 'x'}, {'b': 'y'})
+    assert written is None
+
+
+def test_in_place_patch_refuses_a_file_edited_since_the_manifest(tmp_path):
+    file_path = tmp_path / 'de.json'
+    existing = _dumps({'a': 'xx'})
+    # Same size, different content
+    file_path.write_bytes(_dumps({'a': 'zz'}))
+    patches, _ = plan_patches(existing, [(('a',), 'yy')])
+    assert apply_patches(str(file_path), existing, patches, expected_hash=hash_bytes(existing)) is None
+    assert file_path.read_bytes() == _dumps({'a': 'zz'})
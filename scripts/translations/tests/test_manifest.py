@@ -0,0 +1,54 @@
+from manifest import Manifest, hash_bytes, hash_payload
+from sync import UNCHANGED, UPDATED, LocaleTask, sync_locale
+
+
+def _previous(result):
+    return {'payload': result.payload_hash, 'output': result.output_hash}
+
+
+def test_manifest_match_skips_the_locale(catalog_file, monkeypatch):
+    payload = {'form': {'title': 'Neu'}}
+    file_path = catalog_file({'form': {'title': 'Alt'}})
+    first = sync_locale(LocaleTask('de', str(file_path), payload))
+
+    # Same payload, same file: nothing is parsed, merged or written
+    monkeypatch.setattr('sync.deep_merge', None)
+    modified = file_path.stat().st_mtime_ns
+    second = sync_locale(LocaleTask('de', str(file_path), payload, previous=_previous(first)))
+    assert second.status == UNCHANGED
+    assert second.error is None
+    assert second.output_hash == first.output_hash
+    assert file_path.stat().st_mtime_ns == modified
+
+
+def test_file_edited_since_the_manifest_is_merged_again(catalog_file):
+    payload = {'form': {'title': 'Neu'}}
+    file_path = catalog_file({'form': {'title': 'Alt'}})
+    first = sync_locale(LocaleTask('de', str(file_path), payload))
+
+    catalog_file({'form': {'title': 'Von Hand'}})
+    second = sync_locale(LocaleTask('de', str(file_path), payload, previous=_previous(first)))
+    assert second.status == UPDATED
+    assert second.changes.overwritten == [('form', 'title')]
+    assert file_path.read_text(encoding='utf-8') == '{\n  "form": {\n    "title": "Neu"\n  }\n}'
+
+
+def test_changed_payload_rewrites_the_file(catalog_file):
+    file_path = catalog_file({'form': {'title': 'Alt'}})
+    first = sync_locale(LocaleTask('de', str(file_path), {'form': {'title': 'Neu'}}))
+    second = sync_locale(LocaleTask('de', str(file_path), {'form': {'title': 'Neuer'}}, previous=_previous(first)))
+    assert second.status == UPDATED
+    assert second.payload_hash == hash_payload({'form': {'title': 'Neuer'}})
+    assert second.output_hash == hash_bytes(file_path.read_bytes()) != first.output_hash
+
+
+def test_manifest_round_trip(tmp_path):
+    path = str(tmp_path / 'state' / 'sync-manifest.json')
+    manifest = Manifest.load(path)
+    assert manifest.get('de') is None
+    manifest.record('de', 'payload', 'output')
+    manifest.save()
+    assert Manifest.load(path).get('de') == {'payload': 'payload', 'output': 'output'}
+
+    (tmp_path / 'state' / 'sync-manifest.json').write_text('{broken')
+    assert Manifest.load(path).get('de') is None
@@ -0,0 +1,146 @@
+import json
+import random
+
+import pytest
+
+from memory import TranslationMemory, extract_units, normalize, trigrams
+from update_translations_example import main
+
+EN = {
+    'invoice': {
+        'send': 'Send invoice',
+        'sendNow': 'Send  Invoice',
+        'download': 'Download invoice',
+        'title': 'Invoice',
+        'count': 3,
+    },
+    'common': {'save': 'Save', 'cancel': 'Cancel', 'empty': ''},
+}
+DE = {
+    'invoice': {
+        'send': 'Rechnung senden',
+        'sendNow': 'Rechnung senden',
+        'download': 'Rechnung herunterladen',
+        'title': 'Rechnung',
+        'count': 3,
+    },
+    'common': {'save': 'Speichern', 'empty': ''},
+    'extra': {'only': 'Nur hier'},
+}
+FR = {'invoice': {'send': 'Envoyer la facture'}}
+
+
+def _write(directory, lang_code, catalog):
+    (directory / f'{lang_code}.json').write_text(json.dumps(catalog, ensure_ascii=False), encoding='utf-8')
+
+
+@pytest.fixture
+def messages(tmp_path):
+    directory = tmp_path / 'messages'
+    directory.mkdir()
+    for lang_code, catalog in (('en', EN), ('de', DE), ('fr', FR)):
+        _write(directory, lang_code, catalog)
+    return directory
+
+
+def test_units_pair_strings_both_catalogs_have():
+    assert extract_units(EN, DE) == {
+        'invoice.send': ('Send invoice', 'Rechnung senden'),
+        'invoice.sendNow': ('Send  Invoice', 'Rechnung senden'),
+        'invoice.download': ('Download invoice', 'Rechnung herunterladen'),
+        'invoice.title': ('Invoice', 'Rechnung'),
+        'common.save': ('Save', 'Speichern'),
+    }
+
+
+def test_exact_matches_group_normalized_text(messages, tmp_path):
+    memory = TranslationMemory(str(tmp_path / 'memory.json'), 'en')
+    assert memory.refresh(str(messages)) == {'de': 5, 'fr': 1}
+    assert len(memory) == 6
+    match = memory.lookup('  SEND invoice ', 'de')[0]
+    assert (match.score, match.translation, match.uses) == (1.0, 'Rechnung senden', 2)
+    assert match.source in ('Send invoice', 'Send  Invoice')
+    assert memory.lookup('Send invoice', 'fr')[0].translation == 'Envoyer la facture'
+    assert memory.lookup('Send invoice', 'pl') == []
+
+
+def test_fuzzy_matches_are_ranked_and_limited(messages, tmp_path):
+    memory = TranslationMemory(str(tmp_path / 'memory.json'), 'en')
+    memory.refresh(str(messages))
+    matches = memory.lookup('Send invoices', 'de', threshold=0.3)
+    assert [match.translation for match in matches] == ['Rechnung senden', 'Rechnung', 'Rechnung herunterladen']
+    assert matches[0].score < 1.0
+    assert [match.score for match in matches] == sorted((match.score for match in matches), reverse=True)
+    assert len(memory.lookup('Send invoices', 'de', limit=1, threshold=0.3)) == 1
+    assert memory.lookup('Completely unrelated words', 'de') == []
+    assert memory.lookup('   ', 'de') == []
+
+
+@pytest.mark.parametrize('threshold', [0, -0.5, 1.5])
+def test_thresholds_outside_the_score_range_are_rejected(tmp_path, threshold):
+    memory = TranslationMemory(str(tmp_path / 'memory.json'), 'en')
+    with pytest.raises(ValueError, match='threshold'):
+        memory.lookup('Save', 'de', threshold=threshold)
+
+
+@pytest.mark.parametrize('threshold', ['0', '1.01'])
+def test_the_cli_rejects_thresholds_outside_the_score_range(messages, tmp_path, threshold, capsys):
+    with pytest.raises(SystemExit) as exit_info:
+        main(['memory', '--messages-dir', str(messages), '--state-dir', str(tmp_path / 'state'),
+              '--query', 'Save', '--threshold', threshold])
+    assert exit_info.value.code == 2
+    assert 'must be above 0 and at most 1' in capsys.readouterr().err
+
+
+def test_candidate_pruning_matches_a_full_scan(tmp_path):
+    rng = random.Random(0)
+    words = ['invoice', 'send', 'email', 'client', 'payment', 'due', 'date', 'draft', 'paid', 'total']
+    texts = [' '.join(rng.choice(words) for _ in range(rng.randint(1, 4))) for _ in range(300)]
+    memory = TranslationMemory(str(tmp_path / 'memory.json'), 'en')
+    memory._replace_units('de', {f'k{index}': (text, f'de {index}') for index, text in enumerate(texts)})
+
+    for query in texts[:40]:
+        grams = trigrams(normalize(query))
+        for threshold in (0.3, 0.6, 0.9):
+            expected = {
+                normalized for normalized, record in memory.records.items()
+                if normalized == normalize(query)
+                or 2 * len(grams & record.grams) / (len(grams) + len(record.grams)) >= threshold
+            }
+            matches = memory.lookup(query, 'de', limit=len(texts), threshold=threshold)
+            found = {normalize(match.source) for match in matches}
+            assert found == expected, (query, threshold)
+
+
+def test_refresh_rereads_only_changed_catalogs(messages, tmp_path):
+    path = str(tmp_path / 'memory.json')
+    memory = TranslationMemory(path, 'en')
+    memory.refresh(str(messages))
+    memory.save()
+
+    loaded = TranslationMemory.load(path, 'en')
+    assert loaded.units == memory.units
+    assert loaded.lookup('Save', 'de')[0].translation == 'Speichern'
+    assert loaded.refresh(str(messages)) == {}
+
+    _write(messages, 'fr', {'invoice': {'send': 'Envoyer la facture', 'title': 'Facture'}})
+    assert loaded.refresh(str(messages)) == {'fr': 1}
+    assert loaded.refresh(str(messages), locales=['de']) == {}
+
+    (messages / 'fr.json').unlink()
+    assert loaded.refresh(str(messages)) == {'fr': 2}
+    assert loaded.lookup('Invoice', 'fr') == []
+    # The trigram index holds nothing but the remaining units
+    assert set().union(*loaded.index.values()) == set(loaded.records)
+
+    # A changed source catalog re-reads every locale
+    _write(messages, 'en', {**EN, 'common': {'save': 'Save changes'}})
+    assert loaded.refresh(str(messages), locales=[]) == {'de': 2}
+
+
+def test_a_memory_for_another_source_locale_is_not_loaded(messages, tmp_path):
+    path = str(tmp_path / 'memory.json')
+    memory = TranslationMemory(path, 'en')
+    memory.refresh(str(messages))
+    memory.save()
+    assert len(TranslationMemory.load(path, 'de')) == 0
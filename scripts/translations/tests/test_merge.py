@@ -0,0 +1,81 @@
+from merge import ChangeSet, deep_merge
+
+
+def test_merge_records_added_and_overwritten_keys():
+    catalog = {'form': {'title': 'Old', 'save': 'Save'}}
+    changes = deep_merge(catalog, {'form': {'title': 'New', 'save': 'Save', 'cancel': 'Cancel'}})
+    assert catalog == {'form': {'title': 'New', 'save': 'Save', 'cancel': 'Cancel'}}
+    assert changes.overwritten == [('form', 'title')]
+    assert changes.added == [('form', 'cancel')]
+    assert changes.type_replaced == []
+    assert len(changes) == 2
+
+
+def test_merge_without_changes_is_empty():
+    catalog = {'a': {'b': 'c'}, 'n': 1}
+    changes = deep_merge(catalog, {'a': {'b': 'c'}, 'n': 1})
+    assert not changes
+    assert changes.summary() == {'added': 0, 'overwritten': 0, 'type_replaced': 0}
+
+
+def test_merge_keeps_keys_the_patch_leaves_out():
+    catalog = {'a': {'b': 'c', 'd': 'e'}, 'f': 'g'}
+    deep_merge(catalog, {'a': {'b': 'x'}})
+    assert catalog == {'a': {'b': 'x', 'd': 'e'}, 'f': 'g'}
+
+
+def test_leaf_replacing_a_dict_deletes_its_subtree():
+    catalog = {'a': {'b': {'c': 'd'}}}
+    changes = deep_merge(catalog, {'a': {'b': 'flat'}})
+    assert catalog == {'a': {'b': 'flat'}}
+    assert changes.type_replaced == [('a', 'b')]
+    assert changes.added == changes.overwritten == []
+
+
+def test_dict_replacing_a_leaf():
+    catalog = {'a': 'flat'}
+    changes = deep_merge(catalog, {'a': {'b': 'c'}})
+    assert catalog == {'a': {'b': 'c'}}
+    assert changes.type_replaced == [('a',)]
+    # The keys below the new dict are new as well
+    assert changes.added == [('a', 'b')]
+
+
+def test_new_empty_dict_is_added():
+    catalog = {}
+    changes = deep_merge(catalog, {'a': {}})
+    assert catalog == {'a': {}}
+    assert changes.added == [('a',)]
+
+
+def test_same_value_distinguishes_types():
+    catalog = {'flag': 1, 'count': True}
+    changes = deep_merge(catalog, {'flag': True, 'count': 1})
+    assert changes.overwritten == [('flag',), ('count',)]
+    assert type(catalog['flag']) is bool and type(catalog['count']) is int
+
+
+def test_merge_appends_new_keys_in_payload_order():
+    catalog = {'b': 1}
+    deep_merge(catalog, {'z': 1, 'a': 1, 'b': 2})
+    assert list(catalog) == ['b', 'z', 'a']
+
+
+def test_merge_handles_nesting_beyond_the_recursion_limit():
+    depth = 5000
+    patch = leaf = {}
+    for _ in range(depth):
+        leaf['k'] = {}
+        leaf = leaf['k']
+    leaf['v'] = 'x'
+    catalog = {}
+    changes = deep_merge(catalog, patch)
+    assert changes.added == [('k',) * depth + ('v',)]
+
+
+def test_changes_accumulate_into_a_given_change_set():
+    changes = ChangeSet()
+    catalog = {}
+    deep_merge(catalog, {'a': 1}, changes)
+    deep_merge(catalog, {'a': 2}, changes)
+    assert changes.as_dict() == {'added': ['a'], 'overwritten': ['a'], 'type_replaced': []}
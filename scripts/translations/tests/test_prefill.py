@@ -0,0 +1,158 @@
+import json
+
+import pytest
+
+import prefill
+from prefill import PrefillError, RateLimiter, StubBackend, TranslationCache, collect_missing, protect, restore
+from update_translations_example import MT_CACHE_FILE, main, prefill_translations
+
+FRENCH = {'Edit Invoice': 'Modifier la facture'}
+
+
+class DictionaryBackend:
+    """A 'real' backend: looks texts up, keeping every placeholder token as it is."""
+
+    max_batch = 2
+
+    def __init__(self):
+        self.calls = 0
+        self.batches = []
+
+    def translate(self, texts, source_locale, target_locale):
+        self.calls += 1
+        self.batches.append(list(texts))
+        return [FRENCH.get(text, f'FR {text}') for text in texts]
+
+
+class FailingBackend:
+    max_batch = 10
+
+    def translate(self, texts, source_locale, target_locale):
+        raise ConnectionError('quota exceeded')
+
+
+@pytest.fixture
+def messages(tmp_path, monkeypatch):
+    monkeypatch.setitem(prefill.BACKENDS, 'dictionary', DictionaryBackend)
+    monkeypatch.setitem(prefill.BACKENDS, 'failing', FailingBackend)
+    directory = tmp_path / 'messages'
+    directory.mkdir()
+    (directory / 'en.json').write_text(json.dumps({'invoice': {'edit': 'Edit Invoice', 'title': 'Edit Invoice'},
+                                                   'common': {'save': 'Save'}}), encoding='utf-8')
+    (directory / 'fr.json').write_text(json.dumps({'common': {'save': 'Enregistrer'}}), encoding='utf-8')
+    return directory
+
+
+def _prefill(messages, tmp_path, backend):
+    return prefill_translations(str(messages), str(tmp_path / 'out'), str(tmp_path / 'state'), 'en', backend)
+
+
+def test_protect_and_restore_placeholders():
+    message = "Hi {name}, '{literal}' <b>{count, plural, one {# item} other {# items}}</b>"
+    text, placeholders = protect(message)
+    assert text == "Hi ⟦0⟧, '{literal}' ⟦1⟧⟦2⟧⟦3⟧"
+    assert placeholders == ['{name}', '<b>', '{count, plural, one {# item} other {# items}}', '</b>']
+    assert restore(text.replace('Hi', 'Salut'), placeholders) == message.replace('Hi', 'Salut')
+    # A lost or duplicated token is rejected
+    assert restore('Salut ⟦0⟧ ⟦1⟧⟦3⟧', placeholders) is None
+    assert restore('⟦0⟧⟦0⟧⟦1⟧⟦2⟧⟦3⟧', placeholders) is None
+
+
+def test_collect_missing():
+    catalogs = {'en': {'a': 'A', 'b': {'c': 'C'}, 'empty': ''}, 'fr': {'a': 'a'}, 'de': {}}
+    assert collect_missing(catalogs, 'en', ['fr']) == {'fr': [(('b', 'c'), 'C')]}
+
+
+def test_prefill_sends_each_text_once_and_caches_it(tmp_path):
+    cache = TranslationCache(str(tmp_path / 'cache.json'), 'dictionary')
+    backend = DictionaryBackend()
+    missing = {'fr': [(('a',), 'Edit Invoice'), (('b',), 'Edit Invoice'), (('c',), 'Save'), (('d',), 'Done'),
+                      (('e',), 'More')]}
+    payloads, rejected = prefill.prefill(missing, backend, cache, 'en')
+    assert rejected == []
+    assert payloads['fr'] == {'a': 'Modifier la facture', 'b': 'Modifier la facture', 'c': 'FR Save',
+                              'd': 'FR Done', 'e': 'FR More'}
+    assert backend.batches == [['Edit Invoice', 'Save'], ['Done', 'More']]
+
+    cache.save()
+    again = DictionaryBackend()
+    cached = TranslationCache.load(str(tmp_path / 'cache.json'), 'dictionary')
+    assert prefill.prefill(missing, again, cached, 'en')[0] == payloads
+    assert again.calls == 0
+    assert (cached.hits, cached.misses) == (4, 0)
+
+
+def test_cache_entries_belong_to_their_backend(tmp_path):
+    path = str(tmp_path / 'cache.json')
+    cache = TranslationCache(path, 'vendor:Backend')
+    cache.put('Save', 'fr', 'Enregistrer')
+    cache.save()
+    assert TranslationCache.load(path, 'vendor:Backend').get('Save', 'fr') == 'Enregistrer'
+    assert TranslationCache.load(path, 'other:Backend').get('Save', 'fr') is None
+
+
+def test_cache_evicts_least_recently_used(tmp_path):
+    cache = TranslationCache(str(tmp_path / 'cache.json'), 'dictionary', max_entries=2)
+    cache.put('a', 'fr', 'A')
+    cache.put('b', 'fr', 'B')
+    cache.get('a', 'fr')
+    cache.put('c', 'fr', 'C')
+    assert cache.get('b', 'fr') is None
+    assert cache.get('a', 'fr') == 'A'
+
+
+def test_rejected_translations_are_reported(tmp_path):
+    class TokenDropper(StubBackend):
+        def translate(self, texts, source_locale, target_locale):
+            return ['lost' for _ in texts]
+
+    cache = TranslationCache(str(tmp_path / 'cache.json'), 'dropper')
+    payloads, rejected = prefill.prefill({'fr': [(('a',), 'Hi {name}')]}, TokenDropper(), cache, 'en')
+    assert payloads == {'fr': {}}
+    assert rejected == [('fr', 'a', 'placeholders changed in translation')]
+    assert cache.entries == {}
+
+
+def test_rate_limiter_spaces_calls():
+    now = [0.0]
+    slept = []
+
+    def sleep(seconds):
+        slept.append(seconds)
+        now[0] += seconds
+
+    limiter = RateLimiter(4, clock=lambda: now[0], sleep=sleep)
+    for _ in range(3):
+        limiter.wait()
+    assert slept == [0.25, 0.25]
+
+
+def test_stub_output_is_never_cached_or_applied(messages, tmp_path, capsys):
+    payloads, _ = _prefill(messages, tmp_path, 'stub')
+    assert payloads['fr']['invoice']['edit'] == '[fr] Edit Invoice'
+    assert not (tmp_path / 'state' / MT_CACHE_FILE).exists()
+
+    argv = ['prefill', '--messages-dir', str(messages), '--out-dir', str(tmp_path / 'out'),
+            '--state-dir', str(tmp_path / 'state'), '--locale', 'fr', '--backend', 'dictionary', '--apply']
+    assert main(argv) == 0
+    assert json.loads((messages / 'fr.json').read_text(encoding='utf-8')) == {
+        'common': {'save': 'Enregistrer'},
+        'invoice': {'edit': 'Modifier la facture', 'title': 'Modifier la facture'},
+    }
+    assert 'Translated 1 texts in 1 requests, 0 from cache' in capsys.readouterr().out
+
+
+def test_apply_refuses_the_stub_backend(messages, tmp_path, capsys):
+    assert main(['prefill', '--messages-dir', str(messages), '--state-dir', str(tmp_path / 'state'), '--apply']) == 2
+    assert '--apply needs a real --backend' in capsys.readouterr().err
+    assert json.loads((messages / 'fr.json').read_text(encoding='utf-8')) == {'common': {'save': 'Enregistrer'}}
+
+
+def test_backend_failure_is_a_prefill_error(messages, tmp_path):
+    with pytest.raises(PrefillError, match='Backend failed translating into fr: ConnectionError: quota exceeded'):
+        _prefill(messages, tmp_path, 'failing')
+
+
+def test_unknown_backend(messages, tmp_path):
+    with pytest.raises(PrefillError, match="Unknown backend 'nope'"):
+        _prefill(messages, tmp_path, 'nope')
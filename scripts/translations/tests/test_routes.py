@@ -0,0 +1,85 @@
+import pytest
+
+from routes import RouteError, build_trie, check_routes, match_path, render_module, verify_trie
+
+LOCALES = ['en', 'es', 'zh']
+ROUTES = {
+    '/': {'paths': '/', 'public': True},
+    '/login': {'paths': {'en': '/login', 'es': '/iniciar-sesion', 'zh': '/登录'}, 'public': True},
+    '/invoice/create': {'paths': {'en': '/invoice/create', 'es': '/factura/crear', 'zh': '/发票/创建'}},
+    '/api/health': {'paths': '/api/health', 'public': True, 'page': False},
+}
+
+
+@pytest.fixture(scope='module')
+def trie():
+    return build_trie(ROUTES, LOCALES)
+
+
+@pytest.mark.parametrize('pathname, expected', [
+    ('/es/factura/crear', ('es', '/invoice/create', False)),
+    ('/en/login', ('en', '/login', True)),
+    ('/zh/登录', ('zh', '/login', True)),
+    ('/zh/%E7%99%BB%E5%BD%95', ('zh', '/login', True)),
+    ('/zh/%E5%8F%91%E7%A5%A8/%E5%88%9B%E5%BB%BA', ('zh', '/invoice/create', False)),
+    ('/es/factura/crear/', ('es', '/invoice/create', False)),
+    # Unprefixed paths and other locales' slugs resolve through 'any'
+    ('/factura/crear', (None, '/invoice/create', False)),
+    ('/en/iniciar-sesion', ('en', '/login', True)),
+    # Everything below a public route is public, except below '/'
+    ('/en/login/help', ('en', None, True)),
+    ('/en/api/health/deep', ('en', None, True)),
+    ('/en/unknown', ('en', None, False)),
+    ('/en', ('en', '/', True)),
+    ('/', (None, '/', True)),
+])
+def test_match_path(trie, pathname, expected):
+    assert match_path(trie, pathname) == expected
+
+
+def test_match_path_normalizes_to_nfc():
+    routes = {'/cafe': {'paths': {'en': '/cafe', 'es': '/café'}}}
+    trie = build_trie(routes, ['en', 'es'])
+    assert match_path(trie, '/es/café') == ('es', '/cafe', False)
+    assert match_path(trie, '/es/cafe%CC%81') == ('es', '/cafe', False)
+
+
+def test_invalid_percent_encoding_matches_nothing(trie):
+    assert match_path(trie, '/zh/%E7%99') == (None, None, False)
+
+
+def test_verify_trie_finds_no_problems(trie):
+    assert verify_trie(trie, ROUTES, LOCALES) == []
+
+
+def test_verify_trie_catches_a_stale_trie(trie):
+    stale = build_trie({'/': ROUTES['/']}, LOCALES)
+    problems = verify_trie(stale, ROUTES, LOCALES)
+    assert "/es/factura/crear: resolves to ('es', None, False), expected ('es', '/invoice/create', False)" in problems
+
+
+@pytest.mark.parametrize('routes, problem', [
+    ({'/a': {'paths': {'en': '/a', 'es': '/a'}}, '/b': {'paths': {'en': '/a', 'es': '/b'}}},
+     "/b: en path '/a' is also the path of /a"),
+    ({'/a': {'paths': {'en': '/a', 'es': '/x'}}, '/b': {'paths': {'en': '/b', 'es': '/a'}}},
+     "/b: es path '/a' is ambiguous without a locale prefix (another locale uses it for /a)"),
+    ({'/a': {'paths': {'en': '/a', 'es': '/%61'}}, '/b': {'paths': {'en': '/b', 'es': '/a'}}},
+     "/b: es path '/a' is also the path of /a"),
+    ({'/a': {'paths': {'en': '/a'}}}, '/a: no path for es'),
+    ({'/a': {'paths': {'en': '/a', 'es': '/a', 'fr': '/a'}}}, '/a: path for unknown locales fr'),
+    ({'/a': {'paths': '/es/a'}}, "/a: en path '/es/a' starts with a locale code"),
+    ({'/a': {'paths': '/a//b'}}, "/a: en path '/a//b' must start with / and have no empty segments"),
+    ({'/a': {'paths': '/a?x=1'}}, "/a: en path '/a?x=1' contains a query or fragment"),
+])
+def test_check_routes(routes, problem):
+    assert problem in check_routes(routes, ['en', 'es'])
+    with pytest.raises(RouteError):
+        build_trie(routes, ['en', 'es'])
+
+
+def test_render_module_leaves_out_non_page_routes(trie):
+    module = render_module(ROUTES, LOCALES, trie)
+    assert "'/invoice/create': {" in module
+    assert "'/api/health'" not in module.split('export const routeTrie')[0]
+    # Identifiers are left unquoted, as prettier writes them
+    assert '登录: {' in module
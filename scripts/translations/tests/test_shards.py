@@ -0,0 +1,74 @@
+import json
+
+import pytest
+
+from fsutil import WriteBatch
+from manifest import hash_bytes
+from shards import INDEX_FILE, load_index, shards_current, write_shards
+from sync import UNCHANGED, UPDATED, LocaleTask, SyncOptions, sync_locale
+
+CATALOG = {'invoice': {'title': 'Rechnung', 'total': 'Summe'}, 'common': {'save': 'Speichern'}}
+
+
+def _read(path):
+    return json.loads(path.read_text(encoding='utf-8'))
+
+
+def test_shards_spread_back_into_the_catalog(tmp_path):
+    assert write_shards(str(tmp_path), 'de', CATALOG, 'hash') == 3
+    index = load_index(str(tmp_path), 'de')
+    assert index['source'] == 'hash'
+    assert list(index['namespaces']) == ['invoice', 'common']
+
+    merged = {}
+    for entry in index['namespaces'].values():
+        data = (tmp_path / 'de' / entry['file']).read_bytes()
+        assert (entry['sha256'], entry['size']) == (hash_bytes(data), len(data))
+        merged.update(json.loads(data))
+    assert merged == CATALOG
+    assert shards_current(str(tmp_path), 'de', 'hash')
+    assert not shards_current(str(tmp_path), 'de', 'other')
+
+
+def test_unchanged_shards_are_not_rewritten_and_stale_ones_are_removed(tmp_path):
+    write_shards(str(tmp_path), 'de', CATALOG, 'first')
+    (tmp_path / 'de' / 'notes.txt').write_text('not ours')
+    changed = {'invoice': {'title': 'Faktura', 'total': 'Summe'}}
+    # The invoice shard and the index
+    assert write_shards(str(tmp_path), 'de', changed, 'second') == 2
+    assert sorted(path.name for path in (tmp_path / 'de').iterdir()) == [INDEX_FILE, 'invoice.json', 'notes.txt']
+    assert _read(tmp_path / 'de' / 'invoice.json') == changed
+
+
+def test_batched_shards_land_on_commit(tmp_path):
+    write_shards(str(tmp_path), 'de', CATALOG, 'first')
+    batch = WriteBatch()
+    write_shards(str(tmp_path), 'de', {'invoice': {'title': 'Faktura'}}, 'second', batch)
+    assert load_index(str(tmp_path), 'de')['source'] == 'first'
+    batch.flush()
+    batch.commit()
+    assert load_index(str(tmp_path), 'de')['source'] == 'second'
+    assert not (tmp_path / 'de' / 'common.json').exists()
+
+
+@pytest.mark.parametrize('namespace', ['../escape', 'with space', 'index'])
+def test_namespaces_must_be_safe_file_names(tmp_path, namespace):
+    with pytest.raises(ValueError, match=repr(namespace)):
+        write_shards(str(tmp_path), 'de', {namespace: {}}, 'hash')
+
+
+def test_sync_keeps_shards_in_step_with_the_catalog(catalog_file, tmp_path):
+    file_path = catalog_file(CATALOG)
+    options = SyncOptions(shards=True)
+    first = sync_locale(LocaleTask('de', str(file_path), {'common': {'save': 'Sichern'}}, options=options))
+    assert first.status == UPDATED
+    assert _read(tmp_path / 'de' / 'common.json') == {'common': {'save': 'Sichern'}}
+    assert load_index(str(tmp_path), 'de')['source'] == first.output_hash
+
+    # Shards deleted behind our back are cut again even though the catalog is current
+    (tmp_path / 'de' / INDEX_FILE).unlink()
+    previous = {'payload': first.payload_hash, 'output': first.output_hash}
+    second = sync_locale(LocaleTask('de', str(file_path), {'common': {'save': 'Sichern'}}, previous=previous,
+                                    options=options))
+    assert second.status == UNCHANGED
+    assert load_index(str(tmp_path), 'de')['source'] == first.output_hash
@@ -0,0 +1,129 @@
+import json
+
+import pytest
+
+from sources import CsvSource, DictSource, DocumentSource, MultiSource, SourceError, XliffSource, open_source
+
+XLIFF_12 = '''<?xml version="1.0" encoding="UTF-8"?>
+<xliff version="1.2" xmlns="urn:oasis:names:tc:xliff:document:1.2">
+  <file source-language="en" target-language="es" datatype="plaintext" original="messages">
+    <body>
+      <trans-unit id="invoice.title"><source>Invoice</source><target>Factura</target></trans-unit>
+      <trans-unit id="1" resname="invoice.email.subject">
+        <source>Invoice {number}</source><target>Factura <g id="b">{number}</g></target>
+      </trans-unit>
+      <trans-unit id="common.save"><source>Save</source><target></target></trans-unit>
+    </body>
+  </file>
+</xliff>
+'''
+
+XLIFF_20 = '''<?xml version="1.0" encoding="UTF-8"?>
+<xliff version="2.0" xmlns="urn:oasis:names:tc:xliff:document:2.0" srcLang="en" trgLang="pt">
+  <file id="messages">
+    <unit id="common.save"><segment><source>Save</source><target>Salvar</target></segment></unit>
+  </file>
+</xliff>
+'''
+
+
+def test_csv_columns_are_locales_and_empty_cells_are_skipped(tmp_path):
+    file_path = tmp_path / 'delivery.csv'
+    file_path.write_text(
+        '\ufeffkey,es,pt,notes\n'
+        'invoice.title,Factura,Fatura,header\n'
+        'invoice.email.subject,"Factura, {number}",,\n'
+        ',orphan,orphan,\n',
+        encoding='utf-8',
+    )
+    source = CsvSource(str(file_path))
+    assert source.locales() == ['es', 'pt']
+    assert source.load('es') == {'invoice': {'title': 'Factura', 'email': {'subject': 'Factura, {number}'}}}
+    assert source.load('pt') == {'invoice': {'title': 'Fatura'}}
+
+
+def test_csv_needs_a_key_column_and_valid_keys(tmp_path):
+    file_path = tmp_path / 'delivery.csv'
+    file_path.write_text('id,es\na,b\n', encoding='utf-8')
+    with pytest.raises(SourceError, match='no "key" column'):
+        CsvSource(str(file_path))
+
+    file_path.write_text('key,es\ninvoice..title,Factura\n', encoding='utf-8')
+    with pytest.raises(SourceError, match="invalid key 'invoice..title'"):
+        CsvSource(str(file_path)).load('es')
+
+
+def test_xliff_12_units_flatten_inline_markup(tmp_path):
+    file_path = tmp_path / 'es.xlf'
+    file_path.write_text(XLIFF_12, encoding='utf-8')
+    source = XliffSource(str(file_path))
+    assert source.locales() == ['es']
+    assert source.load('es') == {'invoice': {'title': 'Factura', 'email': {'subject': 'Factura {number}'}}}
+
+
+def test_xliff_20_reads_the_target_language(tmp_path):
+    file_path = tmp_path / 'delivery.xliff'
+    file_path.write_text(XLIFF_20, encoding='utf-8')
+    source = XliffSource(str(file_path))
+    assert source.locales() == ['pt']
+    assert source.load('pt') == {'common': {'save': 'Salvar'}}
+
+
+@pytest.mark.parametrize('content, message', [
+    ('<xliff version="1.2"><file source-language="en"/></xliff>', 'no target language'),
+    ('<xliff', 'unclosed token'),
+])
+def test_unusable_xliff_is_rejected(tmp_path, content, message):
+    file_path = tmp_path / 'es.xlf'
+    file_path.write_text(content, encoding='utf-8')
+    with pytest.raises(SourceError, match=message):
+        XliffSource(str(file_path))
+
+
+def test_documents_are_named_after_their_locale(tmp_path):
+    (tmp_path / 'fr.yaml').write_text('invoice:\n  title: Facture\n  count: 3\n', encoding='utf-8')
+    (tmp_path / 'de.json').write_text(json.dumps({'invoice': {'title': 'Rechnung'}}), encoding='utf-8')
+    assert DocumentSource(str(tmp_path / 'fr.yaml')).load('fr') == {'invoice': {'title': 'Facture', 'count': 3}}
+    assert DocumentSource(str(tmp_path / 'de.json')).locales() == ['de']
+
+    (tmp_path / 'messages.json').write_text('{}', encoding='utf-8')
+    with pytest.raises(SourceError, match='not a locale code'):
+        DocumentSource(str(tmp_path / 'messages.json'))
+
+
+@pytest.mark.parametrize('name, content, message', [
+    ('de.json', '{"invoice": ', 'Expecting value'),
+    ('de.json', '["not", "a", "mapping"]', 'expected a mapping'),
+    ('de.yaml', 'invoice: [unclosed', 'de.yaml'),
+])
+def test_malformed_documents_raise_source_errors(tmp_path, name, content, message):
+    (tmp_path / name).write_text(content, encoding='utf-8')
+    with pytest.raises(SourceError, match=message):
+        DocumentSource(str(tmp_path / name)).load('de')
+
+
+def test_directories_merge_their_files_in_name_order(tmp_path):
+    (tmp_path / 'a.csv').write_text('key,es,pt\ninvoice.title,Factura,Fatura\ncommon.save,Guardar,\n', encoding='utf-8')
+    (tmp_path / 'es.json').write_text(json.dumps({'invoice': {'title': 'Factura (revisada)'}}), encoding='utf-8')
+    (tmp_path / 'readme.txt').write_text('ignored', encoding='utf-8')
+    (tmp_path / '.hidden.json').write_text('ignored', encoding='utf-8')
+
+    source = open_source(str(tmp_path))
+    assert isinstance(source, MultiSource)
+    assert source.locales() == ['es', 'pt']
+    assert source.load('es') == {'invoice': {'title': 'Factura (revisada)'}, 'common': {'save': 'Guardar'}}
+    assert source.load('pt') == {'invoice': {'title': 'Fatura'}}
+
+
+def test_open_source_rejects_missing_and_unsupported_paths(tmp_path):
+    with pytest.raises(SourceError, match='no such file'):
+        open_source(str(tmp_path / 'missing.csv'))
+    (tmp_path / 'notes.txt').write_text('', encoding='utf-8')
+    with pytest.raises(SourceError, match='unsupported file type'):
+        open_source(str(tmp_path / 'notes.txt'))
+
+
+def test_dict_source_serves_translations_as_is():
+    source = DictSource({'es': {'a': 'b'}})
+    assert source.locales() == ['es']
+    assert source.load('es') == {'a': 'b'}
@@ -0,0 +1,80 @@
+import json
+import os
+import shutil
+
+import pytest
+
+from manifest import hash_bytes
+from sync import FAILED, UPDATED, LocaleTask, run_sync, run_sync_async, sync_locale
+from update_translations_example import TRANSLATIONS, main
+
+MESSAGES_DIR = os.path.join(os.path.dirname(__file__), '..', '..', '..', 'src', 'i18n', 'messages')
+
+
+def _outcome(result):
+    return (result.lang_code, result.status, result.error, result.payload_hash, result.output_hash,
+            result.changes.summary(), result.bytes_written)
+
+
+def _repository_tasks(directory):
+    """Tasks syncing TRANSLATIONS into a copy of the repository catalogs, with broken locales mixed in."""
+    shutil.copytree(MESSAGES_DIR, directory)
+    for lang_code in ('xa', 'xb'):
+        (directory / f'{lang_code}.json').write_text('{broken', encoding='utf-8')
+    # A new key per locale, so every catalog is rewritten
+    return [
+        LocaleTask(lang_code, str(directory / f'{lang_code}.json'),
+                   {**TRANSLATIONS.get(lang_code, {}), 'syncCheck': {'locale': lang_code}})
+        for lang_code in ['xa', *TRANSLATIONS, 'xb']
+    ]
+
+
+def test_sync_merges_and_reports_changes(catalog_file):
+    file_path = catalog_file({'form': {'title': 'Alt'}})
+    result = sync_locale(LocaleTask('de', str(file_path), {'form': {'title': 'Neu', 'save': 'Speichern'}}))
+    assert result.status == UPDATED
+    assert json.loads(file_path.read_text(encoding='utf-8')) == {'form': {'title': 'Neu', 'save': 'Speichern'}}
+    assert result.output_hash == hash_bytes(file_path.read_bytes())
+    assert result.changes.summary() == {'added': 1, 'overwritten': 1, 'type_replaced': 0}
+
+
+def test_one_failing_locale_does_not_stop_the_others(tmp_path, catalog_file):
+    good = catalog_file({'a': 'x'}, 'de.json')
+    broken = tmp_path / 'fr.json'
+    broken.write_text('{broken')
+    results = run_sync([LocaleTask('fr', str(broken), {'a': 'y'}), LocaleTask('de', str(good), {'a': 'y'})])
+    assert [result.status for result in results] == [FAILED, UPDATED]
+    assert 'JSONDecodeError' in results[0].error
+    assert broken.read_text() == '{broken'
+
+
+@pytest.mark.parametrize('jobs', [2, 4])
+def test_parallel_sync_matches_a_serial_run(tmp_path, jobs):
+    serial_dir, parallel_dir = tmp_path / 'serial', tmp_path / 'parallel'
+    serial = run_sync(_repository_tasks(serial_dir), jobs=1)
+    # A lazy iterable, as update_translations() passes it
+    parallel = run_sync(iter(_repository_tasks(parallel_dir)), jobs=jobs)
+
+    assert [_outcome(result) for result in parallel] == [_outcome(result) for result in serial]
+    assert [result.status for result in serial] == [FAILED, *[UPDATED] * len(TRANSLATIONS), FAILED]
+    for name in sorted(os.listdir(serial_dir)):
+        assert (parallel_dir / name).read_bytes() == (serial_dir / name).read_bytes(), name
+
+
+@pytest.mark.parametrize('concurrency', [1, 3])
+def test_async_sync_matches_a_serial_run(tmp_path, concurrency):
+    serial_dir, async_dir = tmp_path / 'serial', tmp_path / 'async'
+    serial = run_sync(_repository_tasks(serial_dir))
+    overlapped = run_sync_async(iter(_repository_tasks(async_dir)), concurrency=concurrency)
+
+    assert [_outcome(result) for result in overlapped] == [_outcome(result) for result in serial]
+    for name in sorted(os.listdir(serial_dir)):
+        assert (async_dir / name).read_bytes() == (serial_dir / name).read_bytes(), name
+    # Staged files of the failed locales are discarded
+    assert sorted(os.listdir(async_dir)) == sorted(os.listdir(serial_dir))
+
+
+@pytest.mark.parametrize('flags', [['--jobs', '2'], ['--trace-memory'], ['--profile-dir', 'profiles']])
+def test_async_io_rejects_per_process_options(tmp_path, capsys, flags):
+    assert main(['sync', '--messages-dir', str(tmp_path), '--async-io', *flags]) == 2
+    assert '--async-io cannot be combined with' in capsys.readouterr().err
@@ -0,0 +1,113 @@
+import copy
+import json
+import random
+
+import pytest
+
+from merge import ChangeSet, deep_merge
+from sources import SourceError
+from tenants import BundleCache, overlay, tenant_dir, unshared_size
+from update_translations_example import build_tenant_bundles
+
+CATALOGS = {
+    'en': {'invoiceTemplate': {'title': 'Invoice', 'footer': 'Thank you'}, 'common': {'save': 'Save'}},
+    'de': {'invoiceTemplate': {'title': 'Rechnung', 'footer': 'Danke'}, 'common': {'save': 'Speichern'}},
+}
+
+
+@pytest.fixture
+def tenants_dir(tmp_path):
+    directory = tmp_path / 'tenants'
+    for tenant, patches in {'acme': {'en': {'invoiceTemplate': {'title': 'Bill'}}},
+                            'globex': {'de': {'invoiceTemplate': {'footer': 'Danke!'}}}}.items():
+        (directory / tenant).mkdir(parents=True)
+        for lang_code, patch in patches.items():
+            (directory / tenant / f'{lang_code}.json').write_text(json.dumps(patch), encoding='utf-8')
+    return directory
+
+
+def _random_tree(rng, depth=0):
+    tree = {}
+    for _ in range(rng.randrange(4)):
+        key = rng.choice('abcd')
+        tree[key] = _random_tree(rng, depth + 1) if depth < 3 and rng.random() < 0.5 else rng.choice(['x', 'y', 1])
+    return tree
+
+
+def test_overlay_matches_deep_merge_on_a_copy():
+    rng = random.Random(22)
+    for _ in range(500):
+        base, patch = _random_tree(rng), _random_tree(rng)
+        before = copy.deepcopy(base)
+        expected = copy.deepcopy(base)
+        expected_changes = deep_merge(expected, patch)
+        changes = ChangeSet()
+        assert overlay(base, patch, changes) == expected
+        assert changes.summary() == expected_changes.summary()
+        assert base == before
+
+
+def test_overlay_shares_what_the_patch_leaves_alone():
+    base = CATALOGS['en']
+    bundle = overlay(base, {'invoiceTemplate': {'title': 'Bill'}})
+    assert bundle['invoiceTemplate'] == {'title': 'Bill', 'footer': 'Thank you'}
+    assert bundle['common'] is base['common']
+    assert base['invoiceTemplate']['title'] == 'Invoice'
+    assert overlay(base, {'common': {'save': 'Save'}}) is base
+
+
+def test_unshared_size_counts_only_the_copies():
+    base = CATALOGS['en']
+    assert unshared_size(base, base) == 0
+    bundle = overlay(base, {'invoiceTemplate': {'title': 'Bill'}})
+    assert 0 < unshared_size(bundle, base) < unshared_size(copy.deepcopy(base), base)
+
+
+def test_bundle_cache_counts_hits_and_evicts_least_recently_used(tenants_dir):
+    cache = BundleCache(CATALOGS, str(tenants_dir), max_entries=2)
+    assert cache.get_bundle('acme', 'en')['invoiceTemplate']['title'] == 'Bill'
+    assert cache.get_bundle('acme', 'de') is CATALOGS['de']
+    assert cache.get_bundle('acme', 'en') is cache.get_bundle('acme', 'en')
+    cache.get_bundle('globex', 'de')
+
+    metrics = cache.metrics()
+    assert (metrics['hits'], metrics['misses'], metrics['evictions'], metrics['entries']) == (2, 3, 1, 2)
+    assert metrics['hit_rate'] == 2 / 5
+    # acme/de, the least recently used, went; it shared everything with the catalog anyway
+    assert set(cache.entries) == {('acme', 'en'), ('globex', 'de')}
+    assert metrics['resident_bytes'] == sum(size for _, _, size in cache.entries.values()) > 0
+
+
+def test_bundle_cache_invalidate(tenants_dir):
+    cache = BundleCache(CATALOGS, str(tenants_dir))
+    cache.get_bundle('acme', 'en')
+    cache.get_bundle('globex', 'de')
+    (tenants_dir / 'acme' / 'en.json').write_text(json.dumps({'common': {'save': 'Store'}}), encoding='utf-8')
+    cache.invalidate('acme')
+    assert set(cache.entries) == {('globex', 'de')}
+    assert cache.get_bundle('acme', 'en')['common']['save'] == 'Store'
+    cache.invalidate()
+    assert cache.metrics()['resident_bytes'] == 0
+
+
+@pytest.mark.parametrize('tenant', ['initech', '', '.', '..', '../tenants/acme', 'acme/../globex'])
+def test_unknown_tenants_are_rejected(tenants_dir, tenant):
+    with pytest.raises(SourceError, match='no overlay directory'):
+        tenant_dir(str(tenants_dir), tenant)
+    with pytest.raises(SourceError):
+        BundleCache(CATALOGS, str(tenants_dir)).get_bundle(tenant, 'en')
+
+
+def test_build_tenant_bundles(tmp_path, tenants_dir, capsys):
+    messages = tmp_path / 'messages'
+    messages.mkdir()
+    for lang_code, catalog in CATALOGS.items():
+        (messages / f'{lang_code}.json').write_text(json.dumps(catalog), encoding='utf-8')
+    out = tmp_path / 'bundles'
+    overrides = build_tenant_bundles(str(messages), str(tenants_dir), str(out))
+    assert overrides == {'acme': {'en': 1}, 'globex': {'de': 1}}
+    assert json.loads((out / 'globex' / 'de.json').read_text(encoding='utf-8'))['invoiceTemplate'] == {
+        'title': 'Rechnung', 'footer': 'Danke!',
+    }
+    assert json.loads((out / 'globex' / 'en.json').read_text(encoding='utf-8')) == CATALOGS['en']
+    assert 'acme: overrides en 1 (' in capsys.readouterr().out
@@ -0,0 +1,83 @@
+from usage import UsageIndex, find_missing, prune_catalog, scan_file, scan_sources
+
+COMPONENT = """
+import { useTranslations, useMessages } from 'next-intl';
+
+export function EmailDialog({ status, field }) {
+  const t = useTranslations('invoice.email');
+  const tCommon = useTranslations("common");
+  const messages = useMessages();
+  return (
+    <>
+      {t('title')}
+      {t.rich('buttons.send', { b: (chunks) => <b>{chunks}</b> })}
+      {tCommon(`statuses.${status}`)}
+      {messages.privacyPolicy.heading}
+      {format('not.a.key')}
+    </>
+  );
+}
+
+export async function Footer({ locale }) {
+  const t = await getTranslations({ locale, namespace: 'footer' });
+  return t(field);
+}
+"""
+
+CATALOG = {
+    'invoice': {'email': {'title': 'Send', 'buttons': {'send': 'Send', 'cancel': 'Cancel'}}},
+    'common': {'statuses': {'paid': 'Paid'}, 'other': 'Unused'},
+    'privacyPolicy': {'heading': 'Privacy'},
+    'footer': {'links': {'terms': 'Terms'}},
+    'legacy': 'Old',
+}
+
+
+def _scan(tmp_path, source, name='EmailDialog.tsx'):
+    (tmp_path / name).write_text(source, encoding='utf-8')
+    index = UsageIndex()
+    scan_file(str(tmp_path / name), index, name)
+    return index
+
+
+def test_scan_resolves_keys_against_their_translator(tmp_path):
+    index = _scan(tmp_path, COMPONENT)
+    assert index.keys == {'invoice.email.title', 'invoice.email.buttons.send'}
+    # Template literals keep their static prefix, raw messages and dynamic keys whole namespaces
+    assert index.prefixes == {'common.statuses', 'privacyPolicy', 'footer'}
+    assert index.locations['invoice.email.title'] == ['EmailDialog.tsx:10']
+    assert index.unresolved == []
+
+
+def test_prune_keeps_used_keys_in_order(tmp_path):
+    pruned, unused = prune_catalog(CATALOG, _scan(tmp_path, COMPONENT))
+    assert pruned == {
+        'invoice': {'email': {'title': 'Send', 'buttons': {'send': 'Send'}}},
+        'common': {'statuses': {'paid': 'Paid'}},
+        'privacyPolicy': {'heading': 'Privacy'},
+        'footer': {'links': {'terms': 'Terms'}},
+    }
+    assert unused == ['invoice.email.buttons.cancel', 'common.other', 'legacy']
+
+
+def test_unbound_translators_keep_every_matching_key(tmp_path):
+    # `t` handed in as a prop: its namespace is unknown
+    index = _scan(tmp_path, "export const Row = ({ t, name }) => <td>{t('send')}{t(name)}</td>;\n", 'Row.tsx')
+    assert index.relative_keys == {'send'}
+    assert index.unresolved == ['Row.tsx:1']
+    assert index.is_used(('invoice', 'email', 'buttons', 'send'))
+    assert not index.is_used(('invoice', 'email', 'buttons', 'cancel'))
+
+
+def test_find_missing(tmp_path):
+    index = _scan(tmp_path, "const t = useTranslations('invoice.email');\nt('title');\nt('subject');\n")
+    assert find_missing(CATALOG, index) == ['invoice.email.subject']
+
+
+def test_scan_sources_skips_dependencies_and_declarations(tmp_path):
+    (tmp_path / 'node_modules' / 'pkg').mkdir(parents=True)
+    (tmp_path / 'node_modules' / 'pkg' / 'index.ts').write_text("const t = useTranslations('vendor');\nt('x');\n")
+    (tmp_path / 'types.d.ts').write_text("const t = useTranslations('types');\nt('x');\n")
+    (tmp_path / 'app').mkdir()
+    (tmp_path / 'app' / 'page.tsx').write_text("const t = useTranslations('page');\nt('title');\n")
+    assert scan_sources(str(tmp_path)).keys == {'page.title'}
@@ -0,0 +1,64 @@
+from compact import KeyTable, compact_catalogs
+from validate import problem_count, validate_compact
+
+EN = {
+    'invoice': {
+        'title': 'Invoice',
+        'total': 'Total: {amount}',
+        'items': '{count, plural, one {# item} other {# items}}',
+    },
+    'email': {'sent': 'Email sent to {recipient}', 'buttons': {'send': 'Send', 'cancel': 'Cancel'}},
+    'limits': {'max': 10, 'ratio': 0.5, 'enabled': True},
+}
+
+
+def _validate(**catalogs):
+    return validate_compact(compact_catalogs([('en', EN), *catalogs.items()], KeyTable()), 'en')
+
+
+def test_consistent_locales_have_no_problems():
+    report = _validate(de={
+        'invoice': {'title': 'Rechnung', 'total': 'Summe: {amount}',
+                    'items': '{count, plural, one {# Artikel} other {# Artikel}}'},
+        'email': {'sent': 'E-Mail an {recipient} gesendet', 'buttons': {'send': 'Senden', 'cancel': 'Abbrechen'}},
+        # int and float are both JSON numbers
+        'limits': {'max': 10.0, 'ratio': 1, 'enabled': False},
+    })
+    assert [problem_count(problems) for problems in report.values()] == [0, 0]
+
+
+def test_missing_and_extra_subtrees_are_reported_at_their_root():
+    report = _validate(fr={'invoice': {'title': 'Facture', 'notes': {'a': 'A', 'b': 'B'}}, 'legacy': 'x'})
+    assert report['fr']['missing'] == ['email', 'invoice.items', 'invoice.total', 'limits']
+    assert report['fr']['extra'] == ['invoice.notes', 'legacy']
+    # A locale can have keys the table only learned after the default locale was loaded
+    assert report['en']['extra'] == []
+
+
+def test_type_conflicts():
+    report = _validate(pl={**EN, 'email': 'E-mail', 'limits': {'max': '10', 'ratio': 0.5, 'enabled': 1}})
+    assert report['pl']['type_conflicts'] == [
+        {'path': 'email', 'expected': 'object', 'found': 'string'},
+        {'path': 'limits.enabled', 'expected': 'boolean', 'found': 'number'},
+        {'path': 'limits.max', 'expected': 'number', 'found': 'string'},
+    ]
+    # Below a section that became a string, keys are missing rather than conflicting
+    assert report['pl']['missing'] == ['email.buttons', 'email.sent']
+
+
+def test_placeholder_mismatches_and_syntax_errors():
+    report = _validate(es={
+        **EN,
+        'invoice': {'title': 'Factura {number}', 'total': 'Total: {monto}',
+                    'items': '{count, plural, one {# artículo}}'},
+        'email': {'sent': 'Correo enviado a {recipient}', 'buttons': {'send': '<b>Enviar', 'cancel': 'Cancelar'}},
+    })
+    assert report['es']['placeholder_mismatches'] == [
+        {'path': 'invoice.title', 'missing': [], 'unexpected': ['number']},
+        {'path': 'invoice.total', 'missing': ['amount'], 'unexpected': ['monto']},
+    ]
+    assert report['es']['syntax_errors'] == [
+        {'path': 'email.buttons.send', 'error': 'Unclosed tag <b> at offset 0'},
+        {'path': 'invoice.items', 'error': 'Missing "other" clause in plural at offset 32'},
+    ]
+    assert problem_count(report['es']) == 4
@@ -0,0 +1,119 @@
+import json
+import os
+
+import pytest
+
+from incremental import load_snapshot, snapshot_path
+from manifest import Manifest, hash_bytes, hash_payload
+from sources import MultiSource, open_source, source_files
+from watch import CatalogWatcher
+
+MANIFEST_FILE = 'manifest.json'
+
+
+def _edit(path, data):
+    # Signatures are (mtime, size); move the mtime on so even a same-size edit is seen
+    stat = os.stat(path) if os.path.exists(path) else None
+    path.write_text(json.dumps(data, ensure_ascii=False), encoding='utf-8')
+    if stat is not None:
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+
+
+def _read(path):
+    return json.loads(path.read_text(encoding='utf-8'))
+
+
+@pytest.fixture
+def watched(tmp_path, catalog_file):
+    """A watcher over de/es catalogs fed by a directory of JSON payloads; returns (watcher, sources, log)."""
+    catalog_file({'invoice': {'title': 'Rechnung'}}, 'de.json')
+    catalog_file({'invoice': {'title': 'Factura'}}, 'es.json')
+    sources = tmp_path / 'sources'
+    sources.mkdir()
+    _edit(sources / 'de.json', {'invoice': {'total': 'Summe'}})
+    _edit(sources / 'es.json', {'invoice': {'total': 'Total'}})
+    log = []
+
+    def watched_files():
+        return source_files(str(sources))
+
+    def load_source():
+        return MultiSource([open_source(file_path) for file_path in watched_files()])
+
+    watcher = CatalogWatcher(str(tmp_path), str(tmp_path / 'state'), MANIFEST_FILE, load_source, watched_files,
+                             log=log.append)
+    watcher.start()
+    return watcher, sources, log
+
+
+def test_start_applies_every_payload_and_records_sync_state(watched, tmp_path):
+    watcher, _, log = watched
+    assert _read(tmp_path / 'de.json') == {'invoice': {'title': 'Rechnung', 'total': 'Summe'}}
+    assert _read(tmp_path / 'es.json') == {'invoice': {'title': 'Factura', 'total': 'Total'}}
+    assert log == ['Updated translations for de (1 added)', 'Updated translations for es (1 added)']
+
+    manifest = Manifest.load(str(tmp_path / 'state' / MANIFEST_FILE))
+    assert manifest.get('de') == {
+        'payload': hash_payload({'invoice': {'total': 'Summe'}}),
+        'output': hash_bytes((tmp_path / 'de.json').read_bytes()),
+    }
+    assert load_snapshot(snapshot_path(str(tmp_path / 'state'), 'es')) == {'invoice': {'total': 'Total'}}
+    assert watcher.poll() == (set(), set())
+
+
+def test_a_changed_source_only_resyncs_its_locales(watched, tmp_path):
+    watcher, sources, log = watched
+    log.clear()
+    es_before = (tmp_path / 'es.json').read_bytes()
+    _edit(sources / 'de.json', {'invoice': {'total': 'Gesamt', 'due': 'Fällig'}})
+
+    changed_sources, changed_catalogs = watcher.poll()
+    assert changed_sources == {str(sources / 'de.json')}
+    assert changed_catalogs == set()
+    watcher.apply(changed_sources, changed_catalogs)
+
+    assert _read(tmp_path / 'de.json') == {'invoice': {'title': 'Rechnung', 'total': 'Gesamt', 'due': 'Fällig'}}
+    assert (tmp_path / 'es.json').read_bytes() == es_before
+    assert log == ['Updated translations for de (1 added, 1 overwritten)']
+    assert watcher.poll() == (set(), set())
+
+
+def test_a_new_source_file_brings_in_its_locale(watched, tmp_path, catalog_file):
+    watcher, sources, log = watched
+    catalog_file({'invoice': {'title': 'Faktura'}}, 'pl.json')
+    _edit(sources / 'pl.json', {'invoice': {'total': 'Suma'}})
+    watcher.apply(*watcher.poll())
+    assert _read(tmp_path / 'pl.json') == {'invoice': {'title': 'Faktura', 'total': 'Suma'}}
+    assert 'pl' in watcher.locales
+
+
+def test_a_catalog_edited_on_disk_gets_the_full_payload_again(watched, tmp_path):
+    watcher, _, _ = watched
+    _edit(tmp_path / 'de.json', {'invoice': {'title': 'Rechnung (neu)'}})
+    changed_sources, changed_catalogs = watcher.poll()
+    assert (changed_sources, changed_catalogs) == (set(), {'de'})
+    watcher.apply(changed_sources, changed_catalogs)
+    assert _read(tmp_path / 'de.json') == {'invoice': {'title': 'Rechnung (neu)', 'total': 'Summe'}}
+    assert watcher.locales['de'].catalog == _read(tmp_path / 'de.json')
+    assert watcher.poll() == (set(), set())
+
+
+def test_unchanged_payloads_leave_catalogs_alone(watched, tmp_path):
+    watcher, sources, log = watched
+    log.clear()
+    _edit(sources / 'es.json', {'invoice': {'total': 'Total'}})
+    watcher.apply(*watcher.poll())
+    assert log == []
+
+
+def test_run_retries_after_a_half_saved_source(watched, tmp_path):
+    watcher, sources, log = watched
+    watcher.interval = watcher.debounce = 0
+    log.clear()
+    (sources / 'de.json').write_text('{"invoice": ', encoding='utf-8')
+    polls = iter(range(3))
+    watcher.run(stop=lambda: next(polls, None) is None)
+    assert log[0].startswith('error: SourceError: ')
+    # The broken file is not retried until it changes again
+    assert watcher.poll() == (set(), set())
+    assert _read(tmp_path / 'de.json') == {'invoice': {'title': 'Rechnung', 'total': 'Summe'}}
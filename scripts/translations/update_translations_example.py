@@ -1,5 +1,64 @@
+import argparse
+import importlib.util
 import json
 import os
+import sys
+import time
+
+from artifacts import brotli, build_artifacts
+from binary_catalog import compile_catalog, verify_catalog
+from catalog import discover_locales, iter_catalogs
+from checkpoint import STAGED, run_checkpointed
+from compact import compact_catalogs
+from diff import DiffError, changelog_report, diff_catalogs, format_changelog, git_catalogs
+from fallback import Resolver, default_chain, parse_chain
+from fsutil import write_if_changed
+from glyphs import NAMESPACES as GLYPH_NAMESPACES, SUBSETS, build_inventory
+from incremental import snapshot_path
+from json_writer import dumps_catalog, write_catalog
+from manifest import Manifest
+from memory import DEFAULT_LIMIT, DEFAULT_THRESHOLD, TranslationMemory
+from precompile import ParseCache, dumps_precompiled, precompile_catalog
+from prefill import (
+    DEFAULT_CACHE_SIZE, TEST_BACKENDS, PrefillError, RateLimiter, TranslationCache, collect_missing, load_backend,
+    prefill,
+)
+from routes import RouteError, build_trie, render_module, verify_trie
+from sources import DictSource, MultiSource, SourceError, open_source, source_files
+from sync import (
+    DEFAULT_IO_CONCURRENCY, FAILED, UNCHANGED, UPDATED, LocaleTask, SyncError, SyncOptions, run_sync, run_sync_async,
+)
+from telemetry import TelemetryWriter
+from tenants import tenant_bundles, tenant_dir, tenant_dirs, unshared_size
+from usage import find_missing, prune_catalog, scan_sources
+from validate import problem_count, validate_compact
+from watch import DEFAULT_DEBOUNCE, DEFAULT_INTERVAL, CatalogWatcher
+
+# Path to the translations directory
+TRANSLATIONS_DIR = 'src/i18n/messages'
+
+# Application sources that reference the messages
+SOURCE_DIR = 'src'
+
+# Per-tenant overlays: <tenant>/<locale>.json patches (or any sync source) over the catalogs
+TENANTS_DIR = 'src/i18n/tenants'
+
+# Local sync state (manifest etc.), kept out of the source tree
+STATE_DIR = '.translations-cache'
+MANIFEST_FILE = 'sync-manifest.json'
+COMPILED_DIR = os.path.join(STATE_DIR, 'compiled')
+PRECOMPILED_DIR = os.path.join(STATE_DIR, 'precompiled')
+RESOLVED_DIR = os.path.join(STATE_DIR, 'resolved')
+ARTIFACTS_DIR = os.path.join(STATE_DIR, 'artifacts')
+PREFILL_DIR = os.path.join(STATE_DIR, 'prefill')
+TENANT_BUNDLES_DIR = os.path.join(STATE_DIR, 'tenants')
+GLYPHS_DIR = os.path.join(STATE_DIR, 'glyphs')
+FALLBACKS_FILE = 'fallbacks.json'
+ROUTES_MODULE = 'src/i18n/routes.generated.ts'
+ICU_CACHE_FILE = 'icu-cache.json'
+MEMORY_FILE = 'translation-memory.json'
+MT_CACHE_FILE = 'mt-cache.json'
+DEFAULT_LOCALE = 'en'
 
 # Translations for different languages
 TRANSLATIONS = {
@@ -642,37 +701,834 @@ TRANSLATIONS = {
     }
 }
 
-def update_translations():
-    # Path to the translations directory
-    translations_dir = 'src/i18n/messages'
-    
-    # Iterate through each language file
-    for lang_code, translations in TRANSLATIONS.items():
-        file_path = os.path.join(translations_dir, f'{lang_code}.json')
-        
-        # Read the existing file
-        with open(file_path, 'r') as f:
-            existing_translations = json.load(f)
-        
-        # Deep merge the new translations
-        def deep_merge(existing, new):
-            for key, value in new.items():
-                if isinstance(value, dict):
-                    # If the key doesn't exist or isn't a dict, replace it
-                    if key not in existing or not isinstance(existing[key], dict):
-                        existing[key] = {}
-                    deep_merge(existing[key], value)
-                else:
-                    existing[key] = value
-        
-        # Merge the new translations
-        deep_merge(existing_translations, translations)
-        
-        # Write back to the file
-        with open(file_path, 'w') as f:
-            json.dump(existing_translations, f, indent=2, ensure_ascii=False)
-        
-        print(f'Updated translations for {lang_code}')
+# Localized route slugs. routing.ts pathnames and the middleware's route trie are generated from these (see
+# routes.py); a route is public if it needs no sign-in, and 'page': False keeps it out of the pathnames table
+ROUTES = {
+    '/': {'paths': '/', 'public': True},
+    '/invoices': {
+        'paths': {
+            'en': '/invoices',
+            'es': '/facturas',
+            'fr': '/factures',
+            'de': '/rechnungen',
+            'pl': '/faktury',
+            'pt': '/faturas',
+            'zh': '/发票',
+        },
+    },
+    '/invoice/create': {
+        'paths': {
+            'en': '/invoice/create',
+            'es': '/factura/crear',
+            'fr': '/facture/creer',
+            'de': '/rechnung/erstellen',
+            'pl': '/faktura/utworz',
+            'pt': '/fatura/criar',
+            'zh': '/发票/创建',
+        },
+        'public': True,
+    },
+    '/privacy-policy': {
+        'paths': {
+            'en': '/privacy-policy',
+            'es': '/politica-de-privacidad',
+            'fr': '/politique-de-confidentialite',
+            'de': '/datenschutzrichtlinie',
+            'pl': '/polityka-prywatnosci',
+            'pt': '/politica-de-privacidade',
+            'zh': '/隐私政策',
+        },
+        'public': True,
+    },
+    '/terms-of-service': {
+        'paths': {
+            'en': '/terms-of-service',
+            'es': '/terminos-de-servicio',
+            'fr': '/conditions-d-utilisation',
+            'de': '/nutzungsbedingungen',
+            'pl': '/warunki-korzystania-z-uslugi',
+            'pt': '/termos-de-servico',
+            'zh': '/服务条款',
+        },
+        'public': True,
+    },
+    '/signin': {
+        'paths': {
+            'en': '/signin',
+            'es': '/iniciar-sesion',
+            'fr': '/connexion',
+            'de': '/anmelden',
+            'pl': '/zaloguj-sie',
+            'pt': '/entrar',
+            'zh': '/登录',
+        },
+        'public': True,
+    },
+    '/verify': {
+        'paths': {
+            'en': '/verify',
+            'es': '/verificar',
+            'fr': '/verifier',
+            'de': '/verifizieren',
+            'pl': '/weryfikacja',
+            'pt': '/verificar',
+            'zh': '/验证',
+        },
+        'public': True,
+    },
+    '/api/invoice/parse/text': {'paths': '/api/invoice/parse/text', 'public': True, 'page': False},
+    '/api/invoice/parse/file': {'paths': '/api/invoice/parse/file', 'public': True, 'page': False},
+}
+
+def update_translations(translations_dir=TRANSLATIONS_DIR, jobs=1, state_dir=STATE_DIR, force=False,
+                        options=None, telemetry_path=None, io_concurrency=None, source=None, resumable=False):
+    options = options or SyncOptions()
+    telemetry = TelemetryWriter(telemetry_path) if telemetry_path else None
+    started = time.perf_counter()
+
+    manifest = Manifest.load(os.path.join(state_dir, MANIFEST_FILE))
+    source = source or DictSource(TRANSLATIONS)
+
+    def locale_task(lang_code):
+        return LocaleTask(
+            lang_code,
+            os.path.join(translations_dir, f'{lang_code}.json'),
+            source.load(lang_code),
+            previous=None if force else manifest.get(lang_code),
+            options=options,
+            snapshot_path=snapshot_path(state_dir, lang_code),
+        )
+
+    # Payloads are loaded as the sync reaches each locale, so only the
+    # locales in flight have theirs in memory
+    if resumable:
+        results = run_checkpointed(source.locales(), locale_task, state_dir)
+    elif io_concurrency:
+        results = run_sync_async(map(locale_task, source.locales()), concurrency=io_concurrency)
+    else:
+        results = run_sync(map(locale_task, source.locales()), jobs=jobs)
+
+    for result in results:
+        if result.status == UPDATED:
+            counts = ', '.join(f'{count} {kind}' for kind, count in result.changes.summary().items() if count)
+            print(f'Updated translations for {result.lang_code} ({counts})')
+        elif result.status == UNCHANGED:
+            print(f'Translations for {result.lang_code} already up to date')
+        elif result.status == STAGED:
+            print(f'Staged translations for {result.lang_code}; committed once every locale succeeds')
+        if result.ok and result.status != STAGED:
+            manifest.record(result.lang_code, result.payload_hash, result.output_hash)
+        if telemetry:
+            telemetry.emit(
+                'locale',
+                locale=result.lang_code,
+                status=result.status,
+                phases=result.timings,
+                changes=result.changes.summary(),
+                bytes_in=result.bytes_read,
+                bytes_out=result.bytes_written,
+                peak_traced_bytes=result.peak_traced_bytes,
+                phase_peak_traced_bytes=result.phase_peaks,
+                error=result.error,
+            )
+
+    # Successful locales are recorded even when others failed
+    manifest.save()
+
+    # Keep the translation memory current, if one has been built
+    memory_path = os.path.join(state_dir, MEMORY_FILE)
+    updated = [result.lang_code for result in results if result.status == UPDATED]
+    if updated and os.path.exists(memory_path):
+        memory = TranslationMemory.load(memory_path, DEFAULT_LOCALE)
+        memory.refresh(translations_dir, updated)
+        memory.save()
+
+    if telemetry:
+        phases = {}
+        for result in results:
+            for phase, seconds in result.timings.items():
+                phases[phase] = phases.get(phase, 0.0) + seconds
+        telemetry.emit(
+            'run',
+            # Resumable and async runs stay in this process
+            jobs=1 if resumable or io_concurrency else jobs,
+            io_concurrency=io_concurrency,
+            seconds=time.perf_counter() - started,
+            locales=len(results),
+            statuses={status: sum(result.status == status for result in results)
+                      for status in (UPDATED, UNCHANGED, STAGED, FAILED)},
+            phases=phases,
+            keys_touched=sum(len(result.changes) for result in results),
+            bytes_in=sum(result.bytes_read for result in results),
+            bytes_out=sum(result.bytes_written for result in results),
+        )
+
+    failures = [result for result in results if not result.ok]
+    if failures:
+        raise SyncError(failures)
+    return results
+
+
+def prune_unused(translations_dir=TRANSLATIONS_DIR, src_dir=SOURCE_DIR, out_dir=None, report_path=None):
+    """Report unused and missing keys per locale, optionally writing pruned catalogs to out_dir."""
+    index = scan_sources(src_dir)
+    report = {'unresolved': index.unresolved, 'locales': {}}
+
+    for lang_code in discover_locales(translations_dir):
+        with open(os.path.join(translations_dir, f'{lang_code}.json'), 'r', encoding='utf-8') as f:
+            catalog = json.load(f)
+        pruned, unused = prune_catalog(catalog, index)
+        missing = find_missing(catalog, index)
+        report['locales'][lang_code] = {'unused': unused, 'missing': missing}
+
+        if out_dir:
+            os.makedirs(out_dir, exist_ok=True)
+            write_catalog(os.path.join(out_dir, f'{lang_code}.json'), pruned)
+        print(f'{lang_code}: {len(unused)} unused, {len(missing)} missing')
+
+    for location in index.unresolved:
+        print(f'warning: cannot resolve translation key at {location}', file=sys.stderr)
+
+    if report_path:
+        with open(report_path, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+    return report
+
+
+def compile_catalogs(translations_dir=TRANSLATIONS_DIR, out_dir=COMPILED_DIR, verify=False):
+    """Compile every catalog to <out_dir>/<locale>.bin, returning the locales that failed verification."""
+    os.makedirs(out_dir, exist_ok=True)
+    failed = []
+    for lang_code in discover_locales(translations_dir):
+        with open(os.path.join(translations_dir, f'{lang_code}.json'), 'r', encoding='utf-8') as f:
+            catalog = json.load(f)
+        binary_path = os.path.join(out_dir, f'{lang_code}.bin')
+        _, size = compile_catalog(catalog, binary_path)
+        print(f'Compiled {lang_code} ({size} bytes)')
+
+        if verify:
+            problems = verify_catalog(binary_path, catalog)
+            for problem in problems:
+                print(f'{lang_code}: {problem}', file=sys.stderr)
+            if problems:
+                failed.append(lang_code)
+    return failed
+
+
+def precompile_messages(translations_dir=TRANSLATIONS_DIR, out_dir=PRECOMPILED_DIR, state_dir=STATE_DIR):
+    """Write <out_dir>/<locale>.json with every message parsed to an ICU AST.
+
+    Returns {locale: [(dotted path, error)]} for messages that failed to parse.
+    """
+    cache = ParseCache.load(os.path.join(state_dir, ICU_CACHE_FILE))
+    os.makedirs(out_dir, exist_ok=True)
+    errors = {}
+    for lang_code in discover_locales(translations_dir):
+        with open(os.path.join(translations_dir, f'{lang_code}.json'), 'r', encoding='utf-8') as f:
+            catalog = json.load(f)
+        precompiled, locale_errors = precompile_catalog(catalog, cache)
+        write_if_changed(os.path.join(out_dir, f'{lang_code}.json'), dumps_precompiled(precompiled))
+        for path, error in locale_errors:
+            print(f'{lang_code}: {path}: {error}', file=sys.stderr)
+        if locale_errors:
+            errors[lang_code] = locale_errors
+        print(f'Precompiled {lang_code} ({len(locale_errors)} errors)')
+
+    cache.save()
+    print(f'Parsed {cache.misses} messages, {cache.hits} from cache')
+    return errors
+
+
+def build_serving_artifacts(translations_dir=TRANSLATIONS_DIR, out_dir=ARTIFACTS_DIR):
+    """Write minified, content-addressed and precompressed catalogs plus their manifest (see artifacts.py)."""
+    if brotli is None:
+        print('brotli is not installed; writing gzip copies only (pip install brotli)', file=sys.stderr)
+    manifest = build_artifacts(iter_catalogs(translations_dir), out_dir)
+    for lang_code, entry in manifest.items():
+        sizes = ', '.join(f'{encoding} {encoded["size"]}' for encoding, encoded in entry['encodings'].items())
+        print(f'{lang_code}: {entry["file"]} ({entry["size"]} bytes; {sizes}), {len(entry["namespaces"])} namespaces')
+    return manifest
+
+
+def resolve_bundles(translations_dir=TRANSLATIONS_DIR, out_dir=RESOLVED_DIR, default_locale=DEFAULT_LOCALE,
+                    chains=None):
+    """Write a fully resolved <out_dir>/<locale>.json per locale, filling missing keys along its chain.
+
+    chains maps a locale to its chain (itself first); other locales use
+    default_chain(). Locales in chains need no catalog of their own. Which
+    keys were filled, and from where, goes to <out_dir>/fallbacks.json.
+    """
+    catalogs = {}
+    for lang_code in discover_locales(translations_dir):
+        with open(os.path.join(translations_dir, f'{lang_code}.json'), 'r', encoding='utf-8') as f:
+            catalogs[lang_code] = json.load(f)
+    chains = dict(chains or {})
+    for lang_code in catalogs:
+        chains.setdefault(lang_code, default_chain(lang_code, default_locale))
+
+    resolver = Resolver(catalogs)
+    os.makedirs(out_dir, exist_ok=True)
+    fallbacks = {}
+    for lang_code, chain in sorted(chains.items()):
+        bundle, provenance = resolver.resolve(chain)
+        write_if_changed(os.path.join(out_dir, f'{lang_code}.json'), dumps_catalog(bundle))
+        fallbacks[lang_code] = {'chain': chain, 'filled': provenance}
+        print(f'Resolved {lang_code} ({" -> ".join(chain)}): {len(provenance)} keys from fallbacks')
+
+    write_if_changed(os.path.join(out_dir, FALLBACKS_FILE), dumps_catalog(fallbacks))
+    return fallbacks
+
+
+def diff_translations(translations_dir=TRANSLATIONS_DIR, old_dir=None, revision='HEAD', report_path=None):
+    """Print the per-locale changelog from old_dir (or the catalogs at a git revision) to translations_dir."""
+    old = dict(iter_catalogs(old_dir) if old_dir else git_catalogs(revision, translations_dir))
+    new = dict(iter_catalogs(translations_dir))
+    changelogs = diff_catalogs(old, new)
+    if changelogs:
+        print(format_changelog(changelogs))
+    else:
+        print(f'No changes since {old_dir or revision}')
+
+    if report_path:
+        with open(report_path, 'w', encoding='utf-8') as f:
+            json.dump(changelog_report(changelogs), f, indent=2, ensure_ascii=False)
+    return changelogs
+
+
+def translation_memory(translations_dir=TRANSLATIONS_DIR, state_dir=STATE_DIR, default_locale=DEFAULT_LOCALE,
+                       queries=None, locales=None, suggest=False, limit=DEFAULT_LIMIT, threshold=DEFAULT_THRESHOLD,
+                       report_path=None):
+    """Bring the translation memory up to date, then look up queries and/or keys the locales miss.
+
+    Returns {locale: {text or key: [match, ...]}}.
+    """
+    memory = TranslationMemory.load(os.path.join(state_dir, MEMORY_FILE), default_locale)
+    changed = memory.refresh(translations_dir)
+    memory.save()
+    print(f'Translation memory: {len(memory)} units, {len(memory.records)} source texts '
+          f'({sum(changed.values())} units changed)')
+
+    targets = locales or [lang_code for lang_code in discover_locales(translations_dir) if lang_code != default_locale]
+    lookups = {lang_code: [(text, text) for text in queries or []] for lang_code in targets}
+    if suggest:
+        catalogs = dict(iter_catalogs(translations_dir))
+        for lang_code, entries in collect_missing(catalogs, default_locale, targets).items():
+            lookups[lang_code] += [('.'.join(path), text) for path, text in entries]
+
+    report = {}
+    for lang_code, items in lookups.items():
+        for label, text in items:
+            matches = memory.lookup(text, lang_code, limit, threshold)
+            report.setdefault(lang_code, {})[label] = [vars(match) for match in matches]
+            found = '; '.join(f'{match.translation!r} ({match.score:.0%}, {match.source!r})' for match in matches)
+            print(f'{lang_code}: {label}: {found or "no match"}')
+
+    if report_path:
+        with open(report_path, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+    return report
+
+
+def glyph_inventory(translations_dir=TRANSLATIONS_DIR, out_dir=GLYPHS_DIR, default_locale=DEFAULT_LOCALE,
+                    namespaces=GLYPH_NAMESPACES, loaded_subsets=('latin',)):
+    """Write the codepoints each locale's namespaces need for font subsetting (see glyphs.py).
+
+    Keys a locale lacks are counted from its fallback chain, as they are
+    rendered from there.
+    """
+    catalogs = dict(iter_catalogs(translations_dir))
+    resolver = Resolver(catalogs)
+    bundles = ((lang_code, resolver.resolve(default_chain(lang_code, default_locale))[0]) for lang_code in catalogs)
+    locales, reused = build_inventory(bundles, out_dir, namespaces, loaded_subsets)
+    for lang_code, entry in locales.items():
+        coverage = entry['coverage']
+        uncovered = f'; not in any subset: {coverage["uncovered"]}' if coverage['uncovered'] else ''
+        print(f'{lang_code}: {coverage["codepoints"]} codepoints, subsets {", ".join(coverage["subsets"]) or "-"}, '
+              f'{coverage["loaded_coverage"]:.0%} covered by {"+".join(loaded_subsets)}, '
+              f'~{coverage["estimated_subset_bytes"] // 1024} KB subset{uncovered}')
+    print(f'Scanned {len(locales) - reused} locales, {reused} unchanged')
+    return locales
+
+
+def build_tenant_bundles(translations_dir=TRANSLATIONS_DIR, tenants_dir=TENANTS_DIR, out_dir=TENANT_BUNDLES_DIR,
+                         tenants=None):
+    """Write <out_dir>/<tenant>/<locale>.json with each tenant's overlay merged over the catalogs.
+
+    Returns {tenant: {locale: overridden key count}}.
+    """
+    catalogs = dict(iter_catalogs(translations_dir))
+    if tenants:
+        directories = {tenant: tenant_dir(tenants_dir, tenant) for tenant in tenants}
+    else:
+        directories = tenant_dirs(tenants_dir)
+    overrides = {}
+    for tenant, directory in directories.items():
+        summary = overrides[tenant] = {}
+        resident_bytes = 0
+        os.makedirs(os.path.join(out_dir, tenant), exist_ok=True)
+        for lang_code, bundle, changes in tenant_bundles(catalogs, directory):
+            write_if_changed(os.path.join(out_dir, tenant, f'{lang_code}.json'), dumps_catalog(bundle))
+            resident_bytes += unshared_size(bundle, catalogs[lang_code])
+            if changes:
+                summary[lang_code] = len(changes.overwritten) + len(changes.type_replaced)
+            # Overlays reword existing messages; a key the catalog lacks is probably a typo
+            for path in changes.added:
+                print(f'{tenant}/{lang_code}: {".".join(path)} is not in the {lang_code} catalog', file=sys.stderr)
+        overridden = ', '.join(f'{lang_code} {count}' for lang_code, count in summary.items()) or 'nothing'
+        print(f'{tenant}: overrides {overridden} ({resident_bytes} bytes in memory beyond the shared catalogs)')
+    return overrides
+
+
+def generate_routes(translations_dir=TRANSLATIONS_DIR, out_path=ROUTES_MODULE, check=False):
+    """Write the pathnames table and route trie generated from ROUTES for the catalog locales.
+
+    With check, only compare against out_path. Returns whether it is up to date.
+    """
+    locales = discover_locales(translations_dir)
+    trie = build_trie(ROUTES, locales)
+    problems = verify_trie(trie, ROUTES, locales)
+    if problems:
+        raise RouteError('\n'.join(problems))
+    data = render_module(ROUTES, locales, trie).encode('utf-8')
+
+    if check:
+        try:
+            with open(out_path, 'rb') as f:
+                current = f.read() == data
+        except FileNotFoundError:
+            current = False
+        print(f'{out_path} is {"up to date" if current else "out of date; run the routes command"}')
+        return current
+    changed = write_if_changed(out_path, data)
+    print(f'{"Wrote" if changed else "Unchanged"} {out_path}: {len(ROUTES)} routes, {len(locales)} locales')
+    return True
+
+
+def validate_locales(translations_dir=TRANSLATIONS_DIR, default_locale=DEFAULT_LOCALE, report_path=None):
+    """Check every catalog against the default locale, returning the report per locale."""
+    # Held compactly: all locales share one key table
+    catalogs = compact_catalogs(iter_catalogs(translations_dir))
+    if default_locale not in catalogs:
+        raise FileNotFoundError(f'No catalog for the default locale {default_locale!r} in {translations_dir}')
+
+    report = validate_compact(catalogs, default_locale)
+    for lang_code, problems in report.items():
+        print(f'{lang_code}: {len(problems["missing"])} missing, {len(problems["extra"])} extra, '
+              f'{len(problems["type_conflicts"])} type conflicts, '
+              f'{len(problems["placeholder_mismatches"])} placeholder mismatches, '
+              f'{len(problems["syntax_errors"])} syntax errors')
+
+    if report_path:
+        with open(report_path, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+    return report
+
+
+def prefill_translations(translations_dir=TRANSLATIONS_DIR, out_dir=PREFILL_DIR, state_dir=STATE_DIR,
+                         default_locale=DEFAULT_LOCALE, backend='stub', locales=None, batch_size=None, rate=0,
+                         cache_size=DEFAULT_CACHE_SIZE):
+    """Machine-translate keys missing from the catalogs into <out_dir>/<locale>.json payloads.
+
+    The payloads are a regular source for sync --source, so they can be
+    reviewed before they are merged. Returns ({locale: payload}, rejected).
+    """
+    catalogs = dict(iter_catalogs(translations_dir))
+    if default_locale not in catalogs:
+        raise FileNotFoundError(f'No catalog for the default locale {default_locale!r} in {translations_dir}')
+    cache_path = os.path.join(state_dir, MT_CACHE_FILE)
+    # A test backend's output is never kept, so it can't be mistaken for a translation later
+    persistent = backend not in TEST_BACKENDS
+    if persistent:
+        cache = TranslationCache.load(cache_path, backend, cache_size)
+    else:
+        cache = TranslationCache(cache_path, backend, cache_size)
+    backend = load_backend(backend)
+    calls_before = getattr(backend, 'calls', None)
+
+    missing = collect_missing(catalogs, default_locale, locales)
+    try:
+        payloads, rejected = prefill(missing, backend, cache, default_locale, batch_size, RateLimiter(rate))
+    finally:
+        # Keep what was already paid for, even if the backend failed part way
+        if persistent:
+            cache.save()
+
+    os.makedirs(out_dir, exist_ok=True)
+    for lang_code, payload in payloads.items():
+        file_path = os.path.join(out_dir, f'{lang_code}.json')
+        if payload:
+            write_if_changed(file_path, dumps_catalog(payload))
+        elif os.path.exists(file_path):
+            os.unlink(file_path)
+        print(f'{lang_code}: {len(missing[lang_code])} missing keys')
+    for lang_code, path, reason in rejected:
+        print(f'{lang_code}: {path}: {reason}', file=sys.stderr)
+
+    requests = '' if calls_before is None else f' in {backend.calls - calls_before} requests'
+    print(f'Translated {cache.misses} texts{requests}, {cache.hits} from cache')
+    return payloads, rejected
+
+
+def _run_sync(args):
+    if args.resumable and (args.jobs > 1 or args.async_io or args.in_place or args.shards or args.incremental):
+        print('--resumable cannot be combined with --jobs, --async-io, --in-place, --shards or --incremental',
+              file=sys.stderr)
+        return 2
+    # The async pipeline runs in one process; --jobs would be ignored
+    if args.async_io and args.jobs > 1:
+        print('--async-io cannot be combined with --jobs', file=sys.stderr)
+        return 2
+    # tracemalloc and the profiler are process-wide, so threads would measure each other
+    if args.async_io and (args.trace_memory or args.profile_dir):
+        print('--async-io cannot be combined with --trace-memory or --profile-dir', file=sys.stderr)
+        return 2
+    try:
+        source = MultiSource([open_source(path) for path in args.source]) if args.source else None
+        options = SyncOptions(
+            in_place=args.in_place,
+            shards=args.shards,
+            incremental=args.incremental,
+            profile_dir=args.profile_dir,
+            trace_memory=args.trace_memory,
+        )
+        update_translations(
+            args.messages_dir,
+            jobs=args.jobs,
+            state_dir=args.state_dir,
+            force=args.force,
+            options=options,
+            telemetry_path=args.telemetry,
+            io_concurrency=args.async_io,
+            source=source,
+            resumable=args.resumable,
+        )
+    except (SyncError, SourceError) as e:
+        print(e, file=sys.stderr)
+        return 1
+    if args.artifacts:
+        build_serving_artifacts(args.messages_dir, args.artifacts_dir)
+    return 0
+
+
+def _run_prefill(args):
+    if args.apply and args.backend in TEST_BACKENDS:
+        print(f'--apply needs a real --backend; the {args.backend} backend only tags the English text', file=sys.stderr)
+        return 2
+    try:
+        payloads, rejected = prefill_translations(
+            args.messages_dir, args.out_dir, args.state_dir, args.default_locale, args.backend,
+            locales=args.locale, batch_size=args.batch_size, rate=args.rate, cache_size=args.cache_size,
+        )
+    except PrefillError as e:
+        print(e, file=sys.stderr)
+        return 2
+    if args.apply and any(payloads.values()):
+        try:
+            filled = {lang_code: payload for lang_code, payload in payloads.items() if payload}
+            update_translations(args.messages_dir, state_dir=args.state_dir, source=DictSource(filled))
+        except SyncError as e:
+            print(e, file=sys.stderr)
+            return 1
+    return 1 if rejected else 0
+
+
+def _run_usage(args):
+    prune_unused(args.messages_dir, args.src_dir, out_dir=args.out_dir, report_path=args.report)
+    return 0
+
+
+def _run_compile(args):
+    failed = compile_catalogs(args.messages_dir, args.out_dir, verify=args.verify)
+    if failed:
+        print(f'Verification failed for {", ".join(failed)}', file=sys.stderr)
+        return 1
+    return 0
+
+
+def _run_precompile(args):
+    errors = precompile_messages(args.messages_dir, args.out_dir, args.state_dir)
+    return 1 if errors else 0
+
+
+def _literal_source():
+    # Re-read this file so edits to the TRANSLATIONS literal are picked up
+    spec = importlib.util.spec_from_file_location('_translations_literal', os.path.abspath(__file__))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return DictSource(module.TRANSLATIONS)
+
+
+def _run_watch(args):
+    if args.source:
+        def watched_files():
+            return [file_path for path in args.source if os.path.exists(path) for file_path in source_files(path)]
+
+        def load_source():
+            # One source per file, so a change only reloads the locales that file provides
+            return MultiSource([open_source(file_path) for file_path in watched_files()])
+    else:
+        load_source = _literal_source
+
+        def watched_files():
+            return [os.path.abspath(__file__)]
+
+    watcher = CatalogWatcher(args.messages_dir, args.state_dir, MANIFEST_FILE, load_source, watched_files,
+                             interval=args.interval, debounce=args.debounce)
+    try:
+        watcher.start()
+    except (SourceError, OSError, ValueError) as e:
+        print(e, file=sys.stderr)
+        return 1
+    print(f'Watching {len(watcher.locales)} locales; press Ctrl+C to stop')
+    try:
+        watcher.run()
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+def _run_artifacts(args):
+    build_serving_artifacts(args.messages_dir, args.out_dir)
+    return 0
+
+
+def _run_resolve(args):
+    try:
+        chains = dict(parse_chain(spec) for spec in args.fallback or [])
+    except ValueError as e:
+        print(e, file=sys.stderr)
+        return 2
+    resolve_bundles(args.messages_dir, args.out_dir, args.default_locale, chains)
+    return 0
+
+
+def _run_diff(args):
+    try:
+        changelogs = diff_translations(args.messages_dir, args.old, args.rev, report_path=args.report)
+    except DiffError as e:
+        print(e, file=sys.stderr)
+        return 2
+    return 1 if args.exit_code and changelogs else 0
+
+
+def _score_threshold(value):
+    threshold = float(value)
+    if not 0 < threshold <= 1:
+        raise argparse.ArgumentTypeError(f'must be above 0 and at most 1, not {value}')
+    return threshold
+
+
+def _run_memory(args):
+    translation_memory(args.messages_dir, args.state_dir, args.default_locale, args.query, args.locale, args.suggest,
+                       args.limit, args.threshold, report_path=args.report)
+    return 0
+
+
+def _run_glyphs(args):
+    glyph_inventory(args.messages_dir, args.out_dir, args.default_locale, args.namespace or GLYPH_NAMESPACES,
+                    args.loaded_subset or ('latin',))
+    return 0
+
+
+def _run_tenants(args):
+    try:
+        build_tenant_bundles(args.messages_dir, args.tenants_dir, args.out_dir, args.tenant)
+    except SourceError as e:
+        print(e, file=sys.stderr)
+        return 1
+    return 0
+
+
+def _run_routes(args):
+    try:
+        current = generate_routes(args.messages_dir, args.out, check=args.check)
+    except RouteError as e:
+        print(e, file=sys.stderr)
+        return 2
+    return 0 if current else 1
+
+
+def _run_validate(args):
+    report = validate_locales(args.messages_dir, args.default_locale, report_path=args.report)
+    return 1 if any(problem_count(problems) for problems in report.values()) else 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Bulk update the next-intl message catalogs.')
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument('--messages-dir', default=TRANSLATIONS_DIR,
+                        help='directory containing the <locale>.json catalogs')
+    commands = parser.add_subparsers(dest='command')
+
+    sync = commands.add_parser('sync', parents=[common], help='merge TRANSLATIONS into the catalogs (default)')
+    sync.add_argument('--jobs', '-j', type=int, default=1,
+                      help='number of worker processes (default: 1, serial)')
+    sync.add_argument('--source', action='append', metavar='PATH',
+                      help='read the payloads from translator files (JSON/YAML per locale, CSV, XLIFF) '
+                           'or a directory of them instead of TRANSLATIONS; repeatable, later files win')
+    sync.add_argument('--async-io', type=int, nargs='?', const=DEFAULT_IO_CONCURRENCY, metavar='N',
+                      help='overlap file I/O across locales with up to N at a time and batch the fsyncs '
+                           f'(default N: {DEFAULT_IO_CONCURRENCY}); for catalogs on network filesystems')
+    sync.add_argument('--state-dir', default=STATE_DIR,
+                      help='directory holding the sync manifest')
+    sync.add_argument('--force', action='store_true',
+                      help='ignore the manifest and re-merge every locale')
+    sync.add_argument('--in-place', action='store_true',
+                      help='patch a few changed same-length values directly into files the manifest '
+                           'recorded, instead of writing new ones; NOT crash-safe: an interruption can leave '
+                           'a partly patched catalog')
+    sync.add_argument('--shards', action='store_true',
+                      help='also write per-namespace shards to <messages-dir>/<locale>/')
+    sync.add_argument('--incremental', action='store_true',
+                      help='only apply payload keys that changed since the last sync')
+    sync.add_argument('--resumable', action='store_true',
+                      help='journal progress per locale and namespace, commit the catalogs only once every '
+                           'locale merged, and resume an interrupted or failed run from the journal')
+    sync.add_argument('--telemetry', metavar='PATH',
+                      help='append per-locale and per-run metrics to PATH as JSON lines')
+    sync.add_argument('--profile-dir', help='write a cProfile dump per locale to this directory')
+    sync.add_argument('--trace-memory', action='store_true',
+                      help='record the tracemalloc peak per locale in the telemetry')
+    sync.add_argument('--artifacts', action='store_true',
+                      help='after a successful sync, rebuild the serving artifacts (see the artifacts command)')
+    sync.add_argument('--artifacts-dir', default=ARTIFACTS_DIR, help='directory for --artifacts')
+    sync.set_defaults(handler=_run_sync)
+
+    usage = commands.add_parser('usage', parents=[common],
+                                help='find unused and missing keys by scanning the TS/TSX sources')
+    usage.add_argument('--src-dir', default=SOURCE_DIR, help='source tree to scan')
+    usage.add_argument('--out-dir', help='write catalogs without the unused keys here')
+    usage.add_argument('--report', help='write the full JSON report to this file')
+    usage.set_defaults(handler=_run_usage)
+
+    compile_parser = commands.add_parser('compile', parents=[common],
+                                         help='compile catalogs to the memory-mappable binary format')
+    compile_parser.add_argument('--out-dir', default=COMPILED_DIR, help='directory for the <locale>.bin files')
+    compile_parser.add_argument('--verify', action='store_true',
+                                help='check every compiled catalog round-trips to its JSON source')
+    compile_parser.set_defaults(handler=_run_compile)
+
+    precompile = commands.add_parser('precompile', parents=[common],
+                                     help='parse every message to an ICU AST the app can use without runtime parsing')
+    precompile.add_argument('--out-dir', default=PRECOMPILED_DIR,
+                            help='directory for the precompiled <locale>.json files')
+    precompile.add_argument('--state-dir', default=STATE_DIR, help='directory holding the parse cache')
+    precompile.set_defaults(handler=_run_precompile)
+
+    watch = commands.add_parser('watch', parents=[common],
+                                help='keep catalogs in memory and re-sync changed keys whenever the payloads change')
+    watch.add_argument('--source', action='append', metavar='PATH',
+                       help='payload files or directories to watch, as for sync (default: TRANSLATIONS in this file)')
+    watch.add_argument('--state-dir', default=STATE_DIR, help='directory holding the sync manifest and snapshots')
+    watch.add_argument('--interval', type=float, default=DEFAULT_INTERVAL,
+                       help=f'seconds between polls (default: {DEFAULT_INTERVAL})')
+    watch.add_argument('--debounce', type=float, default=DEFAULT_DEBOUNCE,
+                       help=f'seconds without further changes before syncing (default: {DEFAULT_DEBOUNCE})')
+    watch.set_defaults(handler=_run_watch)
+
+    artifacts = commands.add_parser('artifacts', parents=[common],
+                                    help='write minified, content-hashed catalogs, .gz/.br copies and a manifest')
+    artifacts.add_argument('--out-dir', default=ARTIFACTS_DIR, help='directory for the artifacts and artifacts.json')
+    artifacts.set_defaults(handler=_run_artifacts)
+
+    resolve = commands.add_parser('resolve', parents=[common],
+                                  help='write per-locale bundles with missing keys filled along fallback chains')
+    resolve.add_argument('--out-dir', default=RESOLVED_DIR, help='directory for the resolved <locale>.json files')
+    resolve.add_argument('--default-locale', default=DEFAULT_LOCALE,
+                         help=f'last resort of every chain (default: {DEFAULT_LOCALE})')
+    resolve.add_argument('--fallback', action='append', metavar='LOCALE=CHAIN',
+                         help='fallback chain for a locale, e.g. pt-BR=pt,en (repeatable); '
+                              'by default a locale falls back to its base language, then the default locale')
+    resolve.set_defaults(handler=_run_resolve)
+
+    prefill_parser = commands.add_parser('prefill', parents=[common],
+                                         help='machine-translate missing keys into reviewable payloads')
+    prefill_parser.add_argument('--out-dir', default=PREFILL_DIR,
+                                help='directory for the <locale>.json payloads (usable with sync --source)')
+    prefill_parser.add_argument('--state-dir', default=STATE_DIR, help='directory holding the translation cache')
+    prefill_parser.add_argument('--default-locale', default=DEFAULT_LOCALE,
+                                help=f'locale translated from (default: {DEFAULT_LOCALE})')
+    prefill_parser.add_argument('--locale', action='append', metavar='LOCALE',
+                                help='only pre-fill this locale (repeatable; default: all)')
+    prefill_parser.add_argument('--backend', default='stub',
+                                help="'stub' (offline, for tests) or module:attribute of a backend factory "
+                                     '(default: stub)')
+    prefill_parser.add_argument('--batch-size', type=int,
+                                help="texts per backend request (default: the backend's maximum)")
+    prefill_parser.add_argument('--rate', type=float, default=0,
+                                help='maximum backend requests per second (default: unlimited)')
+    prefill_parser.add_argument('--cache-size', type=int, default=DEFAULT_CACHE_SIZE,
+                                help=f'translations kept in the cache (default: {DEFAULT_CACHE_SIZE})')
+    prefill_parser.add_argument('--apply', action='store_true',
+                                help='merge the payloads into the catalogs right away (not with the stub backend)')
+    prefill_parser.set_defaults(handler=_run_prefill)
+
+    diff = commands.add_parser('diff', parents=[common],
+                               help='per-locale changelog of added, removed and changed keys')
+    old_side = diff.add_mutually_exclusive_group()
+    old_side.add_argument('--rev', default='HEAD',
+                          help='compare the catalogs at this git revision to the working tree (default: HEAD)')
+    old_side.add_argument('--old', metavar='DIR',
+                          help='compare the <locale>.json catalogs in DIR instead, e.g. a copy taken before a sync')
+    diff.add_argument('--report', help='write the changelog as JSON to this file')
+    diff.add_argument('--exit-code', action='store_true', help='exit with 1 if anything changed')
+    diff.set_defaults(handler=_run_diff)
+
+    memory = commands.add_parser('memory', parents=[common],
+                                 help='update the translation memory and look up exact and fuzzy matches')
+    memory.add_argument('--state-dir', default=STATE_DIR, help='directory holding the translation memory')
+    memory.add_argument('--default-locale', default=DEFAULT_LOCALE,
+                        help=f'locale the memory is keyed by (default: {DEFAULT_LOCALE})')
+    memory.add_argument('--query', action='append', metavar='TEXT', help='English text to look up (repeatable)')
+    memory.add_argument('--suggest', action='store_true', help='look up every key a locale is missing')
+    memory.add_argument('--locale', action='append', help='locale to look up in (repeatable; default: all)')
+    memory.add_argument('--limit', type=int, default=DEFAULT_LIMIT,
+                        help=f'matches per lookup (default: {DEFAULT_LIMIT})')
+    memory.add_argument('--threshold', type=_score_threshold, default=DEFAULT_THRESHOLD,
+                        help=f'minimum fuzzy score, above 0 and at most 1 (default: {DEFAULT_THRESHOLD})')
+    memory.add_argument('--report', help='write the matches as JSON to this file')
+    memory.set_defaults(handler=_run_memory)
+
+    glyphs = commands.add_parser('glyphs', parents=[common],
+                                 help='list the codepoints each locale needs, for subsetting the invoice fonts')
+    glyphs.add_argument('--out-dir', default=GLYPHS_DIR, help='directory for glyphs.json and the <locale>.txt files')
+    glyphs.add_argument('--default-locale', default=DEFAULT_LOCALE,
+                        help=f'locale missing keys fall back to (default: {DEFAULT_LOCALE})')
+    glyphs.add_argument('--namespace', action='append',
+                        help=f'namespace to scan (repeatable; default: {", ".join(GLYPH_NAMESPACES)})')
+    glyphs.add_argument('--loaded-subset', action='append', choices=sorted(SUBSETS),
+                        help='font subset the app loads, for the coverage report (repeatable; default: latin)')
+    glyphs.set_defaults(handler=_run_glyphs)
+
+    tenants = commands.add_parser('tenants', parents=[common],
+                                  help="write each tenant's bundles: its overlay merged over the catalogs")
+    tenants.add_argument('--tenants-dir', default=TENANTS_DIR,
+                         help=f'directory with one overlay directory per tenant (default: {TENANTS_DIR})')
+    tenants.add_argument('--out-dir', default=TENANT_BUNDLES_DIR,
+                         help='directory for the <tenant>/<locale>.json bundles')
+    tenants.add_argument('--tenant', action='append', help='only build this tenant (repeatable; default: all)')
+    tenants.set_defaults(handler=_run_tenants)
+
+    routes = commands.add_parser('routes', parents=[common],
+                                 help='generate the localized pathnames table and middleware route trie from ROUTES')
+    routes.add_argument('--out', default=ROUTES_MODULE, help=f'TypeScript module to write (default: {ROUTES_MODULE})')
+    routes.add_argument('--check', action='store_true', help='only check the module is up to date; exit with 1 if not')
+    routes.set_defaults(handler=_run_routes)
+
+    validate = commands.add_parser('validate', parents=[common],
+                                   help='check keys, value types and ICU placeholders against the default locale')
+    validate.add_argument('--default-locale', default=DEFAULT_LOCALE,
+                          help=f'locale the others are compared to (default: {DEFAULT_LOCALE})')
+    validate.add_argument('--report', help='write the full JSON report to this file')
+    validate.set_defaults(handler=_run_validate)
+
+    argv = sys.argv[1:] if argv is None else list(argv)
+    # Running without a command keeps the original behaviour: sync
+    if not argv or (argv[0] not in commands.choices and argv[0] not in ('-h', '--help')):
+        argv.insert(0, 'sync')
+    args = parser.parse_args(argv)
+    return args.handler(args)
+
 
 if __name__ == '__main__':
-    update_translations() 
\ No newline at end of file
+    sys.exit(main())
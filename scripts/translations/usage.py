@@ -0,0 +1,189 @@
+"""Static analysis of translation key usage in the TS/TSX sources.
+
+Translator bindings such as
+
+    const t = useTranslations('invoice.email');
+    const t = await getTranslations({ locale, namespace: 'emailTemplate' });
+
+are matched with the calls that follow them in the same file (t('title'),
+t.rich(...), t(`statuses.${status}`), ...). The analysis is deliberately
+conservative, since a key wrongly reported as unused gets pruned from the
+shipped catalogs:
+
+- a template literal key keeps everything under its static prefix;
+- a non-literal key keeps the whole namespace of its translator;
+- calls through a translator that is not bound in the file (for example
+  a `t` passed in as a prop) keep every key path ending in that key;
+- reading raw messages (messages.privacyPolicy... after useMessages())
+  keeps the whole namespace.
+"""
+import os
+import re
+from dataclasses import dataclass, field
+
+from catalog import MISSING, from_leaves, get_path, iter_leaves
+
+SOURCE_EXTENSIONS = ('.ts', '.tsx')
+SKIP_DIRS = {'node_modules', '.next', '.git'}
+
+# Functions returning a translator, optionally scoped to a namespace
+_BINDING = re.compile(
+    r'\b(?:const|let|var)\s+([A-Za-z_$][\w$]*)\s*=\s*(?:await\s+)?'
+    r'(?:useTranslations|getTranslations|getServerTranslation|getTranslationFunction)\s*\(\s*'
+    r'(?:([\'"`])([^\'"`]*)\2|(\{.*?\})|(?=\)))',
+    re.S,
+)
+_MESSAGES_BINDING = re.compile(
+    r'\b(?:const|let|var)\s+([A-Za-z_$][\w$]*)\s*=\s*(?:await\s+)?(?:useMessages|getMessages)\s*\('
+)
+_NAMESPACE_OPTION = re.compile(r'\bnamespace\s*:\s*([\'"`])([^\'"`]*)\1')
+# t('key'), t.rich("key"), tCommon(`prefix.${x}`), ...
+_LITERAL_CALL = re.compile(
+    r'(?<![\w$.])([A-Za-z_$][\w$]*)(?:\.(?:rich|raw|markup|has))?\(\s*'
+    r'([\'"`])((?:\\.|(?!\2).)*)\2'
+)
+_DYNAMIC_CALL = re.compile(
+    r'(?<![\w$.])([A-Za-z_$][\w$]*)(?:\.(?:rich|raw|markup|has))?\(\s*([A-Za-z_$][\w$.]*)\s*[,)]'
+)
+# Names the repo uses for translators passed around as props
+_TRANSLATOR_NAME = re.compile(r'^t(?:[A-Z][\w$]*)?$')
+
+
+@dataclass
+class UsageIndex:
+    # Fully resolved dotted key paths
+    keys: set = field(default_factory=set)
+    # Dotted prefixes whose whole subtree is used ('' is the whole catalog)
+    prefixes: set = field(default_factory=set)
+    # Keys called through translators with an unknown namespace
+    relative_keys: set = field(default_factory=set)
+    # 'file:line' of calls whose key cannot be determined at all
+    unresolved: list = field(default_factory=list)
+    # Where each resolved key is referenced, for the report
+    locations: dict = field(default_factory=dict)
+
+    def is_used(self, path):
+        if '.'.join(path) in self.keys:
+            return True
+        for length in range(len(path)):
+            if '.'.join(path[:length]) in self.prefixes:
+                return True
+        for start in range(1, len(path)):
+            if '.'.join(path[start:]) in self.relative_keys:
+                return True
+        return False
+
+
+def _join(namespace, key):
+    return f'{namespace}.{key}' if namespace else key
+
+
+def _line(text, offset):
+    return text.count('\n', 0, offset) + 1
+
+
+def _bindings(text):
+    """Return [(offset, name, namespace)] for every translator binding in text."""
+    bindings = []
+    for match in _BINDING.finditer(text):
+        name, _, literal, options = match.group(1), match.group(2), match.group(3), match.group(4)
+        if literal is not None:
+            namespace = literal
+        elif options is not None:
+            option = _NAMESPACE_OPTION.search(options)
+            namespace = option.group(2) if option else ''
+        else:
+            namespace = ''
+        bindings.append((match.start(), name, namespace))
+    return bindings
+
+
+def _resolve(bindings, name, offset):
+    # The closest preceding binding wins; components in one file commonly
+    # reuse `t` for different namespaces
+    namespace = None
+    for binding_offset, binding_name, binding_namespace in bindings:
+        if binding_offset > offset:
+            break
+        if binding_name == name:
+            namespace = binding_namespace
+    return namespace
+
+
+def scan_file(file_path, index, display_path=None):
+    with open(file_path, 'r', encoding='utf-8') as f:
+        text = f.read()
+    display_path = display_path or file_path
+    bindings = _bindings(text)
+    bound_names = {name for _, name, _ in bindings}
+
+    def is_translator(name):
+        return name in bound_names or _TRANSLATOR_NAME.match(name)
+
+    for match in _LITERAL_CALL.finditer(text):
+        name, quote, key = match.group(1), match.group(2), match.group(3)
+        if not is_translator(name):
+            continue
+        namespace = _resolve(bindings, name, match.start())
+        location = f'{display_path}:{_line(text, match.start())}'
+
+        if quote == '`' and '${' in key:
+            prefix = key[:key.index('${')].rstrip('.')
+            if namespace is None:
+                index.unresolved.append(location)
+            else:
+                index.prefixes.add(_join(namespace, prefix) if prefix else namespace)
+            continue
+
+        if namespace is None:
+            index.relative_keys.add(key)
+        else:
+            full_key = _join(namespace, key)
+            index.keys.add(full_key)
+            index.locations.setdefault(full_key, []).append(location)
+
+    for name in {match.group(1) for match in _MESSAGES_BINDING.finditer(text)}:
+        for match in re.finditer(rf'(?<![\w$.]){re.escape(name)}\.([A-Za-z_$][\w$]*)', text):
+            index.prefixes.add(match.group(1))
+
+    for match in _DYNAMIC_CALL.finditer(text):
+        name = match.group(1)
+        if not is_translator(name):
+            continue
+        namespace = _resolve(bindings, name, match.start())
+        if namespace is None:
+            index.unresolved.append(f'{display_path}:{_line(text, match.start())}')
+        else:
+            index.prefixes.add(namespace)
+
+
+def scan_sources(src_dir):
+    """Scan every .ts/.tsx file under src_dir and return the UsageIndex."""
+    index = UsageIndex()
+    for root, dirs, files in os.walk(src_dir):
+        dirs[:] = sorted(d for d in dirs if d not in SKIP_DIRS)
+        for file_name in sorted(files):
+            if file_name.endswith(SOURCE_EXTENSIONS) and not file_name.endswith('.d.ts'):
+                file_path = os.path.join(root, file_name)
+                scan_file(file_path, index, os.path.relpath(file_path, src_dir))
+    return index
+
+
+def prune_catalog(catalog, index):
+    """Return (pruned catalog, unused dotted key paths), keeping key order."""
+    kept = []
+    unused = []
+    for path, value in iter_leaves(catalog):
+        if index.is_used(path):
+            kept.append((path, value))
+        else:
+            unused.append('.'.join(path))
+    return from_leaves(kept), unused
+
+
+def find_missing(catalog, index):
+    """Dotted keys referenced in the sources that the catalog does not define."""
+    return sorted(
+        key for key in index.keys
+        if get_path(catalog, tuple(key.split('.')), default=MISSING) is MISSING
+    )
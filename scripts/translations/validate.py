@@ -0,0 +1,143 @@
+"""Cross-locale consistency checks against the default locale.
+
+The catalogs are CompactCatalogs over one shared KeyTable (see compact.py),
+so a key path has the same node id in every locale. A locale is checked
+against the default locale by walking each one's node ids once and looking
+the other side's value up by id: a missing or extra key is a MISSING value,
+a type conflict a value of a different type. Dotted key paths are only
+built for the problems reported. ICU argument names are indexed by node id
+for the strings that can have any, so checking many large locales costs a
+walk per locale pair and a parse per distinct ICU message.
+"""
+import gc
+from dataclasses import dataclass, field
+
+from catalog import MISSING
+from compact import BRANCH, ROOT
+from icu import IcuSyntaxError, message_arguments
+
+OBJECT = 'object'
+STRING = 'string'
+_TYPE_TAGS = {dict: OBJECT, str: STRING, bool: 'boolean', int: 'number', float: 'number', list: 'array'}
+
+
+def _type_tag(value):
+    return OBJECT if value is BRANCH else _TYPE_TAGS.get(type(value), 'null')
+
+
+@dataclass
+class LocaleIndex:
+    compact: object
+    # Node id -> frozenset of ICU argument names, for strings that have any
+    arguments: dict = field(default_factory=dict)
+    # Node id -> ICU syntax error message
+    syntax_errors: dict = field(default_factory=dict)
+
+
+def build_compact_index(compact, argument_cache=None):
+    """Index the ICU arguments of a CompactCatalog's strings by node id.
+
+    argument_cache maps message text to its argument names and may be
+    shared between locales; identical strings are only parsed once.
+    """
+    if argument_cache is None:
+        argument_cache = {}
+    index = LocaleIndex(compact)
+    messages = [
+        (node_id, value) for node_id, value in enumerate(compact.values)
+        if type(value) is str and ('{' in value or '<' in value)
+    ]
+    for node_id, message in messages:
+        names = argument_cache.get(message)
+        if names is None:
+            try:
+                names = frozenset(message_arguments(message))
+            except IcuSyntaxError as e:
+                names = str(e)
+            argument_cache[message] = names
+        if isinstance(names, str):
+            index.syntax_errors[node_id] = names
+        elif names:
+            index.arguments[node_id] = names
+    return index
+
+
+def _padded(values, size):
+    # Nodes added to the shared table after a catalog was loaded are MISSING in it
+    return values if len(values) >= size else values + [MISSING] * (size - len(values))
+
+
+def _absent_roots(order, other_values, parents):
+    """Node ids in order that other_values lacks, reporting a missing subtree once, at its root."""
+    absent = [node_id for node_id in order if other_values[node_id] is MISSING]
+    return [node_id for node_id in absent if parents[node_id] == ROOT or other_values[parents[node_id]] is not MISSING]
+
+
+def compare_index(base, index):
+    """Compare a locale's index against the default locale's index."""
+    table = base.compact.table
+    dotted, parents = table.dotted, table.parents
+    size = max(len(base.compact.values), len(index.compact.values))
+    base_values, values = _padded(base.compact.values, size), _padded(index.compact.values, size)
+
+    type_conflicts = []
+    differing = [node_id for node_id in base.compact.order if type(values[node_id]) is not type(base_values[node_id])]
+    for node_id in differing:
+        found = values[node_id]
+        if found is MISSING:
+            continue
+        expected_tag, found_tag = _type_tag(base_values[node_id]), _type_tag(found)
+        if found_tag != expected_tag:
+            type_conflicts.append({'path': dotted(node_id), 'expected': expected_tag, 'found': found_tag})
+    type_conflicts.sort(key=lambda conflict: conflict['path'])
+
+    placeholder_mismatches = []
+    no_arguments = frozenset()
+    # Only strings with arguments are indexed, so a mismatch needs one side to have some
+    for node_id in base.arguments.keys() | index.arguments.keys():
+        if type(base_values[node_id]) is not str or type(values[node_id]) is not str:
+            continue
+        if node_id in base.syntax_errors or node_id in index.syntax_errors:
+            continue
+        expected = base.arguments.get(node_id, no_arguments)
+        found = index.arguments.get(node_id, no_arguments)
+        if expected != found:
+            placeholder_mismatches.append({
+                'path': dotted(node_id),
+                'missing': sorted(expected - found),
+                'unexpected': sorted(found - expected),
+            })
+    placeholder_mismatches.sort(key=lambda mismatch: mismatch['path'])
+
+    return {
+        'missing': sorted(map(dotted, _absent_roots(base.compact.order, values, parents))),
+        'extra': sorted(map(dotted, _absent_roots(index.compact.order, base_values, parents))),
+        'type_conflicts': type_conflicts,
+        'placeholder_mismatches': placeholder_mismatches,
+        'syntax_errors': sorted(
+            ({'path': dotted(node_id), 'error': error} for node_id, error in index.syntax_errors.items()),
+            key=lambda error: error['path'],
+        ),
+    }
+
+
+def validate_compact(catalogs, default_locale):
+    """Validate every CompactCatalog in {locale: catalog}, sharing one KeyTable, against the default locale."""
+    argument_cache = {}
+    # The loaded catalogs are long-lived; keep the collector from rescanning
+    # them every time parsing ICU messages triggers a collection
+    gc.freeze()
+    try:
+        base = build_compact_index(catalogs[default_locale], argument_cache)
+        return {
+            lang_code: compare_index(
+                base, base if lang_code == default_locale else build_compact_index(catalog, argument_cache),
+            )
+            for lang_code, catalog in catalogs.items()
+        }
+    finally:
+        gc.unfreeze()
+
+
+def problem_count(locale_report):
+    return sum(len(problems) for problems in locale_report.values())
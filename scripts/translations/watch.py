@@ -0,0 +1,204 @@
+"""Watch mode: keep catalogs in memory and re-sync only what changed.
+
+The watcher polls file signatures (mtime and size) of the patch sources and
+the catalogs. When a burst of changes has settled for `debounce` seconds it
+reloads the payloads of the affected locales, diffs them against the
+payloads it applied last, and merges just those keys into the resident
+catalogs. A catalog edited on disk by someone else is re-read and gets the
+full payload merged again, as a sync would.
+
+Writes update the sync manifest and snapshots, so a regular sync run
+afterwards still takes its fast paths.
+"""
+import json
+import os
+import time
+from dataclasses import dataclass
+from typing import Optional
+
+from catalog import from_leaves
+from fsutil import atomic_write
+from incremental import payload_delta, save_snapshot, snapshot_path
+from json_writer import dumps_catalog, patch_catalog
+from manifest import Manifest, hash_bytes, hash_payload
+from merge import deep_merge
+
+DEFAULT_INTERVAL = 0.1
+DEFAULT_DEBOUNCE = 0.2
+
+
+def file_signature(file_path):
+    try:
+        stat = os.stat(file_path)
+    except FileNotFoundError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+@dataclass
+class _Locale:
+    file_path: str
+    catalog: dict
+    payload: dict
+    # Signature of the catalog file as we last read or wrote it
+    signature: Optional[tuple] = None
+
+
+class CatalogWatcher:
+    """Keeps catalogs in sync with their patch sources.
+
+    open_source() returns the current source (see sources.py); watched_files()
+    returns the files it is read from. Both are called again after every
+    change, so files added to a source directory are picked up.
+    """
+
+    def __init__(self, messages_dir, state_dir, manifest_file, open_source, watched_files,
+                 interval=DEFAULT_INTERVAL, debounce=DEFAULT_DEBOUNCE, log=print):
+        self.messages_dir = messages_dir
+        self.state_dir = state_dir
+        self.manifest = Manifest.load(os.path.join(state_dir, manifest_file))
+        self.open_source = open_source
+        self.watched_files = watched_files
+        self.interval = interval
+        self.debounce = debounce
+        self.log = log
+        self.locales = {}
+        self.source = None
+        # Source file -> signature, and the locales each file provides
+        self.source_signatures = {}
+        self.file_locales = {}
+
+    def _scan_sources(self):
+        self.source = self.open_source()
+        self.source_signatures = {path: file_signature(path) for path in self.watched_files()}
+        self.file_locales = {}
+        for source in getattr(self.source, 'sources', ()):
+            self.file_locales[source.file_path] = set(source.locales())
+
+    def start(self):
+        """Load every catalog and apply the full payloads once."""
+        self._scan_sources()
+        for lang_code in self.source.locales():
+            self._load_locale(lang_code, self.source.load(lang_code))
+
+    def _load_locale(self, lang_code, payload):
+        file_path = os.path.join(self.messages_dir, f'{lang_code}.json')
+        signature = file_signature(file_path)
+        try:
+            with open(file_path, 'rb') as f:
+                data = f.read()
+            catalog = json.loads(data.decode('utf-8'))
+        except (OSError, ValueError):
+            # Probably mid-edit; wait for the file to change again
+            if lang_code in self.locales:
+                self.locales[lang_code].signature = signature
+            raise
+        state = self.locales[lang_code] = _Locale(file_path, catalog, payload, signature)
+        changes = deep_merge(state.catalog, payload)
+        self._write(lang_code, state, changes, data)
+
+    def _write(self, lang_code, state, changes, existing_bytes=None):
+        if changes:
+            written = None
+            if existing_bytes is None and not (changes.added or changes.type_replaced):
+                with open(state.file_path, 'rb') as f:
+                    existing_bytes = f.read()
+            if existing_bytes is not None:
+                written = patch_catalog(state.file_path, existing_bytes, state.catalog, changes)
+            if written is None:
+                written = atomic_write(state.file_path, dumps_catalog(state.catalog))
+            output_hash = written[0]
+            state.signature = file_signature(state.file_path)
+            counts = ', '.join(f'{count} {kind}' for kind, count in changes.summary().items() if count)
+            self.log(f'Updated translations for {lang_code} ({counts})')
+        else:
+            with open(state.file_path, 'rb') as f:
+                output_hash = hash_bytes(f.read())
+
+        # Keep the state a regular sync relies on current
+        save_snapshot(snapshot_path(self.state_dir, lang_code), state.payload)
+        self.manifest.record(lang_code, hash_payload(state.payload), output_hash)
+        self.manifest.save()
+
+    def _changed_sources(self):
+        current = {path: file_signature(path) for path in self.watched_files()}
+        return {
+            path for path in current.keys() | self.source_signatures.keys()
+            if current.get(path) != self.source_signatures.get(path)
+        }
+
+    def _changed_catalogs(self):
+        return {
+            lang_code for lang_code, state in self.locales.items()
+            if file_signature(state.file_path) != state.signature
+        }
+
+    def _fingerprint(self):
+        paths = sorted(self.watched_files()) + sorted(state.file_path for state in self.locales.values())
+        return [(path, file_signature(path)) for path in paths]
+
+    def poll(self):
+        """Return (changed source files, locales whose catalog file changed)."""
+        return self._changed_sources(), self._changed_catalogs()
+
+    def apply(self, changed_sources, changed_catalogs):
+        """Bring the catalogs up to date after the given changes."""
+        affected = set()
+        if changed_sources:
+            for path in changed_sources:
+                affected |= self.file_locales.get(path, set())
+            self._scan_sources()
+            for path in changed_sources:
+                affected |= self.file_locales.get(path, set())
+            if not self.file_locales:
+                # An in-memory source such as TRANSLATIONS: any locale may have changed
+                affected = set(self.source.locales())
+
+        available = set(self.source.locales())
+        for lang_code in sorted(changed_catalogs):
+            # Edited outside the watcher: start again from what is on disk
+            if lang_code in available:
+                self._load_locale(lang_code, self.source.load(lang_code))
+                affected.discard(lang_code)
+            else:
+                self.locales[lang_code].signature = file_signature(self.locales[lang_code].file_path)
+
+        for lang_code in sorted(affected & available):
+            payload = self.source.load(lang_code)
+            state = self.locales.get(lang_code)
+            if state is None:
+                self._load_locale(lang_code, payload)
+                continue
+            delta = payload_delta(state.payload, payload)
+            if not delta:
+                continue
+            state.payload = payload
+            self._write(lang_code, state, deep_merge(state.catalog, from_leaves(delta)))
+
+    def run(self, stop=None):
+        """Poll until stop() returns true (or forever), applying changes once they settle."""
+        while stop is None or not stop():
+            changed_sources, changed_catalogs = self.poll()
+            if not changed_sources and not changed_catalogs:
+                time.sleep(self.interval)
+                continue
+
+            # Wait for the burst to end: no file changes for `debounce` seconds
+            settled_at = time.monotonic() + self.debounce
+            fingerprint = self._fingerprint()
+            while time.monotonic() < settled_at:
+                time.sleep(min(self.interval, self.debounce))
+                latest = self._fingerprint()
+                if latest != fingerprint:
+                    fingerprint = latest
+                    settled_at = time.monotonic() + self.debounce
+
+            started = time.perf_counter()
+            try:
+                self.apply(*self.poll())
+            except Exception as e:
+                # A half-saved source file is common while editing; retry on the next change
+                self.log(f'error: {type(e).__name__}: {e}')
+                self.source_signatures = {path: file_signature(path) for path in self.watched_files()}
+                continue
+            self.log(f'Synced in {(time.perf_counter() - started) * 1000:.1f} ms')
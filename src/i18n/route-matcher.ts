@@ -0,0 +1,56 @@
+import { routeTrie, type RouteNode } from './routes.generated';
+
+export type RouteMatch = {
+  // Locale prefix of the path, if it has one
+  locale: string | null;
+  // Canonical route (a key of routing.pathnames), if the path is one
+  route: string | null;
+  // Whether the path is, or is below, a route that needs no sign-in
+  isPublic: boolean;
+};
+
+const decodeSegment = (segment: string): string => {
+  try {
+    return decodeURIComponent(segment).normalize('NFC');
+  } catch {
+    return segment;
+  }
+};
+
+type Walk = { node: RouteNode | null; isPublic: boolean };
+
+const walk = (start: RouteNode, segments: string[]): Walk => {
+  let node = start;
+  let isPublic = false;
+  for (const segment of segments) {
+    const children = node.children;
+    if (!children || !Object.prototype.hasOwnProperty.call(children, segment)) {
+      return { node: null, isPublic };
+    }
+    node = children[segment];
+    isPublic = isPublic || !!node.public;
+  }
+  return { node, isPublic };
+};
+
+// Resolve locale, canonical route and public status in one walk of the generated route trie
+export const matchRoute = (pathname: string): RouteMatch => {
+  const segments = pathname.split('/').filter(Boolean).map(decodeSegment);
+  const locale =
+    segments.length > 0 && Object.prototype.hasOwnProperty.call(routeTrie.locales, segments[0])
+      ? segments[0]
+      : null;
+  const rest = locale ? segments.slice(1) : segments;
+
+  let match: Walk = locale ? walk(routeTrie.locales[locale], rest) : { node: null, isPublic: false };
+  if (!match.node) {
+    // Unprefixed, or another locale's slug: try every locale's paths
+    match = walk(routeTrie.any, rest);
+  }
+  const { node, isPublic } = match;
+  return {
+    locale,
+    route: node?.route ?? null,
+    isPublic: isPublic || !!node?.public,
+  };
+};
@@ -0,0 +1,648 @@
+// Generated by scripts/translations/update_translations_example.py routes. Do not edit.
+
+export type RouteNode = {
+  route?: string;
+  public?: boolean;
+  children?: Record<string, RouteNode>;
+};
+
+export const pathnames = {
+  '/': '/',
+  '/invoices': {
+    en: '/invoices',
+    es: '/facturas',
+    fr: '/factures',
+    de: '/rechnungen',
+    pl: '/faktury',
+    pt: '/faturas',
+    zh: '/发票',
+  },
+  '/invoice/create': {
+    en: '/invoice/create',
+    es: '/factura/crear',
+    fr: '/facture/creer',
+    de: '/rechnung/erstellen',
+    pl: '/faktura/utworz',
+    pt: '/fatura/criar',
+    zh: '/发票/创建',
+  },
+  '/privacy-policy': {
+    en: '/privacy-policy',
+    es: '/politica-de-privacidad',
+    fr: '/politique-de-confidentialite',
+    de: '/datenschutzrichtlinie',
+    pl: '/polityka-prywatnosci',
+    pt: '/politica-de-privacidade',
+    zh: '/隐私政策',
+  },
+  '/terms-of-service': {
+    en: '/terms-of-service',
+    es: '/terminos-de-servicio',
+    fr: '/conditions-d-utilisation',
+    de: '/nutzungsbedingungen',
+    pl: '/warunki-korzystania-z-uslugi',
+    pt: '/termos-de-servico',
+    zh: '/服务条款',
+  },
+  '/signin': {
+    en: '/signin',
+    es: '/iniciar-sesion',
+    fr: '/connexion',
+    de: '/anmelden',
+    pl: '/zaloguj-sie',
+    pt: '/entrar',
+    zh: '/登录',
+  },
+  '/verify': {
+    en: '/verify',
+    es: '/verificar',
+    fr: '/verifier',
+    de: '/verifizieren',
+    pl: '/weryfikacja',
+    pt: '/verificar',
+    zh: '/验证',
+  },
+} as const;
+
+export const routeTrie: { locales: Record<string, RouteNode>; any: RouteNode } = {
+  locales: {
+    de: {
+      route: '/',
+      public: true,
+      children: {
+        rechnungen: {
+          route: '/invoices',
+        },
+        rechnung: {
+          children: {
+            erstellen: {
+              route: '/invoice/create',
+              public: true,
+            },
+          },
+        },
+        datenschutzrichtlinie: {
+          route: '/privacy-policy',
+          public: true,
+        },
+        nutzungsbedingungen: {
+          route: '/terms-of-service',
+          public: true,
+        },
+        anmelden: {
+          route: '/signin',
+          public: true,
+        },
+        verifizieren: {
+          route: '/verify',
+          public: true,
+        },
+        api: {
+          children: {
+            invoice: {
+              children: {
+                parse: {
+                  children: {
+                    text: {
+                      route: '/api/invoice/parse/text',
+                      public: true,
+                    },
+                    file: {
+                      route: '/api/invoice/parse/file',
+                      public: true,
+                    },
+                  },
+                },
+              },
+            },
+          },
+        },
+      },
+    },
+    en: {
+      route: '/',
+      public: true,
+      children: {
+        invoices: {
+          route: '/invoices',
+        },
+        invoice: {
+          children: {
+            create: {
+              route: '/invoice/create',
+              public: true,
+            },
+          },
+        },
+        'privacy-policy': {
+          route: '/privacy-policy',
+          public: true,
+        },
+        'terms-of-service': {
+          route: '/terms-of-service',
+          public: true,
+        },
+        signin: {
+          route: '/signin',
+          public: true,
+        },
+        verify: {
+          route: '/verify',
+          public: true,
+        },
+        api: {
+          children: {
+            invoice: {
+              children: {
+                parse: {
+                  children: {
+                    text: {
+                      route: '/api/invoice/parse/text',
+                      public: true,
+                    },
+                    file: {
+                      route: '/api/invoice/parse/file',
+                      public: true,
+                    },
+                  },
+                },
+              },
+            },
+          },
+        },
+      },
+    },
+    es: {
+      route: '/',
+      public: true,
+      children: {
+        facturas: {
+          route: '/invoices',
+        },
+        factura: {
+          children: {
+            crear: {
+              route: '/invoice/create',
+              public: true,
+            },
+          },
+        },
+        'politica-de-privacidad': {
+          route: '/privacy-policy',
+          public: true,
+        },
+        'terminos-de-servicio': {
+          route: '/terms-of-service',
+          public: true,
+        },
+        'iniciar-sesion': {
+          route: '/signin',
+          public: true,
+        },
+        verificar: {
+          route: '/verify',
+          public: true,
+        },
+        api: {
+          children: {
+            invoice: {
+              children: {
+                parse: {
+                  children: {
+                    text: {
+                      route: '/api/invoice/parse/text',
+                      public: true,
+                    },
+                    file: {
+                      route: '/api/invoice/parse/file',
+                      public: true,
+                    },
+                  },
+                },
+              },
+            },
+          },
+        },
+      },
+    },
+    fr: {
+      route: '/',
+      public: true,
+      children: {
+        factures: {
+          route: '/invoices',
+        },
+        facture: {
+          children: {
+            creer: {
+              route: '/invoice/create',
+              public: true,
+            },
+          },
+        },
+        'politique-de-confidentialite': {
+          route: '/privacy-policy',
+          public: true,
+        },
+        'conditions-d-utilisation': {
+          route: '/terms-of-service',
+          public: true,
+        },
+        connexion: {
+          route: '/signin',
+          public: true,
+        },
+        verifier: {
+          route: '/verify',
+          public: true,
+        },
+        api: {
+          children: {
+            invoice: {
+              children: {
+                parse: {
+                  children: {
+                    text: {
+                      route: '/api/invoice/parse/text',
+                      public: true,
+                    },
+                    file: {
+                      route: '/api/invoice/parse/file',
+                      public: true,
+                    },
+                  },
+                },
+              },
+            },
+          },
+        },
+      },
+    },
+    pl: {
+      route: '/',
+      public: true,
+      children: {
+        faktury: {
+          route: '/invoices',
+        },
+        faktura: {
+          children: {
+            utworz: {
+              route: '/invoice/create',
+              public: true,
+            },
+          },
+        },
+        'polityka-prywatnosci': {
+          route: '/privacy-policy',
+          public: true,
+        },
+        'warunki-korzystania-z-uslugi': {
+          route: '/terms-of-service',
+          public: true,
+        },
+        'zaloguj-sie': {
+          route: '/signin',
+          public: true,
+        },
+        weryfikacja: {
+          route: '/verify',
+          public: true,
+        },
+        api: {
+          children: {
+            invoice: {
+              children: {
+                parse: {
+                  children: {
+                    text: {
+                      route: '/api/invoice/parse/text',
+                      public: true,
+                    },
+                    file: {
+                      route: '/api/invoice/parse/file',
+                      public: true,
+                    },
+                  },
+                },
+              },
+            },
+          },
+        },
+      },
+    },
+    pt: {
+      route: '/',
+      public: true,
+      children: {
+        faturas: {
+          route: '/invoices',
+        },
+        fatura: {
+          children: {
+            criar: {
+              route: '/invoice/create',
+              public: true,
+            },
+          },
+        },
+        'politica-de-privacidade': {
+          route: '/privacy-policy',
+          public: true,
+        },
+        'termos-de-servico': {
+          route: '/terms-of-service',
+          public: true,
+        },
+        entrar: {
+          route: '/signin',
+          public: true,
+        },
+        verificar: {
+          route: '/verify',
+          public: true,
+        },
+        api: {
+          children: {
+            invoice: {
+              children: {
+                parse: {
+                  children: {
+                    text: {
+                      route: '/api/invoice/parse/text',
+                      public: true,
+                    },
+                    file: {
+                      route: '/api/invoice/parse/file',
+                      public: true,
+                    },
+                  },
+                },
+              },
+            },
+          },
+        },
+      },
+    },
+    zh: {
+      route: '/',
+      public: true,
+      children: {
+        发票: {
+          route: '/invoices',
+          children: {
+            创建: {
+              route: '/invoice/create',
+              public: true,
+            },
+          },
+        },
+        隐私政策: {
+          route: '/privacy-policy',
+          public: true,
+        },
+        服务条款: {
+          route: '/terms-of-service',
+          public: true,
+        },
+        登录: {
+          route: '/signin',
+          public: true,
+        },
+        验证: {
+          route: '/verify',
+          public: true,
+        },
+        api: {
+          children: {
+            invoice: {
+              children: {
+                parse: {
+                  children: {
+                    text: {
+                      route: '/api/invoice/parse/text',
+                      public: true,
+                    },
+                    file: {
+                      route: '/api/invoice/parse/file',
+                      public: true,
+                    },
+                  },
+                },
+              },
+            },
+          },
+        },
+      },
+    },
+  },
+  any: {
+    route: '/',
+    public: true,
+    children: {
+      invoices: {
+        route: '/invoices',
+      },
+      facturas: {
+        route: '/invoices',
+      },
+      factures: {
+        route: '/invoices',
+      },
+      rechnungen: {
+        route: '/invoices',
+      },
+      faktury: {
+        route: '/invoices',
+      },
+      faturas: {
+        route: '/invoices',
+      },
+      发票: {
+        route: '/invoices',
+        children: {
+          创建: {
+            route: '/invoice/create',
+            public: true,
+          },
+        },
+      },
+      invoice: {
+        children: {
+          create: {
+            route: '/invoice/create',
+            public: true,
+          },
+        },
+      },
+      factura: {
+        children: {
+          crear: {
+            route: '/invoice/create',
+            public: true,
+          },
+        },
+      },
+      facture: {
+        children: {
+          creer: {
+            route: '/invoice/create',
+            public: true,
+          },
+        },
+      },
+      rechnung: {
+        children: {
+          erstellen: {
+            route: '/invoice/create',
+            public: true,
+          },
+        },
+      },
+      faktura: {
+        children: {
+          utworz: {
+            route: '/invoice/create',
+            public: true,
+          },
+        },
+      },
+      fatura: {
+        children: {
+          criar: {
+            route: '/invoice/create',
+            public: true,
+          },
+        },
+      },
+      'privacy-policy': {
+        route: '/privacy-policy',
+        public: true,
+      },
+      'politica-de-privacidad': {
+        route: '/privacy-policy',
+        public: true,
+      },
+      'politique-de-confidentialite': {
+        route: '/privacy-policy',
+        public: true,
+      },
+      datenschutzrichtlinie: {
+        route: '/privacy-policy',
+        public: true,
+      },
+      'polityka-prywatnosci': {
+        route: '/privacy-policy',
+        public: true,
+      },
+      'politica-de-privacidade': {
+        route: '/privacy-policy',
+        public: true,
+      },
+      隐私政策: {
+        route: '/privacy-policy',
+        public: true,
+      },
+      'terms-of-service': {
+        route: '/terms-of-service',
+        public: true,
+      },
+      'terminos-de-servicio': {
+        route: '/terms-of-service',
+        public: true,
+      },
+      'conditions-d-utilisation': {
+        route: '/terms-of-service',
+        public: true,
+      },
+      nutzungsbedingungen: {
+        route: '/terms-of-service',
+        public: true,
+      },
+      'warunki-korzystania-z-uslugi': {
+        route: '/terms-of-service',
+        public: true,
+      },
+      'termos-de-servico': {
+        route: '/terms-of-service',
+        public: true,
+      },
+      服务条款: {
+        route: '/terms-of-service',
+        public: true,
+      },
+      signin: {
+        route: '/signin',
+        public: true,
+      },
+      'iniciar-sesion': {
+        route: '/signin',
+        public: true,
+      },
+      connexion: {
+        route: '/signin',
+        public: true,
+      },
+      anmelden: {
+        route: '/signin',
+        public: true,
+      },
+      'zaloguj-sie': {
+        route: '/signin',
+        public: true,
+      },
+      entrar: {
+        route: '/signin',
+        public: true,
+      },
+      登录: {
+        route: '/signin',
+        public: true,
+      },
+      verify: {
+        route: '/verify',
+        public: true,
+      },
+      verificar: {
+        route: '/verify',
+        public: true,
+      },
+      verifier: {
+        route: '/verify',
+        public: true,
+      },
+      verifizieren: {
+        route: '/verify',
+        public: true,
+      },
+      weryfikacja: {
+        route: '/verify',
+        public: true,
+      },
+      验证: {
+        route: '/verify',
+        public: true,
+      },
+      api: {
+        children: {
+          invoice: {
+            children: {
+              parse: {
+                children: {
+                  text: {
+                    route: '/api/invoice/parse/text',
+                    public: true,
+                  },
+                  file: {
+                    route: '/api/invoice/parse/file',
+                    public: true,
+                  },
+                },
+              },
+            },
+          },
+        },
+      },
+    },
+  },
+};
@@ -1,5 +1,6 @@
 import { createNavigation } from 'next-intl/navigation';
 import { defineRouting } from 'next-intl/routing';
+import { pathnames } from './routes.generated';
 
 // Define all available locales
 export const locales = ['en', 'es', 'fr', 'de', 'pl', 'pt', 'zh'] as const;
@@ -11,63 +12,8 @@ export const routing = defineRouting({
   locales,
   defaultLocale,
   localePrefix: 'always',
-  pathnames: {
-    '/': '/',
-    '/invoices': {
-      en: '/invoices',
-      es: '/facturas',
-      fr: '/factures',
-      de: '/rechnungen',
-      pl: '/faktury',
-      pt: '/faturas',
-      zh: '/发票',
-    },
-    '/invoice/create': {
-      en: '/invoice/create',
-      es: '/factura/crear',
-      fr: '/facture/creer',
-      de: '/rechnung/erstellen',
-      pl: '/faktura/utworz',
-      pt: '/fatura/criar',
-      zh: '/发票/创建',
-    },
-    '/privacy-policy': {
-      en: '/privacy-policy',
-      es: '/politica-de-privacidad',
-      fr: '/politique-de-confidentialite',
-      de: '/datenschutzrichtlinie',
-      pl: '/polityka-prywatnosci',
-      pt: '/politica-de-privacidade',
-      zh: '/隐私政策',
-    },
-    '/terms-of-service': {
-      en: '/terms-of-service',
-      es: '/terminos-de-servicio',
-      fr: '/conditions-d-utilisation',
-      de: '/nutzungsbedingungen',
-      pl: '/warunki-korzystania-z-uslugi',
-      pt: '/termos-de-servico',
-      zh: '/服务条款',
-    },
-    '/signin': {
-      en: '/signin',
-      es: '/iniciar-sesion',
-      fr: '/connexion',
-      de: '/anmelden',
-      pl: '/zaloguj-sie',
-      pt: '/entrar',
-      zh: '/登录',
-    },
-    '/verify': {
-      en: '/verify',
-      es: '/verificar',
-      fr: '/verifier',
-      de: '/verifizieren',
-      pl: '/weryfikacja',
-      pt: '/verificar',
-      zh: '/验证',
-    },
-  },
+  // Generated from ROUTES in scripts/translations/update_translations_example.py
+  pathnames,
 });
 
 // Create navigation utilities
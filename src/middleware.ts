@@ -1,53 +1,7 @@
 import createMiddleware from 'next-intl/middleware';
 import { NextRequest, NextResponse } from 'next/server';
-import { defaultLocale, routing } from './i18n/routing';
-
-// Define the paths that don't require authentication
-const publicPaths = [
-  '/',
-  '/signin',
-  '/iniciar-sesion',
-  '/connexion',
-  '/anmelden',
-  '/zaloguj-sie',
-  '/entrar',
-  '/登录',
-  '/verify',
-  '/verificar',
-  '/verifier',
-  '/verifizieren',
-  '/weryfikacja',
-  '/verificar',
-  '/验证',
-  '/invoice/create',
-  '/factura/crear',
-  '/facture/creer',
-  '/rechnung/erstellen',
-  '/faktura/utworz',
-  '/fatura/criar',
-  '/发票/创建',
-  '/privacy-policy',
-  '/politica-de-privacidad',
-  '/politique-de-confidentialite',
-  '/datenschutzrichtlinie',
-  '/polityka-prywatnosci',
-  '/politica-de-privacidade',
-  '/隐私政策',
-  '/terms-of-service',
-  '/terminos-de-servicio',
-  '/conditions-d-utilisation',
-  '/nutzungsbedingungen',
-  '/warunki-korzystania-z-uslugi',
-  '/termos-de-servico',
-  '/服务条款',
-  '/api/invoice/parse/text',
-  '/api/invoice/parse/file',
-];
-
-// Check if the given path is a public path
-const isPublicPath = (path: string): boolean => {
-  return publicPaths.some((publicPath) => path === publicPath || path.startsWith(`${publicPath}/`));
-};
+import { matchRoute } from './i18n/route-matcher';
+import { defaultLocale, Locale, routing } from './i18n/routing';
 
 // Create the next-intl middleware
 const i18nMiddleware = createMiddleware(routing);
@@ -55,26 +9,18 @@ const i18nMiddleware = createMiddleware(routing);
 export default async function middleware(request: NextRequest) {
   const { pathname } = request.nextUrl;
 
-  // Normalize the pathname to remove locale
-  const pathnameWithoutLocale = routing.locales.some(
-    (locale) => pathname.startsWith(`/${locale}/`) || pathname === `/${locale}`
-  )
-    ? pathname.replace(/^\/[^\/]+/, '') || '/'
-    : pathname;
+  // Locale, canonical route and public status from the generated route trie
+  const { locale, route, isPublic } = matchRoute(pathname);
 
   // Handle authentication
   const authToken = request.cookies.get('authToken')?.value;
   const isAuthenticated = !!authToken; // Simple check for auth token presence
-  const currentLocale =
-    routing.locales.find((locale) => pathname.startsWith(`/${locale}/`)) || defaultLocale;
+  const currentLocale = (locale as Locale | null) ?? defaultLocale;
   const signInPath = routing.pathnames['/signin'][currentLocale];
+  const isSignIn = route === '/signin';
 
   // If the path requires authentication and the user is not authenticated, redirect to sign in
-  if (
-    pathnameWithoutLocale !== signInPath &&
-    !isPublicPath(pathnameWithoutLocale) &&
-    !isAuthenticated
-  ) {
+  if (!isSignIn && !isPublic && !isAuthenticated) {
     // Determine the current locale, defaulting to the default locale if not found
 
     const signInUrl = new URL(`/${currentLocale}${signInPath}`, request.url);
@@ -83,7 +29,7 @@ export default async function middleware(request: NextRequest) {
   }
 
   // If the path is sign-in related and the user is authenticated, redirect to dashboard
-  if (pathnameWithoutLocale === signInPath && isAuthenticated) {
+  if (isSignIn && isAuthenticated) {
     return NextResponse.redirect(new URL(`/${defaultLocale}/invoices`, request.url));
   }
 